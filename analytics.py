@@ -0,0 +1,293 @@
+"""
+Аналитика по истории настоящих спринтов доски
+
+Категоризированные задачи всех выбранных спринтов складываются в
+колонки NumPy (строка на пару «спринт, задача»): индекс спринта, индекс
+разработчика, битовая маска категорий, SP, estimate и spent. Метрики
+считаются группировками через np.bincount — без циклов Python по
+задачам, поэтому пересчет по всей истории занимает доли секунды после
+загрузки.
+
+Метрики группы (разработчик, спринт или пара «разработчик × спринт»):
+- planned_closed_ratio: SP closed_planned / SP original
+- carry_over_rate: SP carried_over / SP всех задач спринта
+- unplanned_share: SP added_later / (SP original + SP added_later)
+- estimate_accuracy: spent / estimate по закрытым в спринте задачам с оценкой
+
+Требуется numpy (pip install numpy).
+
+Использование:
+    python analytics.py [--last N] [--by developer|sprint|developer-sprint]
+    python analytics.py --by sprint --format csv -o history.csv
+"""
+
+import argparse
+import csv
+import io
+import json
+import math
+import sys
+from dataclasses import dataclass, field
+from typing import TextIO
+
+import numpy as np
+
+from jira_client import CATEGORY_NAMES, Issue, JiraError, Sprint, get_sprint_catalog, get_sprints_issues
+from profiling import phase
+from sprint_report import SprintCategorizer, select_trend_sprints
+
+# Бит категории в маске flags
+CATEGORY_BITS = {name: 1 << n for n, name in enumerate(CATEGORY_NAMES)}
+CLOSED_MASK = CATEGORY_BITS['closed_planned'] | CATEGORY_BITS['closed_unplanned']
+
+GROUPINGS = ('developer', 'sprint', 'developer-sprint')
+
+# Колонки таблицы метрик: суммы SP по категориям, затем отношения
+METRIC_COLUMNS = (
+    'issues', 'story_points', *CATEGORY_NAMES,
+    'planned_closed_ratio', 'carry_over_rate', 'unplanned_share',
+    'time_estimate', 'time_spent', 'estimate_accuracy',
+)
+
+
+@dataclass
+class IssueColumns:
+    """Категоризированные задачи спринтов в колонках: строка на пару (спринт, задача)"""
+    sprints: list[Sprint]
+    developers: list[str]
+    sprint: np.ndarray       # int32, индекс в sprints
+    developer: np.ndarray    # int32, индекс в developers
+    flags: np.ndarray        # uint8, биты CATEGORY_BITS
+    story_points: np.ndarray  # float64
+    time_estimate: np.ndarray  # int64, секунды
+    time_spent: np.ndarray   # int64, секунды
+
+    def __len__(self) -> int:
+        return len(self.sprint)
+
+    def has(self, category: str) -> np.ndarray:
+        return (self.flags & CATEGORY_BITS[category]) != 0
+
+
+def build_columns(
+    sprints: list[Sprint],
+    issues_by_sprint: dict[int, list[Issue]],
+    real_sprint_ids: set[int]
+) -> IssueColumns:
+    """Категоризировать задачи каждого спринта и сложить результат в колонки"""
+    developer_index: dict[str, int] = {}
+    developer_names: list[str] = []
+    sprint_col, developer_col, flags_col = [], [], []
+    sp_col, estimate_col, spent_col = [], [], []
+
+    for n, sprint in enumerate(sprints):
+        categorizer = SprintCategorizer(
+            sprint.id, sprint.activated_ts or sprint.start_ts, sprint.end_ts, real_sprint_ids
+        )
+        for issue in issues_by_sprint.get(sprint.id, []):
+            dev = developer_index.get(issue.assignee_key)
+            if dev is None:
+                dev = developer_index[issue.assignee_key] = len(developer_names)
+                developer_names.append(issue.assignee)
+            flags = 0
+            for category in categorizer.categories(issue):
+                flags |= CATEGORY_BITS[category]
+            sprint_col.append(n)
+            developer_col.append(dev)
+            flags_col.append(flags)
+            sp_col.append(issue.story_points)
+            estimate_col.append(issue.time_estimate)
+            spent_col.append(issue.time_spent)
+
+    return IssueColumns(
+        sprints=sprints,
+        developers=developer_names,
+        sprint=np.array(sprint_col, dtype=np.int32),
+        developer=np.array(developer_col, dtype=np.int32),
+        flags=np.array(flags_col, dtype=np.uint8),
+        story_points=np.array(sp_col, dtype=np.float64),
+        time_estimate=np.array(estimate_col, dtype=np.int64),
+        time_spent=np.array(spent_col, dtype=np.int64),
+    )
+
+
+@dataclass
+class MetricTable:
+    """Таблица метрик: строка на группу, колонки METRIC_COLUMNS"""
+    by: str
+    labels: list[tuple[str, ...]]
+    columns: dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def label_names(self) -> tuple[str, ...]:
+        return {'developer': ('developer',), 'sprint': ('sprint',)}.get(self.by, ('developer', 'sprint'))
+
+    def rows(self) -> list[dict]:
+        names = self.label_names
+        result = []
+        for n, label in enumerate(self.labels):
+            row = dict(zip(names, label))
+            for column in METRIC_COLUMNS:
+                value = self.columns[column][n].item()
+                row[column] = None if isinstance(value, float) and math.isnan(value) else value
+            result.append(row)
+        return result
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Поэлементное отношение; NaN там, где знаменатель нулевой"""
+    return np.divide(
+        numerator, denominator,
+        out=np.full(len(numerator), np.nan),
+        where=denominator > 0
+    )
+
+
+def compute_metrics(columns: IssueColumns, by: str = 'developer') -> MetricTable:
+    """Сгруппировать строки по by и посчитать суммы и метрики группы"""
+    n_sprints = len(columns.sprints)
+    if by == 'developer':
+        group = columns.developer
+        n_groups = len(columns.developers)
+    elif by == 'sprint':
+        group = columns.sprint
+        n_groups = n_sprints
+    elif by == 'developer-sprint':
+        group = columns.developer.astype(np.int64) * n_sprints + columns.sprint
+        n_groups = len(columns.developers) * n_sprints
+    else:
+        raise ValueError(f"Неизвестная группировка: {by}")
+
+    def total(values: np.ndarray, mask: np.ndarray | None = None) -> np.ndarray:
+        weights = values if mask is None else np.where(mask, values, 0)
+        return np.bincount(group, weights=weights, minlength=n_groups)
+
+    sp = columns.story_points
+    sums = {
+        'issues': np.bincount(group, minlength=n_groups),
+        'story_points': total(sp),
+    }
+    for category in CATEGORY_NAMES:
+        sums[category] = total(sp, columns.has(category))
+
+    closed_estimated = ((columns.flags & CLOSED_MASK) != 0) & (columns.time_estimate > 0)
+    estimate = total(columns.time_estimate, closed_estimated)
+    spent = total(columns.time_spent, closed_estimated)
+
+    metrics = {
+        **sums,
+        'planned_closed_ratio': _ratio(sums['closed_planned'], sums['original']),
+        'carry_over_rate': _ratio(sums['carried_over'], sums['story_points']),
+        'unplanned_share': _ratio(sums['added_later'], sums['original'] + sums['added_later']),
+        'time_estimate': estimate.astype(np.int64),
+        'time_spent': spent.astype(np.int64),
+        'estimate_accuracy': _ratio(spent, estimate),
+    }
+
+    # Группы без строк (разработчик не участвовал в спринте) не выводятся
+    present = np.flatnonzero(sums['issues'])
+    if by == 'developer':
+        order = present[np.argsort([columns.developers[g] for g in present], kind='stable')]
+        labels = [(columns.developers[g],) for g in order]
+    elif by == 'sprint':
+        order = present
+        labels = [(columns.sprints[g].name,) for g in order]
+    else:
+        dev, sprint = np.divmod(present, n_sprints)
+        order = present[np.lexsort((sprint, [columns.developers[d] for d in dev]))]
+        labels = [(columns.developers[g // n_sprints], columns.sprints[g % n_sprints].name) for g in order]
+
+    return MetricTable(by, labels, {name: values[order] for name, values in metrics.items()})
+
+
+def load_history(last: int | None = None) -> IssueColumns:
+    """Загрузить задачи настоящих спринтов доски и сложить их в колонки"""
+    with phase("sprint lookup"):
+        catalog = get_sprint_catalog()
+    sprints = select_trend_sprints(catalog.sprints, last)
+    with phase("issue fetch"):
+        issues_by_sprint = get_sprints_issues(sprints)
+    with phase("categorize"):
+        return build_columns(sprints, issues_by_sprint, set(catalog.real_ids))
+
+
+# =============================================================================
+# Вывод
+# =============================================================================
+
+def _format_cell(value) -> str:
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def print_table(table: MetricTable, out: TextIO | None = None):
+    out = out or sys.stdout
+    label_width = 30 * len(table.label_names)
+    headers = ('Задач', 'SP', 'План', 'Доб.', 'Перенос', 'Закр.пл', 'Закр.непл',
+               'План/закр', 'Перенос%', 'Внеплан%', 'Оценка ч', 'Факт ч', 'Факт/оц')
+    width = label_width + 11 * len(headers) + 2
+    print("=" * width, file=out)
+    print(f"МЕТРИКИ ПО ИСТОРИИ СПРИНТОВ (группировка: {table.by})", file=out)
+    print("=" * width, file=out)
+    label_header = "".join(f"{name:<30}" for name in table.label_names)
+    print(f"  {label_header}" + "".join(f"{h:>11}" for h in headers), file=out)
+    print(f"  {'-'*(width - 2)}", file=out)
+    for row in table.rows():
+        label = "".join(f"{str(row[name])[:29]:<30}" for name in table.label_names)
+        cells = [row[c] for c in METRIC_COLUMNS]
+        # Секунды — в часах, как в отчете по спринту
+        cells[-3] = row['time_estimate'] / 3600
+        cells[-2] = row['time_spent'] / 3600
+        print(f"  {label}" + "".join(f"{_format_cell(c):>11}" for c in cells), file=out)
+    print("=" * width, file=out)
+
+
+def render_csv(table: MetricTable) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([*table.label_names, *METRIC_COLUMNS])
+    for row in table.rows():
+        writer.writerow([row[c] if row[c] is not None else '' for c in (*table.label_names, *METRIC_COLUMNS)])
+    return buffer.getvalue()
+
+
+def render_json(table: MetricTable) -> str:
+    return json.dumps({"by": table.by, "rows": table.rows()}, ensure_ascii=False, indent=2)
+
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Метрики по истории настоящих спринтов доски")
+    parser.add_argument("--last", type=int, metavar="N", help="Только последние N закрытых спринтов")
+    parser.add_argument("--by", choices=GROUPINGS, default="developer", help="Группировка (по умолчанию developer)")
+    parser.add_argument("--format", choices=["text", "json", "csv"], default="text", help="Формат вывода")
+    parser.add_argument("-o", "--output", metavar="FILE", help="Записать таблицу в файл")
+    args = parser.parse_args(argv)
+
+    try:
+        columns = load_history(args.last)
+    except JiraError as e:
+        print(f"Ошибка запроса к Jira: {e}")
+        sys.exit(1)
+    print(f"Спринтов: {len(columns.sprints)}, строк: {len(columns)}", file=sys.stderr)
+
+    with phase("aggregate"):
+        table = compute_metrics(columns, args.by)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.format == "json":
+            out.write(render_json(table) + "\n")
+        elif args.format == "csv":
+            out.write(render_csv(table))
+        else:
+            print_table(table, out)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
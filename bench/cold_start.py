@@ -0,0 +1,101 @@
+"""
+Холодный старт CLI
+
+Каждая команда запускается отдельным процессом (как из cron или скрипта)
+несколько раз подряд; выводятся медиана и минимум времени. Команды,
+которым нужна Jira, идут в локальную синтетическую Jira (fake_jira) с
+временным кешем: первый прогон заполняет кеш, остальные — теплые.
+
+Использование:
+    python bench/cold_start.py
+    python bench/cold_start.py --runs 20 --output cold_start.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_jira import make_server  # noqa: E402
+from synthetic_board import SyntheticBoard  # noqa: E402
+
+CLI = os.path.join(ROOT, "cli.py")
+
+
+def commands(sprint_id: int) -> list[tuple[str, list[str]]]:
+    return [
+        ("python -c pass", ["-c", "pass"]),
+        ("import jira_client", ["-c", "import jira_client"]),
+        ("jira-sprint --help", [CLI, "--help"]),
+        ("jira-sprint report --help", [CLI, "report", "--help"]),
+        ("jira-sprint list", [CLI, "list"]),
+        ("jira-sprint report -id", [CLI, "report", "-id", str(sprint_id)]),
+    ]
+
+
+def measure(args: list[str], env: dict, runs: int) -> list[float]:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args], cwd=ROOT, env=env, check=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Холодный старт команд jira-sprint")
+    parser.add_argument("--runs", type=int, default=10, help="Запусков каждой команды")
+    parser.add_argument("--issues", type=int, default=200, help="Задач в спринте синтетической доски")
+    parser.add_argument("--output", help="Записать результаты в JSON-файл")
+    args = parser.parse_args()
+
+    board = SyntheticBoard(sprints=6, issues_per_sprint=args.issues)
+    server = make_server("127.0.0.1", 0, board)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    sprint_id = board.sprints[-2]["id"]
+
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = {
+            **os.environ,
+            "JIRA_BASE_URL": f"http://127.0.0.1:{server.server_address[1]}",
+            "JIRA_TOKEN": "benchmark",
+            "JIRA_BOARD_ID": str(board.board_id),
+            "JIRA_CACHE_DB": os.path.join(cache_dir, "cache.sqlite3"),
+            "JIRA_CONFIG": os.path.join(cache_dir, "config.json"),
+        }
+        print(f"{'Команда':<28} {'Медиана':>10} {'Минимум':>10} {'Первый':>10}")
+        print("-" * 61)
+        for name, command in commands(sprint_id):
+            times = measure(command, env, args.runs)
+            result = {
+                "command": name,
+                "median": statistics.median(times),
+                "min": min(times),
+                "first": times[0],
+            }
+            results.append(result)
+            print(
+                f"{name:<28} {result['median'] * 1000:>8.0f}ms {result['min'] * 1000:>8.0f}ms "
+                f"{result['first'] * 1000:>8.0f}ms"
+            )
+    server.shutdown()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
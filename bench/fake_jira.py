@@ -0,0 +1,130 @@
+"""
+Локальная подмена Jira на основе синтетической доски
+
+Отвечает на те же REST-запросы, что использует jira_client, поэтому любой
+инструмент можно запустить против нее через JIRA_BASE_URL.
+
+С --max-inflight и --error-rate имитирует перегруженную Jira: 429 с
+Retry-After сверх предела одновременных запросов и случайные 503.
+
+Использование:
+    python bench/fake_jira.py --port 8081 --sprints 10 --issues 200
+    python bench/fake_jira.py --max-inflight 4 --error-rate 0.05
+    JIRA_BASE_URL=http://127.0.0.1:8081 JIRA_TOKEN=x python report_server.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from synthetic_board import SyntheticBoard
+
+
+class FakeJiraHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self._respond(url.path, dict(parse_qsl(url.query)))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send(400, {"errorMessages": ["invalid JSON"]})
+            return
+        self._respond(urlsplit(self.path).path, body)
+
+    def _respond(self, path: str, params: dict):
+        server = self.server
+        with server.lock:
+            server.inflight += 1
+            overloaded = server.max_inflight and server.inflight > server.max_inflight
+        try:
+            if overloaded:
+                server.throttled += 1
+                self._send(429, {"errorMessages": ["rate limit exceeded"]}, {"Retry-After": "1"})
+                return
+            if server.error_rate and random.random() < server.error_rate:
+                server.failed += 1
+                self._send(503, {"errorMessages": ["service unavailable"]})
+                return
+            if server.latency:
+                time.sleep(server.latency)
+            data = server.board.respond(path, params)
+            if data is None:
+                self._send(404, {"errorMessages": ["not found"]})
+            else:
+                self._send(200, data)
+        finally:
+            with server.lock:
+                server.inflight -= 1
+
+    def _send(self, status: int, data: dict, headers: dict | None = None):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(
+    host: str,
+    port: int,
+    board: SyntheticBoard,
+    latency: float = 0.0,
+    max_inflight: int = 0,
+    error_rate: float = 0.0
+) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), FakeJiraHandler)
+    server.board = board
+    server.latency = latency
+    server.max_inflight = max_inflight
+    server.error_rate = error_rate
+    server.inflight = 0
+    server.throttled = 0
+    server.failed = 0
+    server.lock = threading.Lock()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальная подмена Jira")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--sprints", type=int, default=10, help="Количество спринтов")
+    parser.add_argument("--issues", type=int, default=100, help="Задач в спринте")
+    parser.add_argument("--depth", type=int, default=8, help="Глубина changelog")
+    parser.add_argument("--carry-over", type=float, default=0.2, help="Доля переезжающих задач")
+    parser.add_argument("--latency", type=float, default=0.0, help="Искусственная задержка ответа, секунд")
+    parser.add_argument("--max-inflight", type=int, default=0, help="429 сверх этого числа одновременных запросов")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля случайных ответов 503")
+    args = parser.parse_args()
+
+    board = SyntheticBoard(
+        sprints=args.sprints,
+        issues_per_sprint=args.issues,
+        changelog_depth=args.depth,
+        carry_over_rate=args.carry_over
+    )
+    server = make_server(args.host, args.port, board, args.latency, args.max_inflight, args.error_rate)
+    print(f"Синтетическая Jira: http://{args.host}:{args.port} (доска {board.board_id}, {board.issue_count} задач)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
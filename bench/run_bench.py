@@ -0,0 +1,117 @@
+"""
+Бенчмарк горячих путей на синтетической доске
+
+Замеряет загрузку и разбор задач (через jira_client с подменным
+транспортом), categorize_issues и вывод отчета в text / JSON / CSV.
+
+Использование:
+    python bench/run_bench.py
+    python bench/run_bench.py --sizes 1000 10000 --depth 12 --output bench_output.txt
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Бенчмарк не ходит в Jira и не использует дисковый кеш
+os.environ.setdefault("JIRA_TOKEN", "benchmark")
+os.environ["JIRA_NO_CACHE"] = "1"
+
+import jira_client  # noqa: E402
+from synthetic_board import SyntheticBoard  # noqa: E402
+from sprint_report import categorize_issues, print_report, SprintCategorizer  # noqa: E402
+from report_model import render_json, render_csv  # noqa: E402
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_size(size: int, sprints: int, depth: int, carry_over_rate: float) -> dict:
+    board, generate_time = timed(
+        SyntheticBoard,
+        sprints=sprints,
+        issues_per_sprint=size,
+        changelog_depth=depth,
+        carry_over_rate=carry_over_rate
+    )
+    jira_client.set_transport(board.respond)
+    try:
+        all_sprints = jira_client.get_all_sprints(board.board_id)
+        real_ids = {s.id for s in all_sprints if jira_client.is_real_sprint(s)}
+        target = max((s for s in all_sprints if s.id in real_ids), key=lambda s: s.id)
+        # Сырые ответы строятся заранее, чтобы не мерить генератор
+        for key in board.sprint_keys[target.id]:
+            board.issue(key)
+
+        issues, fetch_time = timed(lambda: list(jira_client.iter_sprint_issues(target)))
+        stats, categorize_time = timed(
+            categorize_issues, issues, target.id, target.activated_ts, target.end_ts, real_ids
+        )
+
+        categorizer = SprintCategorizer(target.id, target.activated_ts, target.end_ts, real_ids)
+        for issue in issues:
+            categorizer.add(issue)
+        report = categorizer.report(target)
+
+        def render_text():
+            with redirect_stdout(io.StringIO()):
+                print_report(report)
+
+        _, text_time = timed(render_text)
+        _, json_time = timed(render_json, report)
+        _, csv_time = timed(render_csv, report)
+    finally:
+        jira_client.set_transport(None)
+
+    return {
+        "issues": len(issues),
+        "changelog_entries": sum(len(i.changelog) for i in issues),
+        "generate": generate_time,
+        "fetch_parse": fetch_time,
+        "categorize": categorize_time,
+        "render_text": text_time,
+        "render_json": json_time,
+        "render_csv": csv_time,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк отчета по спринту на синтетической доске")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Количество задач в целевом спринте")
+    parser.add_argument("--sprints", type=int, default=3, help="Количество спринтов на доске")
+    parser.add_argument("--depth", type=int, default=8, help="Глубина changelog задачи")
+    parser.add_argument("--carry-over", type=float, default=0.2, help="Доля переезжающих задач")
+    parser.add_argument("--output", help="Записать результаты в JSON-файл")
+    args = parser.parse_args()
+
+    phases = ["fetch_parse", "categorize", "render_text", "render_json", "render_csv"]
+    print(f"{'Задач':>8} {'Changelog':>10} " + " ".join(f"{p:>12}" for p in phases))
+    print("-" * (20 + 13 * len(phases)))
+    results = []
+    for size in args.sizes:
+        result = run_size(size, args.sprints, args.depth, args.carry_over)
+        results.append(result)
+        print(
+            f"{result['issues']:>8} {result['changelog_entries']:>10} "
+            + " ".join(f"{result[p]:>11.3f}s" for p in phases)
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""
+Синтетическая доска Jira для бенчмарков и офлайн-прогонов
+
+Генерирует спринты и задачи в формате ответов Jira REST API (agile и
+search) и отвечает на запросы jira_client.get через set_transport().
+Параметры: количество спринтов, задач в спринте, глубина changelog и доля
+задач, переезжающих в следующий спринт.
+
+Как и Jira, учитывает fields и expand=changelog, поддерживает JQL
+key in (...), sprint in (...), sprint = N и updated >= -Nm и урезает maxResults: до 50 в agile API,
+до 1000 в search API.
+
+Время задачи (timespent) разложено на ворклоги в пределах ее спринтов;
+они отдаются bulk-методами /worklog/updated (страницы по 1000 ID) и
+POST /worklog/list (тело запроса передается в respond вместо параметров).
+"""
+
+import random
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.000+0300"
+SPRINT_LENGTH = timedelta(days=14)
+STATUSES = ["Open", "In Progress", "Review", "Testing", "Reopened"]
+SPRINT_FIELD_SCHEMA = "com.pyxis.greenhopper.jira:gh-sprint"
+
+# Предельный maxResults: agile API и search API
+AGILE_MAX_RESULTS = 50
+SEARCH_MAX_RESULTS = 1000
+
+# Ворклогов на странице /worklog/updated и в одном запросе /worklog/list
+WORKLOG_PAGE_SIZE = 1000
+
+
+def _fmt(value: datetime) -> str:
+    return value.strftime(DATE_FORMAT)
+
+
+@dataclass
+class _IssueMeta:
+    key: str
+    number: int
+    assignee: int | None
+    story_points: float
+    created: datetime
+    sprints: list[int] = field(default_factory=list)
+    # (from_ids, to_ids, дата) — изменения поля Sprint
+    moves: list[tuple[list[int], list[int], datetime]] = field(default_factory=list)
+    closed_at: datetime | None = None
+
+
+class SyntheticBoard:
+    """Доска с детерминированно сгенерированной историей"""
+
+    def __init__(
+        self,
+        sprints: int = 10,
+        issues_per_sprint: int = 100,
+        changelog_depth: int = 8,
+        carry_over_rate: float = 0.2,
+        developers: int = 8,
+        board_id: int = 803,
+        story_points_field: str = "customfield_10080",
+        sprint_field: str = "customfield_10101",
+        seed: int = 42
+    ):
+        self.board_id = board_id
+        self.changelog_depth = changelog_depth
+        self.story_points_field = story_points_field
+        self.sprint_field = sprint_field
+        self.developers = developers
+        self.seed = seed
+        self.sprints: list[dict] = []
+        self.sprint_keys: dict[int, list[str]] = {}
+        self._meta: dict[str, _IssueMeta] = {}
+        self._raw: dict[str, dict] = {}
+        self._worklogs: dict[int, dict] | None = None
+        self._generate(sprints, issues_per_sprint, carry_over_rate)
+
+    # -------------------------------------------------------------------------
+    # Генерация
+    # -------------------------------------------------------------------------
+
+    def _generate(self, sprint_count: int, issues_per_sprint: int, carry_over_rate: float):
+        rng = random.Random(self.seed)
+        now = datetime.now().replace(microsecond=0)
+        # Последний спринт активен и заканчивается через неделю
+        first_start = now - SPRINT_LENGTH * (sprint_count - 1) - timedelta(days=7)
+        counter = 0
+        unfinished: list[str] = []
+
+        for n in range(sprint_count):
+            sprint_id = 1000 + n
+            start = first_start + SPRINT_LENGTH * n
+            end = start + SPRINT_LENGTH
+            active = n == sprint_count - 1
+            self.sprints.append({
+                "id": sprint_id,
+                "name": f"Sprint {n + 1}",
+                "state": "active" if active else "closed",
+                "startDate": _fmt(start),
+                "endDate": _fmt(end),
+                "activatedDate": _fmt(start),
+                **({} if active else {"completeDate": _fmt(end)}),
+                "originBoardId": self.board_id,
+            })
+
+            carried = [key for key in unfinished if rng.random() < carry_over_rate][:issues_per_sprint]
+            keys = []
+            for key in carried:
+                meta = self._meta[key]
+                meta.moves.append((list(meta.sprints), meta.sprints + [sprint_id], start - timedelta(hours=1)))
+                meta.sprints.append(sprint_id)
+                keys.append(key)
+
+            for _ in range(issues_per_sprint - len(carried)):
+                counter += 1
+                created = start - timedelta(days=rng.randint(1, 30))
+                meta = _IssueMeta(
+                    key=f"SYN-{counter}",
+                    number=counter,
+                    assignee=rng.randrange(self.developers) if rng.random() > 0.05 else None,
+                    story_points=rng.choice([0, 0.5, 1, 2, 3, 5, 8]),
+                    created=created,
+                    sprints=[sprint_id]
+                )
+                # Часть задач добавляется после старта спринта
+                if rng.random() < 0.25:
+                    added = start + timedelta(hours=rng.randint(1, 24 * 10))
+                else:
+                    added = start - timedelta(hours=rng.randint(1, 48))
+                meta.moves.append(([], [sprint_id], added))
+                self._meta[meta.key] = meta
+                keys.append(meta.key)
+
+            unfinished = []
+            for key in keys:
+                meta = self._meta[key]
+                if not active and rng.random() < 0.7:
+                    meta.closed_at = start + timedelta(hours=rng.randint(24, 24 * 13))
+                elif not active:
+                    unfinished.append(key)
+            self.sprint_keys[sprint_id] = keys
+
+    def _build_issue(self, key: str) -> dict:
+        meta = self._meta[key]
+        rng = random.Random(self.seed * 1_000_003 + meta.number)
+        histories = []
+        history_id = meta.number * 1000
+
+        def add_history(created: datetime, items: list[dict]):
+            nonlocal history_id
+            history_id += 1
+            histories.append({"id": str(history_id), "created": _fmt(created), "items": items})
+
+        for from_ids, to_ids, date in meta.moves:
+            add_history(date, [{
+                "field": "Sprint",
+                "from": ", ".join(map(str, from_ids)),
+                "to": ", ".join(map(str, to_ids)),
+                "fromString": ", ".join(self._sprint_name(s) for s in from_ids),
+                "toString": ", ".join(self._sprint_name(s) for s in to_ids),
+            }])
+
+        last_sprint = self._sprint_by_id(meta.sprints[-1])
+        window_end = meta.closed_at or datetime.strptime(last_sprint["endDate"], DATE_FORMAT)
+        status = "Open"
+        sp_changed = False
+        fillers = max(self.changelog_depth - len(histories) - (1 if meta.closed_at else 0), 0)
+        for n in range(fillers):
+            date = meta.created + (window_end - meta.created) * (n + 1) / (fillers + 2)
+            if not sp_changed and rng.random() < 0.15:
+                # Единственная переоценка: старое значение -> текущее
+                sp_changed = True
+                add_history(date, [{
+                    "field": "Story Points",
+                    "from": None, "to": None,
+                    "fromString": str(rng.choice([1, 2, 3, 5])), "toString": str(meta.story_points),
+                }])
+                continue
+            new_status = STATUSES[(STATUSES.index(status) + 1) % len(STATUSES)]
+            add_history(date, [{
+                "field": "status", "from": None, "to": None,
+                "fromString": status, "toString": new_status,
+            }])
+            status = new_status
+        if meta.closed_at:
+            add_history(meta.closed_at, [{
+                "field": "status", "from": None, "to": None,
+                "fromString": status, "toString": "Closed",
+            }])
+            status = "Closed"
+        histories.sort(key=lambda h: h["created"])
+
+        updated = max([meta.created] + [datetime.strptime(h["created"], DATE_FORMAT) for h in histories])
+        assignee = None
+        if meta.assignee is not None:
+            assignee = {"key": f"dev{meta.assignee}", "displayName": f"Developer {meta.assignee}"}
+        return {
+            "id": str(10000 + meta.number),
+            "key": key,
+            "fields": {
+                "summary": f"Synthetic issue {meta.number}",
+                "status": {"name": status},
+                "assignee": assignee,
+                self.story_points_field: meta.story_points,
+                "created": _fmt(meta.created),
+                "updated": _fmt(updated),
+                "timeoriginalestimate": int(meta.story_points * 4 * 3600),
+                "timespent": int(meta.story_points * rng.uniform(2, 6) * 3600),
+                self.sprint_field: [
+                    {"id": s, "name": self._sprint_name(s), "state": self._sprint_by_id(s)["state"],
+                     "boardId": self.board_id}
+                    for s in meta.sprints
+                ],
+            },
+            "changelog": {
+                "startAt": 0,
+                "maxResults": len(histories),
+                "total": len(histories),
+                "histories": histories,
+            },
+        }
+
+    def _sprint_by_id(self, sprint_id: int) -> dict:
+        return self.sprints[sprint_id - 1000]
+
+    def _sprint_name(self, sprint_id: int) -> str:
+        return self._sprint_by_id(sprint_id)["name"]
+
+    # -------------------------------------------------------------------------
+    # Доступ к данным
+    # -------------------------------------------------------------------------
+
+    @property
+    def issue_count(self) -> int:
+        return len(self._meta)
+
+    def issue(self, key: str) -> dict | None:
+        if key not in self._meta:
+            return None
+        raw = self._raw.get(key)
+        if raw is None:
+            raw = self._raw[key] = self._build_issue(key)
+        return raw
+
+    def worklogs(self) -> dict[int, dict]:
+        """Ворклоги всех задач по ID (генерируются при первом обращении)"""
+        if self._worklogs is not None:
+            return self._worklogs
+        worklogs = {}
+        now = datetime.now()
+        for key, meta in self._meta.items():
+            raw = self.issue(key)
+            spent = raw["fields"]["timespent"]
+            if not spent:
+                continue
+            rng = random.Random(self.seed * 7_000_003 + meta.number)
+            first = datetime.strptime(self._sprint_by_id(meta.sprints[0])["startDate"], DATE_FORMAT)
+            last = meta.closed_at or min(now, datetime.strptime(self._sprint_by_id(meta.sprints[-1])["endDate"], DATE_FORMAT))
+            parts = rng.randint(1, 4)
+            for n in range(parts):
+                seconds = spent // parts + (spent % parts if n == parts - 1 else 0)
+                started = first + (last - first) * rng.random()
+                # Часть времени списывается задним числом
+                updated = min(started + timedelta(hours=rng.choice([0, 1, 30])), now)
+                author = meta.assignee if meta.assignee is not None and rng.random() < 0.8 else rng.randrange(self.developers)
+                worklog_id = meta.number * 10 + n
+                worklogs[worklog_id] = {
+                    "id": str(worklog_id),
+                    "issueId": raw["id"],
+                    "author": {"key": f"dev{author}", "name": f"dev{author}", "displayName": f"Developer {author}"},
+                    "started": _fmt(started),
+                    "timeSpentSeconds": seconds,
+                    "updated": _fmt(updated),
+                }
+        self._worklogs = worklogs
+        return worklogs
+
+    def respond(self, url: str, params: dict | None = None) -> dict | list | None:
+        """Ответить на запрос так, как это сделала бы Jira"""
+        params = params or {}
+        start_at = int(params.get("startAt", 0))
+        max_results = int(params.get("maxResults", 50))
+
+        if re.search(r"/board/\d+/sprint$", url):
+            max_results = min(max_results, AGILE_MAX_RESULTS)
+            states = params.get("state")
+            values = [
+                s for s in self.sprints
+                if not states or s["state"] in states.split(",")
+            ]
+            page = values[start_at:start_at + max_results]
+            return {
+                "maxResults": max_results,
+                "startAt": start_at,
+                "isLast": start_at + max_results >= len(values),
+                "values": page,
+            }
+
+        match = re.search(r"/sprint/(\d+)$", url)
+        if match:
+            sprint_id = int(match.group(1))
+            return self._sprint_by_id(sprint_id) if sprint_id in self.sprint_keys else None
+
+        match = re.search(r"/sprint/(\d+)/issue$", url)
+        if match:
+            keys = self._filter_keys(self.sprint_keys.get(int(match.group(1)), []), params.get("jql"))
+            return self._issue_page(keys, start_at, min(max_results, AGILE_MAX_RESULTS), params)
+
+        if url.endswith("/rest/api/2/search"):
+            keys = self._filter_keys(list(self._meta), params.get("jql"))
+            return self._issue_page(keys, start_at, min(max_results, SEARCH_MAX_RESULTS), params)
+
+        if url.endswith("/rest/api/2/worklog/updated"):
+            since = int(params.get("since", 0))
+            changed = sorted(
+                (int(datetime.strptime(w["updated"], "%Y-%m-%dT%H:%M:%S.%f%z").timestamp() * 1000), worklog_id)
+                for worklog_id, w in self.worklogs().items()
+            )
+            changed = [(ts, worklog_id) for ts, worklog_id in changed if ts >= since]
+            page = changed[:WORKLOG_PAGE_SIZE]
+            return {
+                "values": [{"worklogId": worklog_id, "updatedTime": ts} for ts, worklog_id in page],
+                "since": since,
+                "until": page[-1][0] if page else since,
+                "lastPage": len(changed) <= WORKLOG_PAGE_SIZE,
+            }
+
+        if url.endswith("/rest/api/2/worklog/deleted"):
+            since = int(params.get("since", 0))
+            return {"values": [], "since": since, "until": since, "lastPage": True}
+
+        if url.endswith("/rest/api/2/worklog/list"):
+            worklogs = self.worklogs()
+            ids = [int(i) for i in params.get("ids", [])][:WORKLOG_PAGE_SIZE]
+            return [worklogs[i] for i in ids if i in worklogs]
+
+        if url.endswith("/rest/api/2/field"):
+            return [
+                {"id": "summary", "name": "Summary", "custom": False},
+                {"id": self.story_points_field, "name": "Story Points", "custom": True,
+                 "schema": {"type": "number", "custom": "com.atlassian.jira.plugin.system.customfieldtypes:float"}},
+                {"id": self.sprint_field, "name": "Sprint", "custom": True,
+                 "schema": {"type": "array", "items": "string", "custom": SPRINT_FIELD_SCHEMA}},
+            ]
+
+        return None
+
+    def _filter_keys(self, keys: list[str], jql: str | None) -> list[str]:
+        if not jql:
+            return keys
+        match = re.search(r"key in \(([^)]*)\)", jql)
+        if match:
+            wanted = {k.strip() for k in match.group(1).split(",")}
+            keys = [k for k in keys if k in wanted]
+        match = re.search(r"sprint in \(([^)]*)\)", jql)
+        if match:
+            wanted = {int(s) for s in match.group(1).split(",")}
+            keys = [k for k in keys if wanted.intersection(self._meta[k].sprints)]
+        match = re.search(r"sprint = (\d+)", jql)
+        if match:
+            sprint_id = int(match.group(1))
+            keys = [k for k in keys if sprint_id in self._meta[k].sprints]
+        match = re.search(r"updated >= -(\d+)m", jql)
+        if match:
+            since = _fmt(datetime.now() - timedelta(minutes=int(match.group(1))))
+            keys = [k for k in keys if self.issue(k)["fields"]["updated"] >= since]
+        return keys
+
+    def _issue_page(self, keys: list[str], start_at: int, max_results: int, params: dict) -> dict:
+        fields = params.get("fields")
+        wanted = set(fields.split(",")) if fields and fields != "*all" else None
+        changelog = "changelog" in (params.get("expand") or "")
+        issues = []
+        for key in keys[start_at:start_at + max_results]:
+            raw = self.issue(key)
+            issue = {"id": raw["id"], "key": key}
+            issue["fields"] = raw["fields"] if wanted is None else {
+                name: value for name, value in raw["fields"].items() if name in wanted
+            }
+            if changelog:
+                issue["changelog"] = raw["changelog"]
+            issues.append(issue)
+        return {
+            "startAt": start_at,
+            "maxResults": max_results,
+            "total": len(keys),
+            "issues": issues,
+        }
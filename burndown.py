@@ -0,0 +1,260 @@
+"""
+Burndown и изменения состава спринта по дням
+
+Из changelog каждой задачи берутся события трех видов: вход/выход из
+спринта (поле Sprint), закрытие/переоткрытие (status) и изменение оценки
+(Story Points). События всех задач сливаются в один поток, сортируются и
+проходятся один раз; по дням копятся добавленные, убранные и закрытые SP.
+Сложность O(E log E) по числу событий вместо O(дни × задачи × история).
+
+Закрытые SP за день — чистое значение: переоткрытие или вывод закрытой
+задачи из спринта их уменьшает. Изменение оценки задачи в спринте
+считается добавлением или удалением объема.
+
+Использование:
+    python burndown.py -id 6783 [--format text|csv|json]
+    python sprint_report.py -id 6783 --burndown
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, TextIO
+
+from issue_history import STATUS_FIELD, CLOSED_STATUS
+from jira_client import (
+    STORY_POINTS_NAME, Issue, JiraError, Sprint,
+    get_sprint_by_id, get_sprint_issues_with_changelog, get_story_points_name
+)
+from timestamps import to_datetime
+
+# Виды событий
+_MEMBER, _CLOSED, _POINTS = 0, 1, 2
+
+
+@dataclass(slots=True)
+class BurndownDay:
+    """SP за один день спринта; scope и remaining — на конец дня"""
+    date: date
+    added: float = 0
+    removed: float = 0
+    closed: float = 0
+    scope: float = 0
+    remaining: float = 0
+
+
+@dataclass
+class Burndown:
+    """Ряды burndown спринта"""
+    sprint: Sprint
+    committed: float = 0  # объем на момент старта спринта
+    days: list[BurndownDay] = field(default_factory=list)
+
+
+def _points(value: str | None) -> float:
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+class BurndownBuilder:
+    """
+    Сбор событий по задачам и один проход по отсортированному потоку.
+
+    Задачи подаются через add() (или tap() поверх потока задач) до того,
+    как из них удален changelog; от каждой задачи остаются только
+    начальное состояние и компактные кортежи событий.
+    """
+
+    def __init__(self, sprint: Sprint, points_field: str = STORY_POINTS_NAME):
+        """points_field — имя поля Story Points в changelog (JiraClient.story_points_name)"""
+        self.sprint = sprint
+        self.points_field = points_field
+        self.start = sprint.activated_ts or sprint.start_ts
+        self.end = sprint.end_ts
+        # Состояние задачи до первого события: [SP, закрыта, в спринте]
+        self._initial: list[list] = []
+        # (дата, номер задачи, вид, значение)
+        self._events: list[tuple] = []
+
+    def add(self, issue: Issue):
+        n = len(self._initial)
+        events = self._events
+
+        points = [e for e in issue.changelog if e.field == self.points_field and e.date is not None]
+        statuses = [e for e in issue.changelog if e.field == STATUS_FIELD and e.date is not None]
+        points.sort(key=lambda e: e.date)
+        statuses.sort(key=lambda e: e.date)
+
+        sp = _points(points[0].from_string) if points else issue.story_points
+        initial_status = statuses[0].from_string if statuses else issue.status
+        closed = (initial_status or '').lower() == CLOSED_STATUS
+        for e in points:
+            events.append((e.date, n, _POINTS, _points(e.to_string)))
+        for e in statuses:
+            events.append((e.date, n, _CLOSED, (e.to_string or '').lower() == CLOSED_STATUS))
+
+        member = False
+        intervals = issue.history.sprint_intervals.get(self.sprint.id)
+        if not intervals:
+            # Задача в спринте без записи в changelog — с момента создания
+            intervals = [(issue.created, None)]
+        for added, removed in intervals:
+            if added is None:
+                member = True
+            else:
+                events.append((added, n, _MEMBER, True))
+            if removed is not None:
+                events.append((removed, n, _MEMBER, False))
+
+        self._initial.append([sp, closed, member])
+
+    def tap(self, issues: Iterable[Issue]) -> Iterator[Issue]:
+        """Пропустить поток задач через add(), не меняя его"""
+        for issue in issues:
+            self.add(issue)
+            yield issue
+
+    def result(self) -> Burndown:
+        burndown = Burndown(self.sprint)
+        if self.start is None or self.end is None:
+            return burndown
+
+        state = self._initial
+        scope = sum(sp for sp, _, member in state if member)
+        done = sum(sp for sp, closed, member in state if member and closed)
+        # При равных датах сначала вход в спринт, затем прочие изменения
+        events = sorted(self._events, key=lambda e: (e[0], e[2] != _MEMBER))
+
+        def apply(event: tuple) -> tuple[float, float]:
+            """Применить событие; вернуть изменения объема и закрытых SP"""
+            _, n, kind, value = event
+            s = state[n]
+            old_scope = s[0] if s[2] else 0
+            old_done = s[0] if s[2] and s[1] else 0
+            if kind == _MEMBER:
+                s[2] = value
+            elif kind == _CLOSED:
+                s[1] = value
+            else:
+                s[0] = value
+            return (s[0] if s[2] else 0) - old_scope, (s[0] if s[2] and s[1] else 0) - old_done
+
+        i = 0
+        while i < len(events) and events[i][0] <= self.start:
+            d_scope, d_done = apply(events[i])
+            scope += d_scope
+            done += d_done
+            i += 1
+        burndown.committed = scope
+
+        # Дни в локальном поясе; по активному спринту — до текущего момента
+        end = min(self.end, int(time.time()))
+        start_dt = to_datetime(self.start)
+        day = start_dt.date()
+        while True:
+            boundary = datetime.combine(day + timedelta(days=1), datetime.min.time(), start_dt.tzinfo)
+            day_end = min(int(boundary.timestamp()), end + 1)
+            row = BurndownDay(day)
+            while i < len(events) and events[i][0] < day_end:
+                d_scope, d_done = apply(events[i])
+                scope += d_scope
+                done += d_done
+                if d_scope > 0:
+                    row.added += d_scope
+                elif d_scope < 0:
+                    row.removed -= d_scope
+                row.closed += d_done
+                i += 1
+            row.scope = scope
+            row.remaining = scope - done
+            burndown.days.append(row)
+            if day_end > end:
+                break
+            day += timedelta(days=1)
+        return burndown
+
+
+def build_burndown(sprint: Sprint, issues: Iterable[Issue], points_field: str = STORY_POINTS_NAME) -> Burndown:
+    builder = BurndownBuilder(sprint, points_field)
+    for issue in issues:
+        builder.add(issue)
+    return builder.result()
+
+
+# =============================================================================
+# Вывод
+# =============================================================================
+
+def burndown_to_dict(burndown: Burndown) -> dict:
+    return {
+        "committed": burndown.committed,
+        "days": [{**asdict(day), "date": day.date.isoformat()} for day in burndown.days],
+    }
+
+
+def render_burndown_csv(burndown: Burndown) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["date", "committed", "added", "removed", "closed", "scope", "remaining"])
+    for day in burndown.days:
+        writer.writerow([
+            day.date.isoformat(), burndown.committed,
+            day.added, day.removed, day.closed, day.scope, day.remaining
+        ])
+    return buffer.getvalue()
+
+
+def print_burndown(burndown: Burndown, out: TextIO | None = None):
+    out = out or sys.stdout
+    print(f"\n{'='*90}", file=out)
+    print(f"BURNDOWN (SP): {burndown.sprint.name}, на старте {burndown.committed:.2f}", file=out)
+    print(f"{'='*90}", file=out)
+    print(f"  {'Дата':<12} {'Добавлено':>10} {'Убрано':>10} {'Закрыто':>10} {'Объем':>10} {'Осталось':>10}", file=out)
+    print(f"  {'-'*66}", file=out)
+    for day in burndown.days:
+        print(
+            f"  {day.date.isoformat():<12} {day.added:>10.2f} {day.removed:>10.2f} "
+            f"{day.closed:>10.2f} {day.scope:>10.2f} {day.remaining:>10.2f}",
+            file=out
+        )
+    print(f"  {'-'*66}", file=out)
+
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Burndown спринта по дням")
+    parser.add_argument("-id", type=int, required=True, help="ID спринта")
+    parser.add_argument(
+        "--format",
+        choices=["text", "json", "csv"],
+        default="text",
+        help="Формат вывода (по умолчанию text)"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        sprint = get_sprint_by_id(args.id)
+        if sprint is None:
+            print(f"Спринт с ID {args.id} не найден!")
+            sys.exit(1)
+        burndown = build_burndown(sprint, get_sprint_issues_with_changelog(args.id), get_story_points_name())
+    except JiraError as e:
+        print(f"Ошибка запроса к Jira: {e}")
+        sys.exit(1)
+
+    if args.format == "json":
+        print(json.dumps(burndown_to_dict(burndown), ensure_ascii=False, indent=2))
+    elif args.format == "csv":
+        sys.stdout.write(render_burndown_csv(burndown))
+    else:
+        print_burndown(burndown)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Единая точка входа: jira-sprint <команда> [аргументы команды]
+
+Команды — те же инструменты, что и отдельные скрипты, с теми же
+аргументами (jira-sprint report -id 6783 == python sprint_report.py -id 6783).
+Все они работают через общий клиент по умолчанию (jira_client.get_client):
+одна сессия с пулом соединений, один каталог спринтов и один кеш на процесс.
+
+Модуль команды импортируется только после выбора команды, а jira_client
+не импортирует requests до первого запроса, поэтому jira-sprint --help и
+jira-sprint <команда> --help не платят за загрузку HTTP-стека.
+
+Использование:
+    jira-sprint list
+    jira-sprint report -id 6783 --format json
+    jira-sprint report --last 10
+    python cli.py report --help
+"""
+
+import argparse
+import importlib
+import sys
+
+# Команда -> (модуль с main(argv, prog), описание)
+COMMANDS = {
+    "list": ("list_sprints", "Список спринтов доски"),
+    "report": ("sprint_report", "Отчет по спринту или тренд по нескольким спринтам"),
+    "burndown": ("burndown", "Burndown спринта по дням"),
+    "graph": ("sprint_graph", "Граф переносов задач между спринтами"),
+    "analytics": ("analytics", "Метрики по истории спринтов (нужен numpy)"),
+    "rollup": ("rollup", "Сводный отчет по нескольким доскам"),
+    "serve": ("report_server", "HTTP-сервер отчетов"),
+}
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog="jira-sprint",
+        description="Отчеты по спринтам Jira",
+        epilog="Аргументы команды: jira-sprint <команда> --help"
+    )
+    commands = parser.add_subparsers(dest="command", metavar="<команда>", required=True)
+    for name, (_, description) in COMMANDS.items():
+        # Аргументы команды разбирает ее собственный main(), сюда они приходят как есть
+        commands.add_parser(name, help=description, add_help=False)
+
+    args, rest = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    module = importlib.import_module(COMMANDS[args.command][0])
+    module.main(rest, prog=f"jira-sprint {args.command}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Индексированная модель changelog задачи
+
+Changelog разбирается один раз при загрузке задачи: записи хранятся в
+компактных объектах со __slots__, а для отчета заранее строятся интервалы
+членства в спринтах (по числовым ID из полей from/to) и отсортированный
+список переходов статусов. Все даты — UTC epoch (int).
+"""
+
+import sys
+from bisect import bisect_right
+
+SPRINT_FIELD = 'Sprint'
+STATUS_FIELD = 'status'
+CLOSED_STATUS = 'closed'
+
+
+class ChangelogEntry:
+    """Одно изменение поля задачи"""
+    __slots__ = ('date', 'field', 'from_value', 'to_value', 'from_string', 'to_string')
+
+    def __init__(
+        self,
+        date: int | None,
+        field: str | None,
+        from_value: str | None,
+        to_value: str | None,
+        from_string: str | None,
+        to_string: str | None
+    ):
+        self.date = date
+        self.field = sys.intern(field) if field else field
+        self.from_value = from_value
+        self.to_value = to_value
+        self.from_string = from_string
+        self.to_string = to_string
+
+    def __repr__(self) -> str:
+        return f"ChangelogEntry({self.date}, {self.field!r}, {self.from_string!r} -> {self.to_string!r})"
+
+
+def parse_sprint_ids(value: str | None) -> frozenset[int]:
+    """Разобрать значение поля Sprint из changelog: '6783, 6790' -> {6783, 6790}"""
+    if not value:
+        return frozenset()
+    ids = set()
+    for part in value.split(','):
+        part = part.strip()
+        if part.isdigit():
+            ids.add(int(part))
+    return frozenset(ids)
+
+
+def sprint_moves(changelog: list[ChangelogEntry]) -> list[tuple[int, int, int]]:
+    """
+    Переносы задачи между спринтами: (из спринта, в спринт, дата).
+
+    Jira оставляет закрытые спринты в поле Sprint, поэтому источником
+    переноса считается спринт, в который задача попала последней из тех,
+    где она была до изменения.
+    """
+    entries = sorted(
+        (e for e in changelog if e.field == SPRINT_FIELD and e.date is not None),
+        key=lambda e: e.date
+    )
+    joined: dict[int, int] = {}  # спринт -> когда задача в него попала
+    moves = []
+    for entry in entries:
+        from_ids = parse_sprint_ids(entry.from_value)
+        to_ids = parse_sprint_ids(entry.to_value)
+        added = to_ids - from_ids
+        if added and from_ids:
+            source = max(from_ids, key=lambda s: (joined.get(s, -1), s))
+            moves.extend((source, target, entry.date) for target in sorted(added))
+        for sprint_id in from_ids - to_ids:
+            joined.pop(sprint_id, None)
+        for sprint_id in added:
+            joined[sprint_id] = entry.date
+    return moves
+
+
+class IssueHistory:
+    """
+    Факты из changelog, нужные для категоризации.
+
+    sprint_intervals: ID спринта -> список интервалов членства (start, end),
+        end = None для незакрытого интервала.
+    sprint_sources: ID спринта -> спринты, из которых задача в него переносилась.
+    status_dates / status_names: переходы статусов, отсортированные по дате.
+    closed_date: дата последнего перехода в Closed.
+    """
+    __slots__ = ('sprint_intervals', 'sprint_sources', 'status_dates', 'status_names', 'closed_date')
+
+    def __init__(self):
+        self.sprint_intervals: dict[int, list[tuple]] = {}
+        self.sprint_sources: dict[int, frozenset[int]] = {}
+        self.status_dates: list[int] = []
+        self.status_names: list[str] = []
+        self.closed_date: int | None = None
+
+    @classmethod
+    def from_changelog(cls, changelog: list[ChangelogEntry], created: int | None) -> "IssueHistory":
+        history = cls()
+        sprint_entries = []
+        status_entries = []
+        for entry in changelog:
+            if entry.date is None:
+                continue
+            if entry.field == SPRINT_FIELD:
+                sprint_entries.append(entry)
+            elif entry.field == STATUS_FIELD:
+                status_entries.append(entry)
+
+        sprint_entries.sort(key=lambda e: e.date)
+        open_since: dict[int, int | None] = {}
+        sources: dict[int, set[int]] = {}
+        for n, entry in enumerate(sprint_entries):
+            from_ids = parse_sprint_ids(entry.from_value)
+            to_ids = parse_sprint_ids(entry.to_value)
+            if n == 0:
+                # Спринты из первого "from" — задача была в них с момента создания
+                for sprint_id in from_ids:
+                    open_since[sprint_id] = created
+            for sprint_id in from_ids - to_ids:
+                start = open_since.pop(sprint_id, created)
+                history.sprint_intervals.setdefault(sprint_id, []).append((start, entry.date))
+            for sprint_id in to_ids - from_ids:
+                open_since.setdefault(sprint_id, entry.date)
+            if from_ids:
+                for sprint_id in to_ids:
+                    sources.setdefault(sprint_id, set()).update(from_ids - {sprint_id})
+        for sprint_id, start in open_since.items():
+            history.sprint_intervals.setdefault(sprint_id, []).append((start, None))
+        history.sprint_sources = {k: frozenset(v) for k, v in sources.items()}
+
+        status_entries.sort(key=lambda e: e.date)
+        history.status_dates = [e.date for e in status_entries]
+        history.status_names = [sys.intern(e.to_string or '') for e in status_entries]
+        for date, name in zip(history.status_dates, history.status_names):
+            if name.lower() == CLOSED_STATUS:
+                history.closed_date = date
+        return history
+
+    def added_date(self, sprint_id: int) -> int | None:
+        """Самая ранняя дата попадания задачи в спринт"""
+        intervals = self.sprint_intervals.get(sprint_id)
+        if not intervals:
+            return None
+        starts = [start for start, _ in intervals if start is not None]
+        return min(starts) if starts else None
+
+    def previous_sprints(self, sprint_id: int) -> frozenset[int]:
+        """Спринты, из которых задача переносилась в указанный"""
+        return self.sprint_sources.get(sprint_id, frozenset())
+
+    def status_at(self, date: int) -> str | None:
+        """Статус задачи на момент date (None — до первого перехода)"""
+        n = bisect_right(self.status_dates, date)
+        return self.status_names[n - 1] if n else None
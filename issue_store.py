@@ -0,0 +1,443 @@
+"""
+Локальное хранилище задач, changelog и спринтов (SQLite)
+
+Закрытые спринты не меняются, поэтому после первой загрузки их задачи
+отдаются с диска без запросов к Jira. Для активных спринтов хранится
+время последней синхронизации и поле updated каждой задачи, что позволяет
+докачивать только изменившиеся задачи.
+
+Вместе с задачей сохраняются ее переносы между спринтами (sprint_moves),
+так что граф переносов по доске читается одним запросом.
+
+Ворклоги хранятся отдельно от задач (связь — по ID задачи): они
+синхронизируются по всему экземпляру Jira, см. JiraClient.get_worklogs.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Iterator
+
+from issue_history import sprint_moves
+
+# Версия схемы: при несовпадении кеш пересоздается
+SCHEMA_VERSION = 7
+
+DEFAULT_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "jira-sprint-report",
+    "cache.sqlite3"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS sprints (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    state TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    activated_date TEXT,
+    complete_date TEXT
+);
+CREATE TABLE IF NOT EXISTS board_sprints (
+    board_id INTEGER NOT NULL,
+    sprint_id INTEGER NOT NULL,
+    PRIMARY KEY (board_id, sprint_id)
+);
+CREATE TABLE IF NOT EXISTS issues (
+    key TEXT PRIMARY KEY,
+    summary TEXT,
+    story_points REAL,
+    status TEXT,
+    assignee TEXT,
+    assignee_key TEXT,
+    created INTEGER,
+    updated INTEGER,
+    time_estimate INTEGER,
+    time_spent INTEGER,
+    issue_id TEXT,
+    provisional INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS changelog (
+    issue_key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    date INTEGER,
+    field TEXT,
+    from_value TEXT,
+    to_value TEXT,
+    from_string TEXT,
+    to_string TEXT,
+    PRIMARY KEY (issue_key, seq)
+);
+CREATE TABLE IF NOT EXISTS sprint_issues (
+    sprint_id INTEGER NOT NULL,
+    issue_key TEXT NOT NULL,
+    PRIMARY KEY (sprint_id, issue_key)
+);
+CREATE TABLE IF NOT EXISTS sprint_moves (
+    issue_key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    from_sprint INTEGER NOT NULL,
+    to_sprint INTEGER NOT NULL,
+    moved_at INTEGER,
+    PRIMARY KEY (issue_key, seq)
+);
+CREATE INDEX IF NOT EXISTS sprint_moves_from ON sprint_moves (from_sprint);
+CREATE INDEX IF NOT EXISTS sprint_moves_to ON sprint_moves (to_sprint);
+CREATE TABLE IF NOT EXISTS worklogs (
+    id INTEGER PRIMARY KEY,
+    issue_id TEXT NOT NULL,
+    author_key TEXT,
+    author TEXT,
+    started INTEGER,
+    time_spent INTEGER,
+    updated INTEGER
+);
+CREATE INDEX IF NOT EXISTS worklogs_started ON worklogs (started);
+CREATE TABLE IF NOT EXISTS sprint_sync (
+    sprint_id INTEGER PRIMARY KEY,
+    synced_at TEXT NOT NULL,
+    state TEXT
+);
+"""
+
+
+def _to_text(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def _from_text(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _sprint_from_row(row: tuple):
+    from jira_client import Sprint
+
+    return Sprint(
+        id=row[0],
+        name=row[1],
+        state=row[2],
+        start_date=_from_text(row[3]),
+        end_date=_from_text(row[4]),
+        activated_date=_from_text(row[5]),
+        complete_date=_from_text(row[6])
+    )
+
+
+class IssueStore:
+    """
+    Кеш задач и спринтов на диске.
+    Одно соединение используется из нескольких потоков, доступ к нему
+    сериализуется блокировкой.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self.lock = threading.RLock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_schema()
+
+    def _init_schema(self):
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or int(row[0]) != SCHEMA_VERSION:
+            with self.conn:
+                tables = self.conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name != 'meta'"
+                ).fetchall()
+                for (table,) in tables:
+                    self.conn.execute(f"DROP TABLE {table}")
+                self.conn.execute("DELETE FROM meta")
+                self.conn.executescript(SCHEMA)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                    (str(SCHEMA_VERSION),)
+                )
+
+    def close(self):
+        self.conn.close()
+
+    def get_meta(self, key: str) -> str | None:
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # -------------------------------------------------------------------------
+    # Спринты
+    # -------------------------------------------------------------------------
+
+    def save_sprints(self, sprints: list):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sprints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        s.id, s.name, s.state,
+                        _to_text(s.start_date), _to_text(s.end_date),
+                        _to_text(s.activated_date), _to_text(s.complete_date)
+                    )
+                    for s in sprints
+                ]
+            )
+
+    def get_sprint(self, sprint_id: int):
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM sprints WHERE id = ?", (sprint_id,)).fetchone()
+        return _sprint_from_row(row) if row is not None else None
+
+    def save_board_sprints(self, board_id: int, sprints: list, loaded_at: float):
+        """Сохранить полный состав спринтов доски (каталог) и время его загрузки"""
+        self.save_sprints(sprints)
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM board_sprints WHERE board_id = ?", (board_id,))
+            self.conn.executemany(
+                "INSERT INTO board_sprints VALUES (?, ?)",
+                [(board_id, s.id) for s in sprints]
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (f"catalog_loaded:{board_id}", repr(loaded_at))
+            )
+
+    def load_board_sprints(self, board_id: int) -> tuple[list, float] | None:
+        """Каталог спринтов доски и время его загрузки; None, если его нет"""
+        loaded_at = self.get_meta(f"catalog_loaded:{board_id}")
+        if loaded_at is None:
+            return None
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT s.* FROM board_sprints b JOIN sprints s ON s.id = b.sprint_id "
+                "WHERE b.board_id = ? ORDER BY s.id",
+                (board_id,)
+            ).fetchall()
+        return [_sprint_from_row(row) for row in rows], float(loaded_at)
+
+    # -------------------------------------------------------------------------
+    # Синхронизация спринтов
+    # -------------------------------------------------------------------------
+
+    def get_sync(self, sprint_id: int) -> tuple[datetime, str] | None:
+        """Время последней синхронизации спринта и его состояние на тот момент"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT synced_at, state FROM sprint_sync WHERE sprint_id = ?", (sprint_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return _from_text(row[0]), row[1]
+
+    def get_issue_versions(self, sprint_id: int) -> dict[str, int | None]:
+        """
+        Поле updated для всех сохраненных задач спринта. У предварительных
+        задач (собранных из вебхука) — None: сверка скачает их заново.
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                """
+                SELECT i.key, CASE WHEN i.provisional THEN NULL ELSE i.updated END
+                FROM sprint_issues si
+                JOIN issues i ON i.key = si.issue_key
+                WHERE si.sprint_id = ?
+                """,
+                (sprint_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def save_sprint_keys(self, sprint_id: int, keys: list[str], state: str | None):
+        """Сохранить состав спринта и отметить время синхронизации"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM sprint_issues WHERE sprint_id = ?", (sprint_id,))
+            self.conn.executemany(
+                "INSERT INTO sprint_issues VALUES (?, ?)",
+                [(sprint_id, key) for key in keys]
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sprint_sync VALUES (?, ?, ?)",
+                (sprint_id, datetime.now().isoformat(), state)
+            )
+
+    # -------------------------------------------------------------------------
+    # Задачи
+    # -------------------------------------------------------------------------
+
+    def save_issues(self, issues: list, provisional: bool = False):
+        """
+        provisional — задачи собраны не из полного ответа Jira (поля и
+        changelog из вебхука могут быть неполными, если события терялись):
+        при следующей сверке они скачиваются заново, см. get_issue_versions.
+        """
+        keys = [(i.key,) for i in issues]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        i.key, i.summary, i.story_points, i.status,
+                        i.assignee, i.assignee_key,
+                        i.created, i.updated,
+                        i.time_estimate, i.time_spent, i.id, int(provisional)
+                    )
+                    for i in issues
+                ]
+            )
+            self.conn.executemany("DELETE FROM changelog WHERE issue_key = ?", keys)
+            self.conn.executemany(
+                "INSERT INTO changelog VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        i.key, seq, e.date, e.field,
+                        e.from_value, e.to_value, e.from_string, e.to_string
+                    )
+                    for i in issues
+                    for seq, e in enumerate(i.changelog)
+                ]
+            )
+            self.conn.executemany("DELETE FROM sprint_moves WHERE issue_key = ?", keys)
+            self.conn.executemany(
+                "INSERT INTO sprint_moves VALUES (?, ?, ?, ?, ?)",
+                [
+                    (i.key, seq, from_sprint, to_sprint, date)
+                    for i in issues
+                    for seq, (from_sprint, to_sprint, date) in enumerate(sprint_moves(i.changelog))
+                ]
+            )
+
+    def get_issue_sprints(self, key: str) -> list[int]:
+        """Спринты, в которые входит задача"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT sprint_id FROM sprint_issues WHERE issue_key = ?", (key,)
+            ).fetchall()
+        return [sprint_id for (sprint_id,) in rows]
+
+    def update_issue_sprints(self, key: str, added: set[int], removed: set[int]):
+        """Изменить членство задачи в спринтах без полной синхронизации"""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO sprint_issues VALUES (?, ?)",
+                [(sprint_id, key) for sprint_id in added]
+            )
+            self.conn.executemany(
+                "DELETE FROM sprint_issues WHERE sprint_id = ? AND issue_key = ?",
+                [(sprint_id, key) for sprint_id in removed]
+            )
+
+    def delete_issue(self, key: str):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM issues WHERE key = ?", (key,))
+            self.conn.execute("DELETE FROM changelog WHERE issue_key = ?", (key,))
+            self.conn.execute("DELETE FROM sprint_issues WHERE issue_key = ?", (key,))
+            self.conn.execute("DELETE FROM sprint_moves WHERE issue_key = ?", (key,))
+
+    def load_sprint_moves(self) -> list[tuple[str, int, int, int | None, float]]:
+        """Все сохраненные переносы: (ключ, из спринта, в спринт, дата, SP задачи)"""
+        with self.lock:
+            return self.conn.execute(
+                """
+                SELECT m.issue_key, m.from_sprint, m.to_sprint, m.moved_at, COALESCE(i.story_points, 0)
+                FROM sprint_moves m JOIN issues i ON i.key = m.issue_key
+                ORDER BY m.issue_key, m.seq
+                """
+            ).fetchall()
+
+    def get_sprint_keys(self, sprint_id: int) -> list[str]:
+        """Ключи задач, входящих в спринт"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT issue_key FROM sprint_issues WHERE sprint_id = ? ORDER BY issue_key",
+                (sprint_id,)
+            ).fetchall()
+        return [key for (key,) in rows]
+
+    def iter_issues(self, keys: list[str], chunk_size: int = 500) -> Iterator:
+        """Загружать задачи вместе с changelog порциями по chunk_size ключей"""
+        from jira_client import Issue
+        from issue_history import ChangelogEntry
+
+        for n in range(0, len(keys), chunk_size):
+            chunk = keys[n:n + chunk_size]
+            placeholders = ",".join("?" * len(chunk))
+            with self.lock:
+                changelog_rows = self.conn.execute(
+                    f"""
+                    SELECT issue_key, date, field, from_value, to_value, from_string, to_string
+                    FROM changelog WHERE issue_key IN ({placeholders})
+                    ORDER BY issue_key, seq
+                    """,
+                    chunk
+                ).fetchall()
+                issue_rows = self.conn.execute(
+                    f"SELECT * FROM issues WHERE key IN ({placeholders}) ORDER BY key", chunk
+                ).fetchall()
+
+            changelogs = {}
+            for key, date, field, from_value, to_value, from_string, to_string in changelog_rows:
+                changelogs.setdefault(key, []).append(ChangelogEntry(
+                    date, field, from_value, to_value, from_string, to_string
+                ))
+
+            for row in issue_rows:
+                yield Issue(
+                    key=row[0],
+                    summary=row[1],
+                    story_points=row[2],
+                    status=row[3],
+                    assignee=row[4],
+                    assignee_key=row[5],
+                    created=row[6],
+                    updated=row[7],
+                    time_estimate=row[8],
+                    time_spent=row[9],
+                    id=row[10],
+                    changelog=changelogs.pop(row[0], [])
+                )
+
+    def load_issues(self, keys: list[str]) -> dict:
+        """Загрузить задачи вместе с changelog по списку ключей"""
+        return {issue.key: issue for issue in self.iter_issues(keys)}
+
+    def load_sprint_issues(self, sprint_id: int) -> list:
+        """Загрузить задачи спринта вместе с changelog"""
+        issues = self.load_issues(self.get_sprint_keys(sprint_id))
+        return [issues[key] for key in sorted(issues)]
+
+    # -------------------------------------------------------------------------
+    # Ворклоги
+    # -------------------------------------------------------------------------
+
+    def save_worklogs(self, worklogs: list):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO worklogs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (w.id, w.issue_id, w.author_key, w.author, w.started, w.time_spent, w.updated)
+                    for w in worklogs
+                ]
+            )
+
+    def delete_worklogs(self, ids: list[int]):
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM worklogs WHERE id = ?", [(i,) for i in ids])
+
+    def load_worklogs(self, start: int, end: int) -> list:
+        """Ворклоги, начатые в [start, end] (UTC epoch)"""
+        from jira_client import Worklog
+
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT * FROM worklogs WHERE started BETWEEN ? AND ? ORDER BY id", (start, end)
+            ).fetchall()
+        return [Worklog(*row) for row in rows]
@@ -1,32 +1,132 @@
 """
 Общие функции для работы с Jira API
+
+Операции, зависящие от экземпляра Jira и доски (адрес, ID доски, поле
+Story Points), собраны в JiraClient. Функции модуля с теми же именами
+работают через клиент по умолчанию (см. get_config).
+
+Импорт модуля не обращается к сети и не требует токена: настройки
+читаются при первом обращении к get_config(), а requests и пул потоков
+импортируются при первом запросе. Это держит холодный старт CLI низким.
 """
 
+import hashlib
+import json
+import math
 import os
-import sys
-import requests
+import re
+import threading
+import time
 from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+from urllib.parse import urlsplit
 from dataclasses import dataclass, field
 
-# Конфигурация
+import profiling
+from ratelimit import AdaptiveLimiter, TokenBucket, backoff_delay, parse_retry_after
+from timestamps import parse_timestamp, to_datetime, to_timestamp
+from issue_history import ChangelogEntry, IssueHistory
+
+if TYPE_CHECKING:
+    import requests
+
+# Конфигурация по умолчанию; файл конфигурации и переменные окружения
+# ее переопределяют (см. get_config)
 BASE_URL = "https://jira.2gis.ru"
 BOARD_ID = 803  # Добыча данных
 STORY_POINTS_FIELD = "customfield_10080"
 
-# Токен из переменной окружения
-TOKEN = os.environ.get("JIRA_TOKEN")
-if not TOKEN:
-    print("Ошибка: переменная окружения JIRA_TOKEN не установлена")
-    print("Установите: export JIRA_TOKEN='ваш_токен'")
-    sys.exit(1)
+# Файл конфигурации (JSON с ключами base_url, token, board_id, story_points_field);
+# другой путь задается JIRA_CONFIG
+CONFIG_PATH = os.path.join(
+    os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config"),
+    "jira-sprint-report",
+    "config.json"
+)
+
+# Отображаемое имя поля Story Points (его пишет changelog), если поле не
+# нашлось в списке полей экземпляра (см. JiraClient.story_points_name)
+STORY_POINTS_NAME = "Story Points"
+
+# Поля задачи, запрашиваемые для отчета (поле Story Points подставляется клиентом)
+ISSUE_FIELDS_TEMPLATE = "key,summary,status,assignee,{story_points},created,updated,timeoriginalestimate,timespent"
+
+# Количество параллельных запросов при пагинации
+MAX_WORKERS = int(os.environ.get("JIRA_WORKERS", "8"))
+
+# Общий предел одновременных запросов к Jira (все потоки, все доски)
+MAX_CONCURRENCY = int(os.environ.get("JIRA_MAX_CONCURRENCY", "16"))
+
+# Темп запросов к Jira, запросов в секунду (0 — без ограничения)
+RATE_LIMIT = float(os.environ.get("JIRA_RATE", "25"))
+
+# Сколько раз повторять запрос при 429, 5xx и сетевых ошибках
+MAX_RETRIES = int(os.environ.get("JIRA_RETRIES", "5"))
+
+# Ответы, после которых запрос имеет смысл повторить
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Ответы о перегрузке: снижают предел одновременных запросов
+THROTTLE_STATUSES = {429, 503}
+
+# Таймаут одного запроса, секунд
+REQUEST_TIMEOUT = 120
+
+# Размер страницы по умолчанию
+PAGE_SIZE = 50
+
+# Запрашиваемый размер страницы search API (сервер урезает до своего предела)
+SEARCH_PAGE_SIZE = 1000
+
+# Спринтов в одном JQL-запросе sprint in (...)
+SPRINTS_PER_QUERY = 50
+
+# ID поля Sprint (customfield_*); без переменной определяется по /rest/api/2/field
+SPRINT_FIELD_ID = os.environ.get("JIRA_SPRINT_FIELD")
+
+# Тип поля Sprint в описании полей Jira
+SPRINT_FIELD_SCHEMA = "com.pyxis.greenhopper.jira:gh-sprint"
+
+# ID ворклогов в одном запросе POST /rest/api/2/worklog/list (предел Jira)
+WORKLOGS_PER_REQUEST = 1000
+
+# Keep-alive сессии по экземплярам Jira (scheme://host) и их токены.
+# Токен из настроек отправляется только на хост base_url из настроек;
+# токены других экземпляров задаются через set_token
+_sessions: dict = {}
+_tokens: dict[str, str] = {}
+# Размер пула соединений каждой сессии (см. _pool_size)
+_session_pool_sizes: dict[str, int] = {}
+
+# Настройки, см. get_config
+_config = None
+
+# Запись / воспроизведение ответов Jira (фикстуры для офлайн-прогонов)
+RECORD_DIR = os.environ.get("JIRA_RECORD_DIR")
+REPLAY_DIR = os.environ.get("JIRA_REPLAY_DIR")
+
+# Подменный транспорт: функция (url, params) -> ответ; используется бенчмарками.
+# Для POST вместо параметров передается тело запроса
+_transport: Callable[[str, dict | None], dict | list | None] | None = None
+
+# Локальные кеши по адресу Jira (отключаются JIRA_NO_CACHE=1, путь задается JIRA_CACHE_DB)
+_stores: dict = {}
+
+# Клиенты по (адрес, доска, поле Story Points), см. get_client
+_clients: dict = {}
+
+# Защищает ленивое создание сессии, кешей и клиентов при обращении из нескольких потоков
+_init_lock = threading.Lock()
+
+# Срок жизни каталога спринтов (см. get_sprint_catalog), секунд
+SPRINT_CATALOG_TTL = int(os.environ.get("JIRA_SPRINT_TTL", "300"))
 
 HEADERS = {
     "Accept": "application/json",
-    "Authorization": f"Bearer {TOKEN}"
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class Issue:
     """Задача Jira"""
     key: str
@@ -35,10 +135,19 @@ class Issue:
     status: str
     assignee: str
     assignee_key: str
-    created: datetime
+    created: int | None  # UTC epoch
     time_estimate: int  # Original estimate в секундах
     time_spent: int  # Time spent в секундах
-    changelog: list = field(default_factory=list)
+    changelog: list[ChangelogEntry] = field(default_factory=list)
+    updated: int | None = None  # UTC epoch
+    history: IssueHistory | None = None
+    id: str | None = None  # числовой ID задачи (ворклоги ссылаются на него)
+    # Время, списанное в окне спринта, в секундах; None — ворклоги не запрашивались
+    sprint_time_spent: int | None = None
+    
+    def __post_init__(self):
+        if self.history is None:
+            self.history = IssueHistory.from_changelog(self.changelog, self.created)
 
 
 @dataclass
@@ -51,6 +160,105 @@ class Sprint:
     end_date: datetime | None
     activated_date: datetime | None
     complete_date: datetime | None
+    
+    # Те же даты в UTC epoch — для сравнения с датами changelog
+    @property
+    def start_ts(self) -> int | None:
+        return to_timestamp(self.start_date)
+    
+    @property
+    def end_ts(self) -> int | None:
+        return to_timestamp(self.end_date)
+    
+    @property
+    def activated_ts(self) -> int | None:
+        return to_timestamp(self.activated_date)
+    
+    @property
+    def complete_ts(self) -> int | None:
+        return to_timestamp(self.complete_date)
+
+
+@dataclass(slots=True)
+class Worklog:
+    """Запись о списанном времени"""
+    id: int
+    issue_id: str
+    author_key: str
+    author: str
+    started: int | None  # UTC epoch
+    time_spent: int  # секунды
+    updated: int | None = None  # UTC epoch
+
+
+class WorklogIndex:
+    """Ворклоги с индексами по задаче (ID задачи) и по автору"""
+    
+    def __init__(self, worklogs: Iterable[Worklog]):
+        self.by_issue: dict[str, list[Worklog]] = {}
+        self.by_author: dict[str, list[Worklog]] = {}
+        self.authors: dict[str, str] = {}
+        for worklog in worklogs:
+            self.by_issue.setdefault(worklog.issue_id, []).append(worklog)
+            self.by_author.setdefault(worklog.author_key, []).append(worklog)
+            self.authors[worklog.author_key] = worklog.author
+    
+    def __len__(self) -> int:
+        return sum(len(worklogs) for worklogs in self.by_issue.values())
+    
+    def issue_spent(self, issue_id: str | None) -> int:
+        """Всего списано на задачу"""
+        return sum(w.time_spent for w in self.by_issue.get(issue_id, ()))
+    
+    def issue_authors(self, issue_id: str | None) -> dict[str, int]:
+        """Списано на задачу по авторам"""
+        spent = {}
+        for w in self.by_issue.get(issue_id, ()):
+            spent[w.author_key] = spent.get(w.author_key, 0) + w.time_spent
+        return spent
+    
+    def author_spent(self, author_key: str) -> int:
+        """Всего списано автором (на любые задачи)"""
+        return sum(w.time_spent for w in self.by_author.get(author_key, ()))
+
+
+# Категории отчета (атрибуты DeveloperStats)
+CATEGORY_NAMES = ('original', 'added_later', 'carried_over', 'closed_planned', 'closed_unplanned')
+
+
+@dataclass(slots=True)
+class CategoryTotals:
+    """Агрегаты по категории: количество задач, SP, estimate, spent и spent в окне спринта"""
+    count: int = 0
+    story_points: float = 0
+    time_estimate: int = 0
+    time_spent: int = 0
+    sprint_time_spent: int = 0
+    
+    def add(self, issue: Issue):
+        self.count += 1
+        self.story_points += issue.story_points
+        self.time_estimate += issue.time_estimate
+        self.time_spent += issue.time_spent
+        self.sprint_time_spent += issue.sprint_time_spent or 0
+    
+    def merge(self, other: "CategoryTotals"):
+        self.count += other.count
+        self.story_points += other.story_points
+        self.time_estimate += other.time_estimate
+        self.time_spent += other.time_spent
+        self.sprint_time_spent += other.sprint_time_spent
+    
+    def remove(self, issue: Issue):
+        self.count -= 1
+        self.story_points -= issue.story_points
+        self.time_estimate -= issue.time_estimate
+        self.time_spent -= issue.time_spent
+        self.sprint_time_spent -= issue.sprint_time_spent or 0
+
+
+def _empty_totals() -> dict[str, CategoryTotals]:
+    return {name: CategoryTotals() for name in CATEGORY_NAMES}
 
 
 @dataclass
@@ -62,31 +270,420 @@ class DeveloperStats:
     carried_over: list = field(default_factory=list)
     closed_planned: list = field(default_factory=list)
     closed_unplanned: list = field(default_factory=list)
+    totals: dict[str, CategoryTotals] = field(default_factory=_empty_totals)
+    
+    def add(self, category: str, issue: Issue):
+        """Добавить задачу в категорию и обновить агрегаты"""
+        getattr(self, category).append(issue)
+        self.totals[category].add(issue)
+    
+    def remove(self, category: str, issue_key: str) -> Issue | None:
+        """Убрать задачу из категории по ключу и вычесть ее из агрегатов"""
+        issues = getattr(self, category)
+        for n, issue in enumerate(issues):
+            if issue.key == issue_key:
+                del issues[n]
+                self.totals[category].remove(issue)
+                return issue
+        return None
+    
+    def merge(self, other: "DeveloperStats", dedupe: bool = True):
+        """
+        Добавить задачи другой статистики. При dedupe задача, уже учтенная
+        в категории (по ключу), не дублируется.
+        """
+        for category in CATEGORY_NAMES:
+            issues = getattr(self, category)
+            other_issues = getattr(other, category)
+            if dedupe and issues:
+                seen = {issue.key for issue in issues}
+                extra = [issue for issue in other_issues if issue.key not in seen]
+                if len(extra) < len(other_issues):
+                    for issue in extra:
+                        self.add(category, issue)
+                    continue
+            # Пересечений нет — агрегаты складываются без пересчета
+            issues.extend(other_issues)
+            self.totals[category].merge(other.totals[category])
 
 
-def get(url: str, params: dict = None) -> dict | list | None:
-    """GET запрос к API"""
+class JiraError(Exception):
+    """Запрос к Jira не удался и после повторов (кроме 404)"""
+
+    def __init__(self, url: str, message: str, status: int | None = None):
+        super().__init__(f"{url}: {message}")
+        self.url = url
+        self.status = status
+
+
+class ConfigError(JiraError):
+    """Настроек не хватает для запросов к Jira (нет токена, битый файл конфигурации)"""
+
+    def __init__(self, message: str, path: str | None = None):
+        Exception.__init__(self, f"{path}: {message}" if path else message)
+        self.url = None
+        self.status = None
+
+
+@dataclass(frozen=True)
+class Config:
+    """Настройки доступа к Jira: переменные окружения, затем файл, затем значения по умолчанию"""
+    base_url: str
+    board_id: int
+    story_points_field: str
+    token: str | None = field(default=None, repr=False)
+
+
+def load_config(path: str | None = None) -> Config:
+    """
+    Прочитать настройки. Переменные окружения: JIRA_BASE_URL, JIRA_TOKEN,
+    JIRA_BOARD_ID, JIRA_STORY_POINTS_FIELD; файл — path, JIRA_CONFIG или
+    CONFIG_PATH (его может и не быть).
+    """
+    path = path or os.environ.get("JIRA_CONFIG") or CONFIG_PATH
+    data = {}
+    if os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ConfigError(f"не удалось прочитать файл конфигурации: {e}", path) from e
+    env = os.environ
     try:
-        response = requests.get(url, headers=HEADERS, params=params, timeout=120)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Ошибка {response.status_code}: {response.text[:200]}")
-            return None
-    except Exception as e:
-        print(f"Исключение при запросе {url}: {e}")
-        return None
+        board_id = int(env.get("JIRA_BOARD_ID") or data.get("board_id") or BOARD_ID)
+    except ValueError as e:
+        raise ConfigError(f"ID доски должен быть числом: {e}", path) from e
+    return Config(
+        base_url=(env.get("JIRA_BASE_URL") or data.get("base_url") or BASE_URL).rstrip("/"),
+        board_id=board_id,
+        story_points_field=env.get("JIRA_STORY_POINTS_FIELD") or data.get("story_points_field") or STORY_POINTS_FIELD,
+        token=env.get("JIRA_TOKEN") or data.get("token")
+    )
 
 
-def parse_datetime(date_str: str | None) -> datetime | None:
-    """Парсинг даты из Jira формата"""
-    if not date_str:
+def get_config() -> Config:
+    """Настройки процесса (читаются один раз, при первом обращении)"""
+    global _config
+    if _config is None:
+        with _init_lock:
+            if _config is None:
+                _config = load_config()
+    return _config
+
+
+_limiter = AdaptiveLimiter(MAX_CONCURRENCY)
+_bucket = TokenBucket(RATE_LIMIT)
+
+
+def _pool(workers: int):
+    """Пул потоков; concurrent.futures импортируется только когда пул нужен"""
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def set_max_concurrency(limit: int):
+    """Изменить общий предел одновременных запросов к Jira (пулы соединений растут вместе с ним)"""
+    _limiter.set_limit(limit)
+    size = _pool_size()
+    with _init_lock:
+        for origin, session in _sessions.items():
+            if _session_pool_sizes.get(origin, 0) < size:
+                _mount_adapter(session, origin, size)
+
+
+def _pool_size() -> int:
+    """
+    Соединений в пуле сессии: не меньше общего предела одновременных
+    запросов, иначе urllib3 закрывает лишние соединения ("Connection pool
+    is full") и keep-alive теряется именно под нагрузкой.
+    """
+    return max(_limiter.max_limit, MAX_WORKERS)
+
+
+def _mount_adapter(session: "requests.Session", origin: str, size: int):
+    import requests
+    
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    _session_pool_sizes[origin] = size
+
+
+def _store_path(base_url: str) -> str:
+    from issue_store import DEFAULT_PATH
+    path = os.environ.get("JIRA_CACHE_DB") or DEFAULT_PATH
+    if base_url.rstrip("/") == get_config().base_url:
+        return path
+    # Другой экземпляр Jira — отдельный файл: ключи задач и ID спринтов могут совпасть
+    root, ext = os.path.splitext(path)
+    host = re.sub(r"[^A-Za-z0-9.-]", "_", urlsplit(base_url).netloc)
+    return f"{root}-{host}{ext}"
+
+
+def get_store(base_url: str | None = None):
+    """Локальное хранилище задач экземпляра Jira (по умолчанию из настроек); None, если кеш отключен"""
+    if os.environ.get("JIRA_NO_CACHE"):
         return None
-    try:
-        clean = date_str[:19]
-        return datetime.strptime(clean, "%Y-%m-%dT%H:%M:%S")
-    except ValueError:
+    # Настройки читаются до блокировки: _store_path обращается к ним под ней
+    config = get_config()
+    base_url = base_url or config.base_url
+    with _init_lock:
+        store = _stores.get(base_url)
+        if store is None:
+            from issue_store import IssueStore
+            store = _stores[base_url] = IssueStore(_store_path(base_url))
+    return store
+
+
+def _origin(url: str) -> str:
+    """Экземпляр Jira, к которому относится URL: scheme://host[:port]"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def set_token(base_url: str, token: str):
+    """Токен для экземпляра Jira, отличного от экземпляра из настроек (или вместо его токена)"""
+    origin = _origin(base_url)
+    with _init_lock:
+        if _tokens.get(origin) != token:
+            _tokens[origin] = token
+            # Сессия со старым токеном больше не нужна
+            _sessions.pop(origin, None)
+
+
+def _token(origin: str) -> str:
+    token = _tokens.get(origin)
+    if token:
+        return token
+    config = get_config()
+    if origin != _origin(config.base_url):
+        # Чужому экземпляру токен из настроек не отправляется
+        raise ConfigError(f"не задан токен для {origin}: \"token\" или \"token_env\" доски в boards.json")
+    if not config.token:
+        raise ConfigError(
+            "не задан токен: export JIRA_TOKEN='ваш_токен' или \"token\" в файле конфигурации"
+        )
+    return config.token
+
+
+def get_session(url: str | None = None) -> "requests.Session":
+    """
+    Сессия с пулом соединений для экземпляра Jira, к которому относится url
+    (по умолчанию — из настроек). requests импортируется здесь, при первом запросе.
+    """
+    origin = _origin(url or get_config().base_url)
+    session = _sessions.get(origin)
+    if session is not None:
+        return session
+    token = _token(origin)
+    import requests
+    
+    with _init_lock:
+        session = _sessions.get(origin)
+        if session is not None:
+            return session
+        session = requests.Session()
+        session.headers.update({**HEADERS, "Authorization": f"Bearer {token}"})
+        _mount_adapter(session, origin, _pool_size())
+        _sessions[origin] = session
+    return session
+
+
+def set_transport(transport: Callable[[str, dict | None], dict | list | None] | None):
+    """Направить все запросы get() и post() в transport вместо HTTP (None — вернуть HTTP)"""
+    global _transport
+    _transport = transport
+
+
+def fixture_key(url: str, params: dict | None = None) -> str:
+    """Имя файла фикстуры: путь запроса без хоста + отсортированные параметры"""
+    path = urlsplit(url).path
+    payload = json.dumps([path, sorted((params or {}).items())], ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest() + ".json"
+
+
+def _replay(url: str, params: dict | None) -> dict | list | None:
+    path = os.path.join(REPLAY_DIR, fixture_key(url, params))
+    if not os.path.exists(path):
+        print(f"Нет записанного ответа для {url} {params}")
         return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["response"]
+
+
+def _record(url: str, params: dict | None, data: dict | list):
+    os.makedirs(RECORD_DIR, exist_ok=True)
+    path = os.path.join(RECORD_DIR, fixture_key(url, params))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"url": urlsplit(url).path, "params": params, "response": data},
+            f, ensure_ascii=False
+        )
+
+
+def get(url: str, params: dict = None) -> dict | list | None:
+    """
+    GET запрос к API (не больше MAX_CONCURRENCY одновременно, не чаще RATE_LIMIT в секунду).
+
+    None — только если ресурса нет (404); прочие ошибки после повторов
+    поднимают JiraError, чтобы пагинация не обрывалась молча.
+    """
+    return _request("GET", url, params)
+
+
+def post(url: str, body: dict) -> dict | list | None:
+    """
+    POST запрос с JSON-телом — для bulk-методов, принимающих списки ID.
+    Ограничения, повторы и ошибки — как у get(); метод должен быть
+    идемпотентным (чтение), иначе повтор после сбоя небезопасен.
+    """
+    return _request("POST", url, body)
+
+
+def _request(method: str, url: str, payload: dict | None) -> dict | list | None:
+    """payload — параметры запроса для GET и тело для POST"""
+    if REPLAY_DIR and _transport is None:
+        start = time.perf_counter()
+        data = _replay(url, payload)
+        profiling.record_request(url, time.perf_counter() - start)
+        return data
+    if _transport is not None:
+        with _limiter:
+            start = time.perf_counter()
+            data = _transport(url, payload)
+            profiling.record_request(url, time.perf_counter() - start)
+            return data
+    return _http_request(method, url, payload)
+
+
+def _http_request(method: str, url: str, payload: dict | None = None) -> dict | list | None:
+    session = get_session(url)
+    import requests
+    
+    if method == "GET":
+        options = {"params": payload}
+    else:
+        options = {"json": payload}
+    for attempt in range(MAX_RETRIES + 1):
+        last = attempt == MAX_RETRIES
+        _bucket.acquire()
+        # Место в пределе занимается только на время запроса, не на паузу перед повтором
+        with _limiter:
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, timeout=REQUEST_TIMEOUT, **options)
+            except requests.RequestException as e:
+                latency = time.perf_counter() - start
+                if last:
+                    profiling.record_request(url, latency, retries=attempt)
+                    raise JiraError(url, f"{type(e).__name__}: {e}") from e
+                response = None
+        latency = time.perf_counter() - start
+
+        if response is None:
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        status = response.status_code
+        if status == 200:
+            _limiter.on_success()
+            decode_start = time.perf_counter()
+            try:
+                data = response.json()
+            except ValueError as e:
+                raise JiraError(url, f"ответ не JSON: {response.text[:200]}", status) from e
+            profiling.record_request(
+                url, latency, len(response.content), time.perf_counter() - decode_start, status, attempt
+            )
+            if RECORD_DIR:
+                _record(url, payload, data)
+            return data
+
+        if status in THROTTLE_STATUSES:
+            _limiter.on_throttle(latency)
+        if status in RETRY_STATUSES and not last:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                # Пауза для всех потоков: повтор в обход нее получит тот же 429.
+                # Retry-After: 0 или дата в прошлом — не повод повторять сразу
+                _bucket.pause(max(retry_after, backoff_delay(attempt)))
+            else:
+                time.sleep(backoff_delay(attempt))
+            continue
+
+        profiling.record_request(url, latency, len(response.content), status=status, retries=attempt)
+        if status == 404:
+            return None
+        raise JiraError(url, f"ошибка {status}: {response.text[:200]}", status)
+
+
+def iter_pages(
+    url: str,
+    params: dict | None = None,
+    page_size: int = PAGE_SIZE,
+    workers: int | None = None
+) -> Iterator[dict]:
+    """
+    Постраничный обход ресурса Jira.
+    
+    Первая страница запрашивается отдельно: из нее берутся total и фактический
+    maxResults (сервер может его урезать). Остальные смещения startAt
+    скачиваются параллельно, страницы отдаются строго по порядку.
+    Если total в ответе нет (например, список спринтов доски), страницы
+    запрашиваются последовательно до isLast.
+    """
+    params = dict(params or {})
+    workers = workers or MAX_WORKERS
+    
+    first = get(url, {**params, "startAt": 0, "maxResults": page_size})
+    if not first:
+        return
+    yield first
+    
+    step = first.get('maxResults') or page_size
+    total = first.get('total')
+    
+    if total is None:
+        page = first
+        start_at = 0
+        while not page.get('isLast', True) and page.get('values'):
+            start_at += step
+            page = get(url, {**params, "startAt": start_at, "maxResults": step})
+            if not page:
+                return
+            yield page
+        return
+    
+    offsets = range(step, total, step)
+    if not offsets:
+        return
+    
+    def fetch(offset: int) -> dict | None:
+        return get(url, {**params, "startAt": offset, "maxResults": step})
+    
+    with _pool(min(workers, len(offsets))) as pool:
+        for page in pool.map(fetch, offsets):
+            if page:
+                yield page
+
+
+def paginate(
+    url: str,
+    items_key: str,
+    params: dict | None = None,
+    page_size: int = PAGE_SIZE,
+    workers: int | None = None
+) -> list[dict]:
+    """Собрать элементы всех страниц в один список (порядок сохраняется)"""
+    items = []
+    for page in iter_pages(url, params, page_size, workers):
+        items.extend(page.get(items_key, []))
+    return items
+
+
+def parse_datetime(date_str: str | None) -> datetime | None:
+    """Парсинг даты из Jira формата с учетом смещения (в локальном поясе)"""
+    return to_datetime(parse_timestamp(date_str))
 
 
 def is_real_sprint(sprint: Sprint) -> bool:
@@ -98,119 +695,872 @@ def is_real_sprint(sprint: Sprint) -> bool:
         return False
     if sprint.start_date is None or sprint.end_date is None:
         return False
-    if sprint.end_date > datetime.now():
+    if sprint.end_ts > time.time():
         return False
     return True
 
 
-def get_all_sprints(board_id: int = BOARD_ID) -> list[Sprint]:
-    """Получить все спринты доски с пагинацией"""
-    all_sprints = []
-    start_at = 0
-    max_results = 50
+def parse_sprint(s: dict) -> Sprint:
+    """Спринт из ответа Jira"""
+    return Sprint(
+        id=s.get('id'),
+        name=s.get('name'),
+        state=s.get('state'),
+        start_date=parse_datetime(s.get('startDate')),
+        end_date=parse_datetime(s.get('endDate')),
+        activated_date=parse_datetime(s.get('activatedDate')),
+        complete_date=parse_datetime(s.get('completeDate'))
+    )
+
+
+def parse_issue(i: dict, story_points_field: str) -> Issue:
+    """
+    Задача из ответа Jira (с changelog, если он был запрошен).
+    story_points_field — ID поля Story Points экземпляра (JiraClient.story_points_field).
+    """
+    fields = i.get('fields', {})
+    assignee = fields.get('assignee') or {}
     
-    while True:
-        data = get(
-            f"{BASE_URL}/rest/agile/1.0/board/{board_id}/sprint",
-            {"startAt": start_at, "maxResults": max_results}
-        )
-        if not data:
-            break
-        
-        for s in data.get('values', []):
-            sprint = Sprint(
-                id=s.get('id'),
-                name=s.get('name'),
-                state=s.get('state'),
-                start_date=parse_datetime(s.get('startDate')),
-                end_date=parse_datetime(s.get('endDate')),
-                activated_date=parse_datetime(s.get('activatedDate')),
-                complete_date=parse_datetime(s.get('completeDate'))
-            )
-            all_sprints.append(sprint)
-        
-        if len(data.get('values', [])) < max_results:
-            break
-        start_at += max_results
+    changelog_data = i.get('changelog', {})
+    histories = []
+    for h in changelog_data.get('histories', []):
+        history_date = parse_timestamp(h.get('created'))
+        for item in h.get('items', []):
+            histories.append(ChangelogEntry(
+                date=history_date,
+                field=item.get('field'),
+                from_value=item.get('from'),
+                to_value=item.get('to'),
+                from_string=item.get('fromString'),
+                to_string=item.get('toString')
+            ))
     
-    return all_sprints
+    return Issue(
+        key=i.get('key'),
+        summary=fields.get('summary', ''),
+        # float: Jira отдает целые оценки как int, а из кеша (REAL) они читаются float —
+        # без приведения холодный и теплый отчет сериализуются по-разному (23 и 23.0)
+        story_points=float(fields.get(story_points_field) or 0),
+        status=fields.get('status', {}).get('name', 'Unknown'),
+        assignee=assignee.get('displayName', 'Unassigned'),
+        assignee_key=assignee.get('key', 'unassigned'),
+        created=parse_timestamp(fields.get('created')),
+        time_estimate=fields.get('timeoriginalestimate') or 0,
+        time_spent=fields.get('timespent') or 0,
+        changelog=histories,
+        updated=parse_timestamp(fields.get('updated')),
+        id=i.get('id')
+    )
 
 
-def get_sprint_by_id(sprint_id: int, board_id: int = BOARD_ID) -> Sprint | None:
-    """Получить спринт по ID"""
-    data = get(f"{BASE_URL}/rest/agile/1.0/sprint/{sprint_id}")
-    if not data:
-        return None
-    
-    return Sprint(
-        id=data.get('id'),
-        name=data.get('name'),
-        state=data.get('state'),
-        start_date=parse_datetime(data.get('startDate')),
-        end_date=parse_datetime(data.get('endDate')),
-        activated_date=parse_datetime(data.get('activatedDate')),
-        complete_date=parse_datetime(data.get('completeDate'))
+def parse_worklog(w: dict) -> Worklog:
+    """Ворклог из ответа Jira"""
+    author = w.get('author') or {}
+    return Worklog(
+        id=int(w.get('id')),
+        issue_id=str(w.get('issueId')),
+        author_key=author.get('key', 'unknown'),
+        author=author.get('displayName', 'Unknown'),
+        started=parse_timestamp(w.get('started')),
+        time_spent=w.get('timeSpentSeconds') or 0,
+        updated=parse_timestamp(w.get('updated'))
     )
 
 
-def get_real_sprint_names(board_id: int = BOARD_ID) -> set[str]:
-    """Получить имена всех настоящих спринтов"""
-    sprints = get_all_sprints(board_id)
-    return {s.name for s in sprints if is_real_sprint(s)}
+def _probe_listing(url: str, params: dict, hint: int | None = None) -> tuple[int, int, dict[int, dict]]:
+    """
+    Длина листинга без total (список спринтов доски) за O(log n) запросов.
+    
+    Страницы запрашиваются с шагом, удваивающимся от подсказки hint (длины,
+    известной с прошлого раза): пока не встретится неполная или пустая
+    страница, затем граница уточняется бинарным поиском.
+    Возвращает (длина, размер страницы, скачанные страницы по номеру).
+    """
+    pages: dict[int, dict] = {}
+    
+    def fetch(n: int) -> int:
+        """-1: пустая страница, 0: полная и не последняя, иначе — длина листинга"""
+        page = get(url, {**params, "startAt": n * step, "maxResults": step})
+        values = (page or {}).get('values') or []
+        if not values:
+            return -1
+        pages[n] = page
+        if page.get('isLast', True) or len(values) < step:
+            return n * step + len(values)
+        return 0
+    
+    step = PAGE_SIZE
+    first = get(url, {**params, "startAt": 0, "maxResults": step})
+    values = (first or {}).get('values') or []
+    if not values:
+        return 0, step, pages
+    step = first.get('maxResults') or step
+    pages[0] = first
+    if first.get('isLast', True) or len(values) < step:
+        return len(values), step, pages
+    
+    # lo — последняя известная полная страница, hi — первая известная пустая
+    lo, hi = 0, None
+    n = max(1, (hint - 1) // step) if hint else 1
+    delta = 1
+    while hi is None:
+        result = fetch(n)
+        if result > 0:
+            return result, step, pages
+        if result < 0:
+            hi = n
+        else:
+            lo = n
+            n = lo + delta
+            delta *= 2
+    
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        result = fetch(mid)
+        if result > 0:
+            return result, step, pages
+        if result < 0:
+            hi = mid
+        else:
+            lo = mid
+    return hi * step, step, pages
 
 
-def get_sprint_issues_with_changelog(sprint_id: int) -> list[Issue]:
-    """Получить все задачи спринта с полным changelog"""
-    all_issues = []
-    start_at = 0
-    max_results = 50
-    
-    while True:
-        data = get(
-            f"{BASE_URL}/rest/agile/1.0/sprint/{sprint_id}/issue",
-            {
-                "startAt": start_at,
-                "maxResults": max_results,
-                "fields": f"key,summary,status,assignee,{STORY_POINTS_FIELD},created,timeoriginalestimate,timespent",
-                "expand": "changelog"
-            }
-        )
-        if not data:
-            break
+class SprintCatalog:
+    """
+    Спринты доски, проиндексированные по ID, имени и состоянию.
+    Признак "настоящего" спринта (is_real_sprint) вычисляется один раз.
+    """
+    
+    def __init__(self, board_id: int, sprints: list[Sprint], loaded_at: float):
+        self.board_id = board_id
+        self.loaded_at = loaded_at
+        self.sprints = sorted(sprints, key=lambda s: s.id)
+        self.by_id = {s.id: s for s in self.sprints}
+        self.by_name = {s.name: s for s in self.sprints}
+        self.by_state: dict[str, list[Sprint]] = {}
+        for s in self.sprints:
+            self.by_state.setdefault(s.state, []).append(s)
+        self.real_ids = frozenset(s.id for s in self.sprints if is_real_sprint(s))
+        self.real_names = frozenset(self.by_id[sprint_id].name for sprint_id in self.real_ids)
+    
+    def __len__(self) -> int:
+        return len(self.sprints)
+    
+    def __iter__(self) -> Iterator[Sprint]:
+        return iter(self.sprints)
+    
+    def get(self, sprint_id: int) -> Sprint | None:
+        return self.by_id.get(sprint_id)
+    
+    def find(self, name: str) -> Sprint | None:
+        return self.by_name.get(name)
+    
+    def state(self, state: str) -> list[Sprint]:
+        return self.by_state.get(state, [])
+    
+    def is_real(self, sprint_id: int) -> bool:
+        return sprint_id in self.real_ids
+    
+    def expired(self, ttl: int = SPRINT_CATALOG_TTL) -> bool:
+        return time.time() - self.loaded_at > ttl
+
+
+def is_changelog_truncated(raw_issue: dict) -> bool:
+    """Jira отдает встроенный changelog не целиком, если история длинная"""
+    changelog = raw_issue.get('changelog') or {}
+    total = changelog.get('total')
+    if total is None:
+        return False
+    histories = changelog.get('histories', [])
+    return total > len(histories) or total > (changelog.get('maxResults') or total)
+
+
+_SPRINT_ID_RE = re.compile(r"[\[,]id=(\d+)")
+
+
+def parse_sprint_field(value: list | None) -> set[int]:
+    """
+    ID спринтов из значения поля Sprint задачи.
+    Jira отдает его списком объектов {"id": ...} или (старые версии Server)
+    строк вида 'com.atlassian.greenhopper.service.sprint.Sprint@1f[id=6783,...]'.
+    """
+    ids = set()
+    for item in value or []:
+        if isinstance(item, dict):
+            if item.get('id') is not None:
+                ids.add(int(item['id']))
+        elif isinstance(item, str):
+            match = _SPRINT_ID_RE.search(item)
+            if match:
+                ids.add(int(match.group(1)))
+        elif isinstance(item, int):
+            ids.add(item)
+    return ids
+
+
+def _changed_keys(listing: list[dict], known: dict[str, int | None]) -> list[str]:
+    """Ключи задач, у которых updated отличается от сохраненного"""
+    changed = []
+    for i in listing:
+        updated = parse_timestamp(i.get('fields', {}).get('updated'))
+        if known.get(i.get('key')) is None or known[i.get('key')] != updated:
+            changed.append(i.get('key'))
+    return changed
+
+
+class JiraClient:
+    """
+    Доступ к одной доске Jira: адрес экземпляра, ID доски и поле Story Points.
+    
+    Сессия, транспорт и предел одновременных запросов общие для всех
+    клиентов; локальный кеш — общий для клиентов одного экземпляра Jira.
+    Клиенты лучше получать через get_client(): тогда каталог спринтов
+    доски тоже общий.
+    """
+    
+    def __init__(
+        self,
+        base_url: str | None = None,
+        board_id: int | None = None,
+        story_points_field: str | None = None
+    ):
+        # Не заданное явно берется из настроек (get_config)
+        config = get_config()
+        self.base_url = (base_url or config.base_url).rstrip("/")
+        self.board_id = board_id or config.board_id
+        self.story_points_field = story_points_field or config.story_points_field
+        self.issue_fields = ISSUE_FIELDS_TEMPLATE.format(story_points=self.story_points_field)
+        self._catalog: SprintCatalog | None = None
+        self._catalog_lock = threading.Lock()
+        self._sprint_field: str | None = SPRINT_FIELD_ID
+        self._story_points_name: str | None = None
+    
+    def __repr__(self) -> str:
+        return f"JiraClient({self.base_url!r}, board_id={self.board_id})"
+    
+    @property
+    def store(self):
+        return get_store(self.base_url)
+    
+    def parse_issue(self, raw_issue: dict) -> Issue:
+        return parse_issue(raw_issue, self.story_points_field)
+    
+    @property
+    def sprint_field(self) -> str | None:
+        """ID поля Sprint экземпляра Jira (ищется один раз и хранится в кеше); '' — поля нет"""
+        if self._sprint_field is None:
+            store = self.store
+            field_id = store.get_meta('sprint_field') if store else None
+            if field_id is None:
+                fields = get(f"{self.base_url}/rest/api/2/field") or []
+                field_id = next(
+                    (f.get('id') for f in fields if (f.get('schema') or {}).get('custom') == SPRINT_FIELD_SCHEMA),
+                    None
+                ) or ''
+                if store:
+                    store.set_meta('sprint_field', field_id)
+            self._sprint_field = field_id
+        return self._sprint_field
+    
+    @property
+    def story_points_name(self) -> str:
+        """
+        Отображаемое имя поля Story Points: changelog хранит имя, а не ID поля.
+        Ищется один раз по списку полей и хранится в кеше.
+        """
+        if self._story_points_name is None:
+            store = self.store
+            meta_key = f"field_name:{self.story_points_field}"
+            name = store.get_meta(meta_key) if store else None
+            if name is None:
+                fields = get(f"{self.base_url}/rest/api/2/field") or []
+                name = next(
+                    (f.get('name') for f in fields if f.get('id') == self.story_points_field),
+                    None
+                ) or STORY_POINTS_NAME
+                if store:
+                    store.set_meta(meta_key, name)
+            self._story_points_name = name
+        return self._story_points_name
+    
+    # -------------------------------------------------------------------------
+    # Спринты
+    # -------------------------------------------------------------------------
+    
+    def get_all_sprints(self, state: str | None = None) -> list[Sprint]:
+        """
+        Получить спринты доски с пагинацией.
+        state — фильтр на стороне Jira: 'active', 'closed', 'future' или
+        несколько через запятую ('active,future').
+        """
+        params = {"state": state} if state else None
+        all_sprints = [
+            parse_sprint(s)
+            for s in paginate(f"{self.base_url}/rest/agile/1.0/board/{self.board_id}/sprint", 'values', params)
+        ]
         
-        for i in data.get('issues', []):
-            fields = i.get('fields', {})
-            assignee = fields.get('assignee') or {}
-            
-            changelog_data = i.get('changelog', {})
-            histories = []
-            for h in changelog_data.get('histories', []):
-                history_date = parse_datetime(h.get('created'))
-                for item in h.get('items', []):
-                    histories.append({
-                        'date': history_date,
-                        'field': item.get('field'),
-                        'from': item.get('fromString'),
-                        'to': item.get('toString')
-                    })
+        store = self.store
+        if store and all_sprints:
+            store.save_sprints(all_sprints)
+        
+        return all_sprints
+    
+    def get_latest_sprints(
+        self,
+        count: int = 0,
+        state: str = 'closed',
+        known_total: int | None = None
+    ) -> tuple[list[Sprint], int]:
+        """
+        Последние count спринтов в состоянии state (в порядке доски) и общее
+        число таких спринтов. С known_total (длиной листинга с прошлого раза)
+        возвращаются только появившиеся после него спринты.
+        
+        Jira не отдает total для списка спринтов, поэтому длина листинга
+        находится пробными запросами (см. _probe_listing), после чего
+        параллельно скачиваются только страницы хвоста. Число запросов почти
+        не зависит от количества спринтов на доске.
+        """
+        url = f"{self.base_url}/rest/agile/1.0/board/{self.board_id}/sprint"
+        params = {"state": state}
+        store = self.store
+        hint_key = f"sprint_count:{self.board_id}:{state}"
+        hint = known_total
+        if hint is None and store:
+            saved = store.get_meta(hint_key)
+            hint = int(saved) if saved else None
+        
+        total, step, pages = _probe_listing(url, params, hint)
+        if store:
+            store.set_meta(hint_key, str(total))
+        if known_total is not None:
+            count = total - known_total
+        if total == 0 or count <= 0:
+            return [], total
+        
+        first_page = max(0, total - count) // step
+        last_page = (total - 1) // step
+        missing = [n for n in range(first_page, last_page + 1) if n not in pages]
+        if missing:
+            def fetch(n: int) -> dict | None:
+                return get(url, {**params, "startAt": n * step, "maxResults": step})
             
-            issue = Issue(
-                key=i.get('key'),
-                summary=fields.get('summary', ''),
-                story_points=fields.get(STORY_POINTS_FIELD) or 0,
-                status=fields.get('status', {}).get('name', 'Unknown'),
-                assignee=assignee.get('displayName', 'Unassigned'),
-                assignee_key=assignee.get('key', 'unassigned'),
-                created=parse_datetime(fields.get('created')),
-                time_estimate=fields.get('timeoriginalestimate') or 0,
-                time_spent=fields.get('timespent') or 0,
-                changelog=histories
-            )
-            all_issues.append(issue)
+            with _pool(min(MAX_WORKERS, len(missing))) as pool:
+                for n, page in zip(missing, pool.map(fetch, missing)):
+                    if page:
+                        pages[n] = page
+        
+        values = []
+        for n in range(first_page, last_page + 1):
+            values.extend((pages.get(n) or {}).get('values', []))
+        sprints = [parse_sprint(s) for s in values[-count:]]
+        if store and sprints:
+            store.save_sprints(sprints)
+        return sprints, total
+    
+    def _fetch_catalog(self) -> SprintCatalog:
+        """Полная загрузка всех спринтов доски"""
+        catalog = SprintCatalog(self.board_id, self.get_all_sprints(), time.time())
+        store = self.store
+        if store:
+            store.save_board_sprints(self.board_id, catalog.sprints, catalog.loaded_at)
+        return catalog
+    
+    def _refresh_catalog(self, catalog: SprintCatalog) -> SprintCatalog:
+        """
+        Дешевая проверка свежести: закрытые спринты не меняются, поэтому
+        перезапрашиваются только активные и будущие, а из закрытых — лишь
+        появившиеся с прошлого раза (хвост листинга). Если число закрытых не
+        сходится (спринт удален или перенесен), каталог загружается заново.
+        """
+        known = {s.id: s for s in catalog.state('closed')}
+        open_sprints = self.get_all_sprints(state='active,future')
+        new_closed, total_closed = self.get_latest_sprints(state='closed', known_total=len(known))
+        known.update((s.id, s) for s in new_closed)
+        if len(known) != total_closed:
+            return self._fetch_catalog()
         
-        total = data.get('total', 0)
-        if start_at + max_results >= total:
-            break
-        start_at += max_results
+        refreshed = SprintCatalog(self.board_id, list(known.values()) + open_sprints, time.time())
+        store = self.store
+        if store:
+            store.save_board_sprints(self.board_id, refreshed.sprints, refreshed.loaded_at)
+        return refreshed
     
-    return all_issues
+    def _cached_catalog(self) -> SprintCatalog | None:
+        """Каталог из клиента или локального кеша, без запросов к Jira"""
+        catalog = self._catalog
+        if catalog is None:
+            store = self.store
+            saved = store.load_board_sprints(self.board_id) if store else None
+            if saved is not None:
+                catalog = SprintCatalog(self.board_id, *saved)
+        return catalog
+    
+    def has_sprint_catalog(self) -> bool:
+        """Каталог уже загружался (в этом процессе или есть в кеше) — обновлять его дешево"""
+        with self._catalog_lock:
+            return self._cached_catalog() is not None
+    
+    def get_sprint_catalog(self, refresh: bool = False) -> SprintCatalog:
+        """
+        Каталог спринтов доски, общий для всех инструментов.
+        
+        Хранится в клиенте и в локальном кеше; старше SPRINT_CATALOG_TTL
+        секунд (или при refresh) обновляется проверкой свежести, полностью
+        загружается только в первый раз.
+        """
+        with self._catalog_lock:
+            catalog = self._cached_catalog()
+            if catalog is None:
+                catalog = self._fetch_catalog()
+            elif refresh or catalog.expired():
+                catalog = self._refresh_catalog(catalog)
+            self._catalog = catalog
+            return catalog
+    
+    def get_sprint_by_id(self, sprint_id: int) -> Sprint | None:
+        """Получить спринт по ID (из каталога или кеша, если он там актуален)"""
+        catalog = self._catalog
+        if catalog is not None:
+            cached = catalog.get(sprint_id)
+            if cached and (cached.state == 'closed' or not catalog.expired()):
+                return cached
+        
+        store = self.store
+        if store:
+            cached = store.get_sprint(sprint_id)
+            if cached and cached.state == 'closed':
+                return cached
+        
+        data = get(f"{self.base_url}/rest/agile/1.0/sprint/{sprint_id}")
+        if not data:
+            return None
+        
+        sprint = parse_sprint(data)
+        if store:
+            store.save_sprints([sprint])
+        return sprint
+    
+    # -------------------------------------------------------------------------
+    # Задачи
+    # -------------------------------------------------------------------------
+    
+    def get_issue_changelog(self, issue_key: str) -> list[dict] | None:
+        """
+        Полный changelog задачи через отдельный постраничный endpoint.
+        Если endpoint недоступен (старые версии Jira Server), история берется
+        из самой задачи с expand=changelog.
+        """
+        histories = paginate(f"{self.base_url}/rest/api/2/issue/{issue_key}/changelog", 'values')
+        if histories:
+            return histories
+        
+        data = get(f"{self.base_url}/rest/api/2/issue/{issue_key}", {"fields": "key", "expand": "changelog"})
+        if not data:
+            return None
+        return (data.get('changelog') or {}).get('histories')
+    
+    def complete_changelogs(self, raw_issues: list[dict]) -> list[dict]:
+        """Докачать changelog только для задач, у которых он обрезан"""
+        truncated = [i for i in raw_issues if is_changelog_truncated(i)]
+        if not truncated:
+            return raw_issues
+        
+        with _pool(min(MAX_WORKERS, len(truncated))) as pool:
+            full = pool.map(lambda i: self.get_issue_changelog(i.get('key')), truncated)
+            for raw_issue, histories in zip(truncated, full):
+                if not histories:
+                    continue
+                changelog = raw_issue['changelog']
+                merged = {h.get('id'): h for h in changelog.get('histories', [])}
+                merged.update((h.get('id'), h) for h in histories)
+                changelog['histories'] = sorted(merged.values(), key=lambda h: parse_timestamp(h.get('created')) or 0)
+                changelog['total'] = changelog['maxResults'] = len(changelog['histories'])
+        
+        return raw_issues
+    
+    def _fetch_sprint_issues(
+        self,
+        sprint_id: int,
+        fields: str,
+        expand: str | None = None,
+        jql: str | None = None
+    ) -> list[dict]:
+        """Постранично скачать сырые задачи спринта"""
+        params = {"fields": fields}
+        if expand:
+            params["expand"] = expand
+        if jql:
+            params["jql"] = jql
+        raw_issues = paginate(f"{self.base_url}/rest/agile/1.0/sprint/{sprint_id}/issue", 'issues', params)
+        if expand and 'changelog' in expand:
+            self.complete_changelogs(raw_issues)
+        return raw_issues
+    
+    def iter_issue_batches(self, keys: list[str]) -> Iterator[list[Issue]]:
+        """
+        Скачивать задачи с changelog через search API пачками по PAGE_SIZE ключей.
+        Пачки запрашиваются параллельно и отдаются по порядку по мере готовности.
+        """
+        def fetch_batch(batch: list[str]) -> list[Issue]:
+            params = {
+                "jql": f"key in ({','.join(batch)})",
+                "fields": self.issue_fields,
+                "expand": "changelog",
+                # Удаленный ключ — предупреждение, а не 400 на всю пачку
+                "validateQuery": "warn"
+            }
+            raw_issues = self.complete_changelogs(paginate(f"{self.base_url}/rest/api/2/search", 'issues', params))
+            return [self.parse_issue(i) for i in raw_issues]
+        
+        batches = [keys[n:n + PAGE_SIZE] for n in range(0, len(keys), PAGE_SIZE)]
+        if not batches:
+            return
+        with _pool(min(MAX_WORKERS, len(batches))) as pool:
+            yield from pool.map(fetch_batch, batches)
+    
+    def fetch_issues_by_keys(self, keys: list[str]) -> list[Issue]:
+        """Скачать задачи с changelog по списку ключей"""
+        return [issue for batch in self.iter_issue_batches(keys) for issue in batch]
+    
+    def iter_sprint_issues(self, sprint: Sprint) -> Iterator[Issue]:
+        """
+        Потоково отдавать задачи спринта с полным changelog.
+        
+        Задачи отдаются по мере прихода страниц, так что обработка идет
+        параллельно с сетевыми запросами и в памяти не копятся все сырые ответы.
+        Закрытый синхронизированный спринт читается из кеша порциями.
+        """
+        store = self.store
+        if store is None:
+            url = f"{self.base_url}/rest/agile/1.0/sprint/{sprint.id}/issue"
+            for page in iter_pages(url, {"fields": self.issue_fields, "expand": "changelog"}):
+                for raw_issue in self.complete_changelogs(page.get('issues', [])):
+                    yield self.parse_issue(raw_issue)
+            return
+        
+        sync = store.get_sync(sprint.id)
+        if sync and sync[1] == 'closed':
+            yield from store.iter_issues(store.get_sprint_keys(sprint.id))
+            return
+        
+        listing = self._fetch_sprint_issues(sprint.id, "updated")
+        keys = [i.get('key') for i in listing]
+        changed = _changed_keys(listing, store.get_issue_versions(sprint.id) if sync else {})
+        
+        yield from store.iter_issues(sorted(set(keys) - set(changed)))
+        for batch in self.iter_issue_batches(changed):
+            store.save_issues(batch)
+            yield from batch
+        store.save_sprint_keys(sprint.id, keys, sprint.state)
+    
+    def get_sprint_changes(self, sprint_id: int, since: int) -> tuple[list[str], list[dict]]:
+        """
+        Состав спринта и задачи спринта, изменившиеся начиная с since (UTC epoch).
+        
+        Два легких запроса search API: ключи задач спринта и (key, updated)
+        задач с updated >= since. В JQL время задается относительно (-Nm,
+        с точностью до минуты и без зависимости от пояса пользователя Jira),
+        поэтому окно берется с запасом в минуту.
+        """
+        url = f"{self.base_url}/rest/api/2/search"
+        members = paginate(url, 'issues', {"jql": f"sprint = {sprint_id}", "fields": "key"}, SEARCH_PAGE_SIZE)
+        minutes = math.ceil(max(time.time() - since, 0) / 60) + 1
+        params = {"jql": f"sprint = {sprint_id} AND updated >= -{minutes}m", "fields": "updated"}
+        changed = paginate(url, 'issues', params, SEARCH_PAGE_SIZE)
+        return [i.get('key') for i in members], changed
+    
+    def iter_sprints_search(
+        self,
+        sprint_ids: list[int],
+        fields: str,
+        expand: str | None = None
+    ) -> Iterator[list[dict]]:
+        """
+        Сырые задачи нескольких спринтов одним потоком search API (JQL
+        sprint in (...)) страницами максимального размера. Задача, входящая
+        в несколько спринтов, отдается один раз; в fields добавляется поле Sprint.
+        """
+        params = {"fields": f"{fields},{self.sprint_field}"}
+        if expand:
+            params["expand"] = expand
+        seen = set()
+        for n in range(0, len(sprint_ids), SPRINTS_PER_QUERY):
+            chunk = sprint_ids[n:n + SPRINTS_PER_QUERY]
+            params["jql"] = f"sprint in ({','.join(map(str, chunk))}) ORDER BY key"
+            for page in iter_pages(f"{self.base_url}/rest/api/2/search", params, SEARCH_PAGE_SIZE):
+                raw_issues = [i for i in page.get('issues', []) if i.get('key') not in seen]
+                seen.update(i.get('key') for i in raw_issues)
+                if expand and 'changelog' in expand:
+                    self.complete_changelogs(raw_issues)
+                yield raw_issues
+    
+    def _partition(self, raw_issues: list[dict], keys_by_sprint: dict[int, list[str]]):
+        """Разложить ключи задач по спринтам keys_by_sprint по значению поля Sprint"""
+        for raw_issue in raw_issues:
+            for sprint_id in parse_sprint_field((raw_issue.get('fields') or {}).get(self.sprint_field)):
+                keys = keys_by_sprint.get(sprint_id)
+                if keys is not None:
+                    keys.append(raw_issue.get('key'))
+    
+    def _sync_sprints_bulk(self, sprints: list[Sprint]) -> tuple[dict[int, list[str]], dict[str, Issue]]:
+        """
+        Составы спринтов и изменившиеся задачи через search API.
+        
+        Без кеша задачи с changelog скачиваются одним потоком и раскладываются
+        по спринтам локально. С кешем сначала скачивается только (key, updated,
+        Sprint); если изменилась большая часть задач, они берутся тем же
+        потоком с changelog, иначе — по ключам.
+        """
+        store = self.store
+        sprint_ids = [s.id for s in sprints]
+        keys_by_sprint: dict[int, list[str]] = {sprint_id: [] for sprint_id in sprint_ids}
+        issues: dict[str, Issue] = {}
+        
+        if store is None:
+            for raw_issues in self.iter_sprints_search(sprint_ids, self.issue_fields, "changelog"):
+                self._partition(raw_issues, keys_by_sprint)
+                issues.update((i.get('key'), self.parse_issue(i)) for i in raw_issues)
+            return keys_by_sprint, issues
+        
+        listing = []
+        for raw_issues in self.iter_sprints_search(sprint_ids, "updated"):
+            self._partition(raw_issues, keys_by_sprint)
+            listing.extend(raw_issues)
+        known = {}
+        for sprint in sprints:
+            known.update(store.get_issue_versions(sprint.id))
+        changed = _changed_keys(listing, known)
+        
+        if len(changed) * 2 > len(listing):
+            wanted = set(changed)
+            for raw_issues in self.iter_sprints_search(sprint_ids, self.issue_fields, "changelog"):
+                issues.update((i.get('key'), self.parse_issue(i)) for i in raw_issues if i.get('key') in wanted)
+        else:
+            issues.update((i.key, i) for i in self.fetch_issues_by_keys(sorted(changed)))
+        return keys_by_sprint, issues
+    
+    def _sync_sprints(self, sprints: list[Sprint]) -> tuple[dict[int, list[str]], dict[str, Issue]]:
+        """Составы спринтов и изменившиеся задачи через agile API (по спринту на листинг)"""
+        store = self.store
+        keys_by_sprint: dict[int, list[str]] = {}
+        changed = set()
+        with _pool(min(MAX_WORKERS, len(sprints))) as pool:
+            listings = pool.map(lambda sp: self._fetch_sprint_issues(sp.id, "updated"), sprints)
+            for sprint, listing in zip(sprints, listings):
+                keys_by_sprint[sprint.id] = [i.get('key') for i in listing]
+                known = store.get_issue_versions(sprint.id) if store else {}
+                changed.update(_changed_keys(listing, known))
+        return keys_by_sprint, {i.key: i for i in self.fetch_issues_by_keys(sorted(changed))}
+    
+    def get_sprints_issues(self, sprints: list[Sprint]) -> dict[int, list[Issue]]:
+        """
+        Получить задачи нескольких спринтов с полным changelog.
+        
+        Закрытый спринт, уже синхронизированный после закрытия, берется из кеша.
+        Остальные запрашиваются вместе через search API (sprint in (...)) и
+        раскладываются по спринтам по полю Sprint; если поле не найдено —
+        по спринту через agile API. Изменившиеся задачи скачиваются один раз,
+        даже если входят в несколько спринтов. Задача, общая для нескольких
+        спринтов, — один и тот же объект.
+        """
+        store = self.store
+        keys_by_sprint: dict[int, list[str]] = {}
+        to_sync = []
+        for sprint in sprints:
+            sync = store.get_sync(sprint.id) if store else None
+            if sync and sync[1] == 'closed':
+                keys_by_sprint[sprint.id] = store.get_sprint_keys(sprint.id)
+            else:
+                to_sync.append(sprint)
+        
+        issues: dict[str, Issue] = {}
+        if to_sync:
+            sync_sprints = self._sync_sprints_bulk if self.sprint_field else self._sync_sprints
+            synced, issues = sync_sprints(to_sync)
+            keys_by_sprint.update(synced)
+        if store:
+            store.save_issues(list(issues.values()))
+            for sprint in to_sync:
+                store.save_sprint_keys(sprint.id, keys_by_sprint[sprint.id], sprint.state)
+            needed = {key for keys in keys_by_sprint.values() for key in keys}
+            issues.update(store.load_issues(sorted(needed - issues.keys())))
+        
+        return {
+            sprint_id: [issues[key] for key in sorted(keys) if key in issues]
+            for sprint_id, keys in keys_by_sprint.items()
+        }
+    
+    def get_sprint_issues_with_changelog(self, sprint_id: int) -> list[Issue]:
+        """Получить все задачи спринта с полным changelog"""
+        sprint = self.get_sprint_by_id(sprint_id)
+        if sprint is None:
+            return []
+        return sorted(self.iter_sprint_issues(sprint), key=lambda i: i.key)
+    
+    # -------------------------------------------------------------------------
+    # Ворклоги
+    # -------------------------------------------------------------------------
+    
+    def _worklog_ids(self, kind: str, since: int) -> tuple[list[int], int]:
+        """
+        ID ворклогов, измененных (kind='updated') или удаленных ('deleted')
+        начиная с since (UTC epoch, мс), и момент, с которого продолжать.
+        Страницы (до 1000 ID) идут цепочкой: следующая — с until предыдущей.
+        """
+        url = f"{self.base_url}/rest/api/2/worklog/{kind}"
+        ids = {}
+        until = since
+        while True:
+            page = get(url, {"since": until}) or {}
+            values = page.get('values', [])
+            for value in values:
+                ids[value['worklogId']] = None
+            until = page.get('until') or until
+            if page.get('lastPage', True) or not values:
+                break
+        return list(ids), until
+    
+    def _fetch_worklogs(self, ids: list[int]) -> list[Worklog]:
+        """Ворклоги по ID: пачки по WORKLOGS_PER_REQUEST, параллельно"""
+        if not ids:
+            return []
+        url = f"{self.base_url}/rest/api/2/worklog/list"
+        batches = [ids[n:n + WORKLOGS_PER_REQUEST] for n in range(0, len(ids), WORKLOGS_PER_REQUEST)]
+        worklogs = []
+        with _pool(min(MAX_WORKERS, len(batches))) as pool:
+            for raw_worklogs in pool.map(lambda batch: post(url, {"ids": batch}), batches):
+                worklogs.extend(parse_worklog(w) for w in raw_worklogs or [])
+        return worklogs
+    
+    def get_worklogs(self, start: int, end: int) -> WorklogIndex:
+        """
+        Ворклоги экземпляра Jira, начатые в [start, end] (UTC epoch).
+        
+        Вместо запросов по каждой задаче используются bulk-методы: список
+        ID ворклогов, измененных с момента start (/worklog/updated), и сами
+        ворклоги по 1000 ID за запрос (POST /worklog/list). С кешем
+        ворклоги сохраняются вместе с моментом, до которого список пройден,
+        и следующий вызов запрашивает только изменения и удаления с него.
+        
+        Ворклог, созданный до start, но с датой начала в окне, не попадает.
+        """
+        since = start * 1000
+        store = self.store
+        if store is None:
+            ids, _ = self._worklog_ids('updated', since)
+            return WorklogIndex(
+                w for w in self._fetch_worklogs(ids)
+                if w.started is not None and start <= w.started <= end
+            )
+        
+        covered = store.get_meta('worklogs_since')
+        if covered is not None and int(covered) <= since:
+            since = int(store.get_meta('worklogs_until') or covered)
+        else:
+            covered = since
+        ids, until = self._worklog_ids('updated', since)
+        # Удаления запрашиваются после изменений, поэтому until изменений подходит и для них
+        deleted, _ = self._worklog_ids('deleted', since)
+        store.save_worklogs(self._fetch_worklogs(ids))
+        store.delete_worklogs(deleted)
+        store.set_meta('worklogs_since', str(covered))
+        store.set_meta('worklogs_until', str(until))
+        return WorklogIndex(store.load_worklogs(start, end))
+
+
+def get_client(
+    board_id: int | None = None,
+    base_url: str | None = None,
+    story_points_field: str | None = None
+) -> JiraClient:
+    """
+    Общий клиент для доски (создается один раз на процесс); не заданные
+    параметры берутся из настроек (get_config)
+    """
+    config = get_config()
+    base_url = (base_url or config.base_url).rstrip("/")
+    board_id = board_id or config.board_id
+    story_points_field = story_points_field or config.story_points_field
+    key = (base_url, board_id, story_points_field)
+    with _init_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = JiraClient(base_url, board_id, story_points_field)
+    return client
+
+
+# =============================================================================
+# Функции клиента по умолчанию
+# =============================================================================
+
+def get_all_sprints(board_id: int | None = None, state: str | None = None) -> list[Sprint]:
+    return get_client(board_id).get_all_sprints(state)
+
+
+def get_latest_sprints(
+    count: int = 0,
+    state: str = 'closed',
+    board_id: int | None = None,
+    known_total: int | None = None
+) -> tuple[list[Sprint], int]:
+    return get_client(board_id).get_latest_sprints(count, state, known_total)
+
+
+def get_sprint_catalog(board_id: int | None = None, refresh: bool = False) -> SprintCatalog:
+    return get_client(board_id).get_sprint_catalog(refresh)
+
+
+def get_story_points_name() -> str:
+    return get_client().story_points_name
+
+
+def get_sprint_by_id(sprint_id: int, board_id: int | None = None) -> Sprint | None:
+    return get_client(board_id).get_sprint_by_id(sprint_id)
+
+
+def get_real_sprint_names(board_id: int | None = None) -> set[str]:
+    """Получить имена всех настоящих спринтов"""
+    return set(get_sprint_catalog(board_id).real_names)
+
+
+def get_real_sprint_ids(board_id: int | None = None) -> set[int]:
+    """Получить ID всех настоящих спринтов"""
+    return set(get_sprint_catalog(board_id).real_ids)
+
+
+def get_issue_changelog(issue_key: str) -> list[dict] | None:
+    return get_client().get_issue_changelog(issue_key)
+
+
+def complete_changelogs(raw_issues: list[dict]) -> list[dict]:
+    return get_client().complete_changelogs(raw_issues)
+
+
+def iter_issue_batches(keys: list[str]) -> Iterator[list[Issue]]:
+    return get_client().iter_issue_batches(keys)
+
+
+def fetch_issues_by_keys(keys: list[str]) -> list[Issue]:
+    return get_client().fetch_issues_by_keys(keys)
+
+
+def iter_sprint_issues(sprint: Sprint) -> Iterator[Issue]:
+    return get_client().iter_sprint_issues(sprint)
+
+
+def get_sprints_issues(sprints: list[Sprint]) -> dict[int, list[Issue]]:
+    return get_client().get_sprints_issues(sprints)
+
+
+def get_sprint_changes(sprint_id: int, since: int) -> tuple[list[str], list[dict]]:
+    return get_client().get_sprint_changes(sprint_id, since)
+
+
+def get_worklogs(start: int, end: int) -> WorklogIndex:
+    return get_client().get_worklogs(start, end)
+
+
+def get_sprint_issues_with_changelog(sprint_id: int) -> list[Issue]:
+    return get_client().get_sprint_issues_with_changelog(sprint_id)
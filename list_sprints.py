@@ -1,24 +1,38 @@
 """
 Вывод списка спринтов доски
+
+Если каталог спринтов доски уже загружался (get_sprint_catalog), список
+берется из него: запрашиваются только активные, будущие и новые закрытые
+спринты. Иначе (первый запуск, JIRA_NO_CACHE) полный каталог не грузится:
+активные и будущие спринты запрашиваются с фильтром state, из закрытых —
+только последние CLOSED_LIMIT.
 """
 
-from jira_client import get_all_sprints, BOARD_ID
+import argparse
+import sys
 
+import profiling
+from profiling import phase
+from jira_client import JiraError, get_client
 
-def main():
-    print("Получение списка спринтов...")
-    sprints = get_all_sprints(BOARD_ID)
-    
+CLOSED_LIMIT = 20
+FUTURE_LIMIT = 10
+
+
+def print_sprints(sprints: list, closed_total: int | None = None):
+    """closed_total — число закрытых спринтов, если в sprints есть только последние"""
     # Группируем по состоянию
     active = [s for s in sprints if s.state == 'active']
     closed = [s for s in sprints if s.state == 'closed']
     future = [s for s in sprints if s.state == 'future']
+    if closed_total is None:
+        closed_total = len(closed)
     
     # Сортируем закрытые по ID (новые сверху)
     closed_sorted = sorted(closed, key=lambda x: x.id, reverse=True)
     
-    print(f"\nВсего спринтов: {len(sprints)}")
-    print(f"  Active: {len(active)}, Closed: {len(closed)}, Future: {len(future)}")
+    print(f"\nВсего спринтов: {len(active) + closed_total + len(future)}")
+    print(f"  Active: {len(active)}, Closed: {closed_total}, Future: {len(future)}")
     
     # Активные
     if active:
@@ -34,11 +48,11 @@ def main():
     
     # Закрытые (последние 20)
     print(f"\n{'='*70}")
-    print("ЗАКРЫТЫЕ СПРИНТЫ (последние 20)")
+    print(f"ЗАКРЫТЫЕ СПРИНТЫ (последние {CLOSED_LIMIT})")
     print(f"{'='*70}")
     print(f"{'ID':<8} {'Название':<40} {'Период'}")
     print(f"{'-'*70}")
-    for s in closed_sorted[:20]:
+    for s in closed_sorted[:CLOSED_LIMIT]:
         start = s.start_date.strftime('%Y-%m-%d') if s.start_date else 'N/A'
         end = s.end_date.strftime('%Y-%m-%d') if s.end_date else 'N/A'
         print(f"{s.id:<8} {s.name:<40} {start} - {end}")
@@ -50,7 +64,7 @@ def main():
         print(f"{'='*70}")
         print(f"{'ID':<8} {'Название':<40}")
         print(f"{'-'*70}")
-        for s in future[:10]:
+        for s in future[:FUTURE_LIMIT]:
             print(f"{s.id:<8} {s.name:<40}")
     
     print(f"\n{'='*70}")
@@ -60,5 +74,44 @@ def main():
     print(f"{'='*70}")
 
 
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Список спринтов доски")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Вывести профиль запуска: запросы к Jira и время фаз"
+    )
+    parser.add_argument(
+        "--profile-json",
+        metavar="FILE",
+        help="Сохранить подробный профиль в JSON (включает --profile)"
+    )
+    args = parser.parse_args(argv)
+    if args.profile or args.profile_json:
+        profiling.enable()
+    
+    print("Получение списка спринтов...")
+    client = get_client()
+    try:
+        with phase("sprint lookup"):
+            if client.has_sprint_catalog():
+                sprints = client.get_sprint_catalog().sprints
+                closed_total = None
+            else:
+                sprints = client.get_all_sprints(state='active,future')
+                closed, closed_total = client.get_latest_sprints(CLOSED_LIMIT, 'closed')
+                sprints += closed
+    except JiraError as e:
+        print(f"Ошибка запроса к Jira: {e}")
+        sys.exit(1)
+    with phase("render"):
+        print_sprints(sprints, closed_total)
+    
+    if args.profile or args.profile_json:
+        profiling.print_summary()
+    if args.profile_json:
+        profiling.write_trace(args.profile_json)
+
+
 if __name__ == "__main__":
     main()
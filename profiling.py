@@ -0,0 +1,161 @@
+"""
+Профилирование запусков отчетов (--profile)
+
+Собирает метрики HTTP-запросов (задержка, объем ответа, время разбора
+JSON, статус, повторы) и время фаз работы скрипта (wall и CPU).
+Пока профилирование не включено, вызовы record_*() и phase() почти
+ничего не стоят.
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Iterator, TextIO
+from urllib.parse import urlsplit
+
+
+@dataclass(slots=True)
+class RequestMetric:
+    """Один запрос к Jira"""
+    endpoint: str
+    latency: float
+    bytes: int = 0
+    decode: float = 0.0
+    status: int | None = None
+    retries: int = 0
+
+
+@dataclass(slots=True)
+class PhaseMetric:
+    """Накопленное время фазы"""
+    wall: float = 0.0
+    cpu: float = 0.0
+    calls: int = 0
+
+
+@dataclass
+class Profiler:
+    enabled: bool = False
+    requests: list[RequestMetric] = field(default_factory=list)
+    phases: dict[str, PhaseMetric] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+
+PROFILER = Profiler()
+
+
+def enable():
+    PROFILER.enabled = True
+    PROFILER.started = time.perf_counter()
+
+
+# Префикс API с версией (/rest/api/2, /rest/agile/1.0): числа в нем — не ID
+_API_PREFIX_RE = re.compile(r"/rest/[^/]+/[^/]+")
+
+
+def endpoint_name(url: str) -> str:
+    """Путь запроса с числовыми ID и ключами задач (после версии API), замененными на шаблоны"""
+    path = urlsplit(url).path
+    match = _API_PREFIX_RE.search(path)
+    split = match.end() if match else 0
+    prefix, rest = path[:split], path[split:]
+    rest = re.sub(r"/[A-Z][A-Z0-9_]+-\d+(?=/|$)", "/{key}", rest)
+    return prefix + re.sub(r"/\d+(?=/|$)", "/{id}", rest)
+
+
+def record_request(
+    url: str,
+    latency: float,
+    nbytes: int = 0,
+    decode: float = 0.0,
+    status: int | None = None,
+    retries: int = 0
+):
+    """retries — сколько раз этот запрос повторялся до ответа"""
+    if not PROFILER.enabled:
+        return
+    endpoint = endpoint_name(url)
+    with PROFILER._lock:
+        PROFILER.requests.append(RequestMetric(endpoint, latency, nbytes, decode, status, retries))
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Учесть wall и CPU время блока; повторные входы суммируются"""
+    if not PROFILER.enabled:
+        yield
+        return
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        with PROFILER._lock:
+            metric = PROFILER.phases.setdefault(name, PhaseMetric())
+            metric.wall += wall
+            metric.cpu += cpu
+            metric.calls += 1
+
+
+def _endpoint_summary() -> dict[str, dict]:
+    summary: dict[str, dict] = {}
+    for r in PROFILER.requests:
+        s = summary.setdefault(r.endpoint, {
+            "pages": 0, "latency": 0.0, "max_latency": 0.0,
+            "bytes": 0, "decode": 0.0, "retries": 0, "errors": 0
+        })
+        s["pages"] += 1
+        s["latency"] += r.latency
+        s["max_latency"] = max(s["max_latency"], r.latency)
+        s["bytes"] += r.bytes
+        s["decode"] += r.decode
+        s["retries"] += r.retries
+        if r.status is not None and r.status != 200:
+            s["errors"] += 1
+    return summary
+
+
+def print_summary(out: TextIO = sys.stderr):
+    """Таблицы фаз и запросов по endpoint"""
+    total = time.perf_counter() - PROFILER.started
+    print(f"\n{'='*90}", file=out)
+    print(f"ПРОФИЛЬ (всего {total:.2f}s)", file=out)
+    print(f"{'='*90}", file=out)
+    print(f"  {'Фаза':<40} {'Wall':>10} {'CPU':>10} {'Вызовов':>10}", file=out)
+    print(f"  {'-'*72}", file=out)
+    for name, m in PROFILER.phases.items():
+        print(f"  {name:<40} {m.wall:>9.3f}s {m.cpu:>9.3f}s {m.calls:>10}", file=out)
+
+    summary = _endpoint_summary()
+    if summary:
+        print(f"\n  {'Endpoint':<44} {'Стр.':>5} {'Сумма':>8} {'Сред.':>7} {'Макс.':>7} {'KiB':>8} {'JSON':>7} {'Повт.':>5}", file=out)
+        print(f"  {'-'*96}", file=out)
+        for endpoint, s in sorted(summary.items(), key=lambda x: -x[1]["latency"]):
+            avg = s["latency"] / s["pages"]
+            print(
+                f"  {endpoint[-44:]:<44} {s['pages']:>5} {s['latency']:>7.2f}s {avg:>6.3f}s "
+                f"{s['max_latency']:>6.3f}s {s['bytes'] / 1024:>8.1f} {s['decode']:>6.3f}s {s['retries']:>5}",
+                file=out
+            )
+    print(f"{'='*90}", file=out)
+
+
+def write_trace(path: str):
+    """Сохранить все метрики в JSON"""
+    trace = {
+        "total": time.perf_counter() - PROFILER.started,
+        "phases": {name: asdict(m) for name, m in PROFILER.phases.items()},
+        "endpoints": _endpoint_summary(),
+        "requests": [asdict(r) for r in PROFILER.requests],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(trace, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,120 @@
+"""
+Ограничение нагрузки на Jira: темп, параллельность и паузы между повторами
+
+TokenBucket — общий для всех потоков темп запросов (запросов в секунду с
+допустимым всплеском); Retry-After из ответа Jira ставит на паузу всех.
+AdaptiveLimiter — предел одновременных запросов по AIMD: после успешных
+ответов предел растет на единицу за "окно" (limit успешных запросов), на
+429/503 — уменьшается вдвое, но не чаще раза за время отклика.
+"""
+
+import random
+import threading
+import time
+
+# Ограничение на паузу из Retry-After, секунд
+MAX_RETRY_AFTER = 120.0
+
+
+class TokenBucket:
+    """Не больше rate запросов в секунду (rate <= 0 — без ограничения темпа)"""
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.capacity = max(1.0, burst if burst is not None else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.rate <= 0:
+                    return
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Не выдавать запросы ближайшие seconds секунд (Retry-After)"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class AdaptiveLimiter:
+    """Предел одновременных запросов, общий для всех потоков, с AIMD-подстройкой"""
+
+    def __init__(self, limit: int):
+        self.max_limit = max(1, limit)
+        self.limit = float(self.max_limit)
+        self.active = 0
+        self._cooldown_until = 0.0
+        self._cond = threading.Condition()
+
+    def set_limit(self, limit: int):
+        """Задать верхний предел; текущий сбрасывается на него"""
+        with self._cond:
+            self.max_limit = max(1, limit)
+            self.limit = float(self.max_limit)
+            self._cond.notify_all()
+
+    def on_success(self):
+        """Аддитивный рост: +1 к пределу за limit успешных ответов"""
+        with self._cond:
+            if self.limit < self.max_limit:
+                before = int(self.limit)
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+                if int(self.limit) > before:
+                    self._cond.notify()
+
+    def on_throttle(self, latency: float = 1.0):
+        """Мультипликативное снижение; ответы, пришедшие в том же окне, не снижают повторно"""
+        with self._cond:
+            now = time.monotonic()
+            if now < self._cooldown_until:
+                return
+            self.limit = max(1.0, self.limit / 2)
+            self._cooldown_until = now + max(latency, 0.1)
+
+    def __enter__(self):
+        with self._cond:
+            while self.active >= int(self.limit):
+                self._cond.wait()
+            self.active += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """Экспоненциальная задержка с полным джиттером для попытки attempt (с 0)"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After в секундах: число секунд или HTTP-дата; None, если заголовка нет"""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        # email.utils заметно удлиняет импорт, а HTTP-дата в Retry-After редкость
+        from email.utils import parsedate_to_datetime
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
@@ -0,0 +1,184 @@
+"""
+Модель отчета по спринту и ее вывод в JSON / CSV
+
+Агрегаты считаются один раз при категоризации (DeveloperStats.totals),
+здесь они только собираются в SprintReport и сериализуются.
+
+Если к отчету запрошены ворклоги (SprintReport.worklogs), в итогах
+появляется sprint_time_spent — время, списанное в окне спринта, — и
+разбивка этого времени по авторам ворклогов (author_spent).
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from burndown import Burndown, burndown_to_dict
+from jira_client import Sprint, DeveloperStats, CategoryTotals, WorklogIndex, CATEGORY_NAMES
+
+# Ключ строки с итогами по команде в CSV
+TEAM_KEY = "__team__"
+
+
+@dataclass
+class SprintReport:
+    """Категоризированный отчет по спринту"""
+    sprint: Sprint
+    developers: dict[str, DeveloperStats]
+    team: dict[str, CategoryTotals] = field(default_factory=dict)
+    issue_count: int = 0
+    burndown: Burndown | None = None
+    # Ворклоги экземпляра Jira в окне спринта (None — не запрашивались)
+    worklogs: WorklogIndex | None = None
+
+
+@dataclass
+class AuthorSpent:
+    """Время, списанное автором ворклогов в окне спринта, секунды"""
+    name: str
+    by_category: dict[str, int]
+    sprint: int = 0  # на задачи спринта (каждая задача учтена один раз)
+    period: int = 0  # всего за окно спринта, включая задачи вне спринта
+
+
+def author_spent(report: SprintReport) -> dict[str, AuthorSpent]:
+    """Разбивка списанного в спринте по авторам ворклогов и категориям"""
+    worklogs = report.worklogs
+    result: dict[str, AuthorSpent] = {}
+    sprint_issues = {}
+    for stats in report.developers.values():
+        for category in CATEGORY_NAMES:
+            for issue in getattr(stats, category):
+                sprint_issues[issue.key] = issue
+                for author_key, seconds in worklogs.issue_authors(issue.id).items():
+                    spent = result.get(author_key)
+                    if spent is None:
+                        spent = result[author_key] = AuthorSpent(
+                            worklogs.authors[author_key], dict.fromkeys(CATEGORY_NAMES, 0)
+                        )
+                    spent.by_category[category] += seconds
+    for issue in sprint_issues.values():
+        for author_key, seconds in worklogs.issue_authors(issue.id).items():
+            result[author_key].sprint += seconds
+    for author_key, spent in result.items():
+        spent.period = worklogs.author_spent(author_key)
+    return result
+
+
+def _format_date(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def totals_to_dict(totals: CategoryTotals, sprint_spent: bool = False) -> dict:
+    data = {
+        "count": totals.count,
+        "story_points": totals.story_points,
+        "time_estimate": totals.time_estimate,
+        "time_spent": totals.time_spent,
+    }
+    if sprint_spent:
+        data["sprint_time_spent"] = totals.sprint_time_spent
+    return data
+
+
+def sprint_to_dict(sprint: Sprint) -> dict:
+    return {
+        "id": sprint.id,
+        "name": sprint.name,
+        "state": sprint.state,
+        "start_date": _format_date(sprint.start_date),
+        "end_date": _format_date(sprint.end_date),
+        "activated_date": _format_date(sprint.activated_date),
+        "complete_date": _format_date(sprint.complete_date),
+    }
+
+
+def report_to_dict(report: SprintReport) -> dict:
+    sprint_spent = report.worklogs is not None
+    data = {
+        "sprint": sprint_to_dict(report.sprint),
+        "issue_count": report.issue_count,
+        "team": {name: totals_to_dict(report.team[name], sprint_spent) for name in CATEGORY_NAMES},
+        "developers": [
+            {
+                "key": dev_key,
+                "name": stats.name,
+                "totals": {name: totals_to_dict(stats.totals[name], sprint_spent) for name in CATEGORY_NAMES},
+                "issues": {
+                    name: sorted(issue.key for issue in getattr(stats, name))
+                    for name in CATEGORY_NAMES
+                },
+            }
+            for dev_key, stats in sorted(report.developers.items(), key=lambda x: x[1].name)
+        ],
+    }
+    if report.burndown is not None:
+        data["burndown"] = burndown_to_dict(report.burndown)
+    if sprint_spent:
+        data["worklog_authors"] = [
+            {
+                "key": author_key,
+                "name": spent.name,
+                "sprint_time_spent": spent.sprint,
+                "period_time_spent": spent.period,
+                "by_category": spent.by_category,
+            }
+            for author_key, spent in sorted(author_spent(report).items(), key=lambda x: x[1].name)
+        ]
+    return data
+
+
+def render_json(report: SprintReport) -> str:
+    return json.dumps(report_to_dict(report), ensure_ascii=False, indent=2)
+
+
+def render_trend_json(reports: list[SprintReport]) -> str:
+    """Тренд: отчеты спринтов в порядке тренда"""
+    return json.dumps({"sprints": [report_to_dict(r) for r in reports]}, ensure_ascii=False, indent=2)
+
+
+def _csv_header(sprint_spent: bool) -> list[str]:
+    return [
+        "sprint_id", "sprint_name", "developer_key", "developer", "category",
+        "count", "story_points", "time_estimate", "time_spent",
+        *(["sprint_time_spent"] if sprint_spent else [])
+    ]
+
+
+def _write_csv_rows(writer, report: SprintReport, sprint_spent: bool):
+    rows = [
+        (dev_key, stats.name, stats.totals)
+        for dev_key, stats in sorted(report.developers.items(), key=lambda x: x[1].name)
+    ]
+    rows.append((TEAM_KEY, "Команда", report.team))
+
+    for dev_key, name, totals in rows:
+        for category in CATEGORY_NAMES:
+            t = totals[category]
+            writer.writerow([
+                report.sprint.id, report.sprint.name, dev_key, name, category,
+                t.count, t.story_points, t.time_estimate, t.time_spent,
+                *([t.sprint_time_spent] if sprint_spent else [])
+            ])
+
+
+def render_csv(report: SprintReport) -> str:
+    """Одна строка на пару (разработчик, категория) плюс строки итогов команды"""
+    sprint_spent = report.worklogs is not None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(_csv_header(sprint_spent))
+    _write_csv_rows(writer, report, sprint_spent)
+    return buffer.getvalue()
+
+
+def render_trend_csv(reports: list[SprintReport]) -> str:
+    """Строки render_csv всех спринтов тренда под одним заголовком"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(_csv_header(False))
+    for report in reports:
+        _write_csv_rows(writer, report, False)
+    return buffer.getvalue()
@@ -0,0 +1,335 @@
+"""
+HTTP-сервер отчетов по спринтам
+
+Держит в памяти список спринтов и уже собранные отчеты, отвечает на
+повторные запросы без обращения к Jira и в фоне обновляет отчеты по
+незакрытым спринтам. Одинаковые одновременные запросы объединяются в одну
+загрузку из Jira.
+
+Использование:
+    python report_server.py --port 8080 --refresh 300
+
+Endpoints:
+    GET /health
+    GET /sprints
+    GET /report/<sprint_id>?format=json|text|csv[&refresh=1]
+    POST /webhook[?token=...]   (только с --webhooks)
+
+С --webhooks сервер принимает вебхуки Jira (см. webhooks.py) и пересобирает
+отчеты только по затронутым спринтам из локального хранилища; фоновое
+обновление остается как периодическая сверка на случай потерянных событий.
+Если задан JIRA_WEBHOOK_SECRET, вебхук должен передавать его в ?token=.
+
+Для проверки без Jira: python bench/fake_jira.py --port 8081 и
+JIRA_BASE_URL=http://127.0.0.1:8081 python report_server.py
+"""
+
+import argparse
+import hmac
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Hashable
+from urllib.parse import parse_qs, urlsplit
+
+from jira_client import JiraError, Sprint, get_sprint_by_id, get_sprint_catalog, get_store, is_real_sprint
+from report_model import SprintReport, render_json, render_csv, sprint_to_dict
+from sprint_report import categorize_sprint, render_text
+from webhooks import WebhookProcessor
+
+# Через сколько секунд список спринтов считается устаревшим
+SPRINTS_TTL = 300
+WEBHOOK_SECRET = os.environ.get("JIRA_WEBHOOK_SECRET")
+# Ограничение на размер тела вебхука
+MAX_WEBHOOK_BYTES = 5 * 1024 * 1024
+
+
+class ReportService:
+    """Теплый кеш спринтов и отчетов"""
+
+    def __init__(self, sprints_ttl: int = SPRINTS_TTL):
+        self.sprints_ttl = sprints_ttl
+        self._lock = threading.Lock()
+        self._sprints: dict[int, Sprint] = {}
+        self._real_sprint_ids: set[int] = set()
+        self._sprints_loaded_at = 0.0
+        self._reports: dict[int, SprintReport] = {}
+        self._dirty: set[int] = set()
+        self._inflight: dict[Hashable, Future] = {}
+
+    def _single_flight(self, key: Hashable, func: Callable):
+        """Выполнить func один раз для всех одновременных запросов с ключом key"""
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    # -------------------------------------------------------------------------
+    # Спринты
+    # -------------------------------------------------------------------------
+
+    def _load_sprints(self):
+        catalog = get_sprint_catalog(refresh=True)
+        with self._lock:
+            self._sprints = dict(catalog.by_id)
+            self._real_sprint_ids = set(catalog.real_ids)
+            self._sprints_loaded_at = time.monotonic()
+
+    def sprints(self, refresh: bool = False) -> list[Sprint]:
+        stale = time.monotonic() - self._sprints_loaded_at > self.sprints_ttl
+        if refresh or stale or not self._sprints:
+            self._single_flight("sprints", self._load_sprints)
+        return list(self._sprints.values())
+
+    def real_sprint_ids(self) -> set[int]:
+        self.sprints()
+        return self._real_sprint_ids
+
+    def update_sprint(self, sprint: Sprint) -> bool:
+        """Обновить спринт из вебхука; True, если изменился набор настоящих спринтов"""
+        real = is_real_sprint(sprint)
+        with self._lock:
+            self._sprints[sprint.id] = sprint
+            changed = real != (sprint.id in self._real_sprint_ids)
+            if real:
+                self._real_sprint_ids = self._real_sprint_ids | {sprint.id}
+            else:
+                self._real_sprint_ids = self._real_sprint_ids - {sprint.id}
+        return changed
+
+    # -------------------------------------------------------------------------
+    # Отчеты
+    # -------------------------------------------------------------------------
+
+    def cached_sprint_ids(self) -> set[int]:
+        return set(self._reports)
+
+    def mark_dirty(self, sprint_ids: set[int]):
+        """Пересобрать отчеты по этим спринтам из хранилища при следующем запросе"""
+        with self._lock:
+            self._dirty |= set(sprint_ids) & set(self._reports)
+
+    def _build(self, sprint_id: int, local: bool = False) -> SprintReport | None:
+        real_sprint_ids = self.real_sprint_ids()
+        sprint = self._sprints.get(sprint_id) or get_sprint_by_id(sprint_id)
+        if sprint is None:
+            return None
+        with self._lock:
+            self._dirty.discard(sprint_id)
+        store = get_store()
+        if local and store is not None:
+            # Данные уже обновлены вебхуками — Jira не нужна
+            issues = store.iter_issues(store.get_sprint_keys(sprint_id))
+            report = categorize_sprint(sprint, real_sprint_ids, issues)
+        else:
+            report = categorize_sprint(sprint, real_sprint_ids)
+        with self._lock:
+            self._reports[sprint_id] = report
+        return report
+
+    def report(self, sprint_id: int, refresh: bool = False) -> SprintReport | None:
+        cached = self._reports.get(sprint_id)
+        if cached is not None and not refresh:
+            if sprint_id not in self._dirty:
+                return cached
+            return self._single_flight(("report", sprint_id), lambda: self._build(sprint_id, local=True))
+        return self._single_flight(("report", sprint_id), lambda: self._build(sprint_id))
+
+    def refresh_active(self):
+        """Обновить список спринтов и отчеты по незакрытым спринтам"""
+        self.sprints(refresh=True)
+        for sprint_id, report in list(self._reports.items()):
+            current = self._sprints.get(sprint_id)
+            if report.sprint.state != 'closed' or (current and current.state != report.sprint.state):
+                self.report(sprint_id, refresh=True)
+
+    def start_background_refresh(self, interval: int) -> threading.Thread:
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh_active()
+                except Exception:
+                    traceback.print_exc()
+
+        thread = threading.Thread(target=loop, name="report-refresh", daemon=True)
+        thread.start()
+        return thread
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    server_version = "JiraSprintReport/1.0"
+
+    @property
+    def service(self) -> ReportService:
+        return self.server.service
+
+    @property
+    def webhooks(self) -> WebhookProcessor | None:
+        return self.server.webhooks
+
+    def _send(self, status: int, body: str, content_type: str = "application/json; charset=utf-8"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, message: str):
+        self._send(status, json.dumps({"error": message}, ensure_ascii=False))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        parts = [p for p in url.path.split("/") if p]
+        try:
+            if parts == ["health"]:
+                self._send(200, json.dumps({"status": "ok"}))
+            elif parts == ["sprints"]:
+                refresh = query.get("refresh", ["0"])[0] == "1"
+                sprints = sorted(self.service.sprints(refresh), key=lambda s: s.id)
+                body = [{**sprint_to_dict(s), "real": is_real_sprint(s)} for s in sprints]
+                self._send(200, json.dumps(body, ensure_ascii=False))
+            elif len(parts) == 2 and parts[0] == "report":
+                self._report(parts[1], query)
+            else:
+                self._error(404, "not found")
+        except JiraError as e:
+            # Jira недоступна и после повторов — неполный отчет не отдаем
+            self._error(502, str(e))
+        except Exception as e:
+            traceback.print_exc()
+            self._error(500, str(e))
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path.rstrip("/") != "/webhook" or self.webhooks is None:
+            self._error(404, "not found")
+            return
+        if WEBHOOK_SECRET and not hmac.compare_digest(query.get("token", [""])[0], WEBHOOK_SECRET):
+            self._error(403, "invalid token")
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_WEBHOOK_BYTES:
+            self._error(400, "invalid body size")
+            return
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except ValueError:
+            self._error(400, "invalid json")
+            return
+        if not isinstance(payload, dict):
+            self._error(400, "payload must be an object")
+            return
+        try:
+            result = self.webhooks.handle(payload)
+        except Exception as e:
+            traceback.print_exc()
+            self._error(500, str(e))
+            return
+        self._send(200, json.dumps(result, ensure_ascii=False))
+
+    def _report(self, sprint_id: str, query: dict):
+        if not sprint_id.isdigit():
+            self._error(400, "sprint id must be a number")
+            return
+        fmt = query.get("format", ["json"])[0]
+        if fmt not in ("json", "text", "csv"):
+            self._error(400, "format must be json, text or csv")
+            return
+        refresh = query.get("refresh", ["0"])[0] == "1"
+
+        report = self.service.report(int(sprint_id), refresh)
+        if report is None:
+            self._error(404, f"sprint {sprint_id} not found")
+        elif fmt == "json":
+            self._send(200, render_json(report))
+        elif fmt == "csv":
+            self._send(200, render_csv(report), "text/csv; charset=utf-8")
+        else:
+            self._send(200, render_text(report), "text/plain; charset=utf-8")
+
+
+def make_server(
+    host: str,
+    port: int,
+    service: ReportService,
+    webhooks: WebhookProcessor | None = None
+) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), ReportHandler)
+    server.service = service
+    server.webhooks = webhooks
+    return server
+
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(prog=prog, description="HTTP-сервер отчетов по спринтам")
+    parser.add_argument("--host", default="127.0.0.1", help="Адрес (по умолчанию 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Порт (по умолчанию 8080)")
+    parser.add_argument(
+        "--refresh",
+        type=int,
+        default=300,
+        help="Период фонового обновления незакрытых спринтов, секунд (0 — выключено)"
+    )
+    parser.add_argument(
+        "--warm",
+        type=int,
+        nargs="*",
+        default=[],
+        metavar="SPRINT_ID",
+        help="Собрать отчеты по этим спринтам при старте"
+    )
+    parser.add_argument(
+        "--webhooks",
+        action="store_true",
+        help="Принимать вебхуки Jira на POST /webhook (нужен кеш, без JIRA_NO_CACHE)"
+    )
+    args = parser.parse_args(argv)
+
+    service = ReportService()
+    webhooks = None
+    if args.webhooks:
+        store = get_store()
+        if store is None:
+            parser.error("--webhooks требует локального кеша (уберите JIRA_NO_CACHE)")
+        webhooks = WebhookProcessor(service, store)
+    service.sprints()
+    for sprint_id in args.warm:
+        service.report(sprint_id)
+    if args.refresh > 0:
+        service.start_background_refresh(args.refresh)
+
+    server = make_server(args.host, args.port, service, webhooks)
+    print(f"Сервер отчетов: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
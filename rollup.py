@@ -0,0 +1,255 @@
+"""
+Сводный отчет по нескольким доскам
+
+Отчеты по доскам собираются параллельно (поток на доску), а общее число
+одновременных запросов к Jira ограничено --concurrency для всех досок сразу.
+Категоризированная статистика разработчиков объединяется в сводку по
+отделу; задача, попавшая в спринты нескольких досок одного экземпляра Jira,
+учитывается один раз.
+
+Использование:
+    python rollup.py --boards 803 812 905
+    python rollup.py --config boards.json --active --format json -o rollup.json
+
+Формат boards.json (base_url, story_points_field и токен необязательны):
+    [
+        {"name": "Добыча данных", "board_id": 803},
+        {"name": "Платформа", "board_id": 905,
+         "base_url": "https://jira.example.com", "story_points_field": "customfield_10002",
+         "token_env": "JIRA_EXAMPLE_TOKEN"}
+    ]
+
+Токен из настроек (JIRA_TOKEN, файл конфигурации) отправляется только на
+экземпляр Jira из настроек; доскам другого экземпляра нужен свой токен —
+"token_env" (имя переменной окружения) или "token".
+"""
+
+import argparse
+import json
+import os
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TextIO
+
+import jira_client
+from jira_client import (
+    JiraClient, Sprint, DeveloperStats, CategoryTotals, CATEGORY_NAMES,
+    get_client, set_max_concurrency, set_token
+)
+from report_model import SprintReport, report_to_dict, totals_to_dict
+from sprint_report import categorize_sprint
+
+
+@dataclass
+class BoardConfig:
+    """Доска в сводке"""
+    name: str
+    board_id: int
+    # None — из настроек клиента по умолчанию (jira_client.get_config)
+    base_url: str | None = None
+    story_points_field: str | None = None
+    # Токен экземпляра base_url; None — токен из настроек (только для их экземпляра)
+    token: str | None = field(default=None, repr=False)
+
+    @property
+    def client(self) -> JiraClient:
+        client = get_client(self.board_id, self.base_url, self.story_points_field)
+        if self.token:
+            set_token(client.base_url, self.token)
+        return client
+
+
+@dataclass
+class BoardReport:
+    """Отчет по одной доске (или ошибка, из-за которой его нет)"""
+    board: BoardConfig
+    report: SprintReport | None = None
+    error: str | None = None
+
+
+@dataclass
+class Rollup:
+    """Сводка по доскам"""
+    boards: list[BoardReport]
+    developers: dict[str, DeveloperStats] = field(default_factory=dict)
+    team: dict[str, CategoryTotals] = field(default_factory=dict)
+
+
+def load_boards(config_path: str | None, board_ids: list[int]) -> list[BoardConfig]:
+    boards = [BoardConfig(name=f"Доска {board_id}", board_id=board_id) for board_id in board_ids]
+    if config_path:
+        with open(config_path, encoding="utf-8") as f:
+            for entry in json.load(f):
+                board_id = int(entry["board_id"])
+                boards.append(BoardConfig(
+                    name=entry.get("name") or f"Доска {board_id}",
+                    board_id=board_id,
+                    base_url=entry.get("base_url"),
+                    story_points_field=entry.get("story_points_field"),
+                    token=os.environ.get(entry["token_env"]) if entry.get("token_env") else entry.get("token")
+                ))
+    return boards
+
+
+def select_sprint(client: JiraClient, active: bool = False) -> Sprint | None:
+    """Последний настоящий (закрытый) спринт доски или ее активный спринт"""
+    catalog = client.get_sprint_catalog()
+    if active:
+        sprints = catalog.state('active')
+        return sprints[-1] if sprints else None
+    real = [s for s in catalog if catalog.is_real(s.id)]
+    return max(real, key=lambda s: (s.end_date, s.id)) if real else None
+
+
+def build_board_report(board: BoardConfig, active: bool = False) -> BoardReport:
+    try:
+        client = board.client
+        sprint = select_sprint(client, active)
+        if sprint is None:
+            return BoardReport(board, error="подходящий спринт не найден")
+        catalog = client.get_sprint_catalog()
+        report = categorize_sprint(sprint, set(catalog.real_ids), client.iter_sprint_issues(sprint))
+        # Одной записью, чтобы строки параллельных досок не перемешивались
+        sys.stderr.write(f"  {board.name}: {sprint.name}, задач {report.issue_count}\n")
+        return BoardReport(board, report)
+    except Exception as e:
+        traceback.print_exc()
+        return BoardReport(board, error=str(e))
+
+
+def _merge_developers(target: dict[str, DeveloperStats], source: dict[str, DeveloperStats], dedupe: bool):
+    for dev_key, stats in source.items():
+        merged = target.get(dev_key)
+        if merged is None:
+            merged = target[dev_key] = DeveloperStats(name=stats.name)
+        merged.merge(stats, dedupe)
+
+
+def merge_reports(results: list[BoardReport]) -> Rollup:
+    """Объединить статистику разработчиков всех досок"""
+    rollup = Rollup(boards=results)
+    # Ключи задач уникальны только внутри экземпляра Jira
+    by_instance: dict[str, dict[str, DeveloperStats]] = {}
+    for result in results:
+        if result.report is not None:
+            developers = by_instance.setdefault(result.board.client.base_url, {})
+            _merge_developers(developers, result.report.developers, dedupe=True)
+    for developers in by_instance.values():
+        _merge_developers(rollup.developers, developers, dedupe=False)
+
+    rollup.team = {name: CategoryTotals() for name in CATEGORY_NAMES}
+    for stats in rollup.developers.values():
+        for name in CATEGORY_NAMES:
+            rollup.team[name].merge(stats.totals[name])
+    return rollup
+
+
+def collect_rollup(boards: list[BoardConfig], active: bool = False, workers: int = 4) -> Rollup:
+    print(f"Сбор отчетов по {len(boards)} доскам...", file=sys.stderr)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(boards)))) as pool:
+        results = list(pool.map(lambda board: build_board_report(board, active), boards))
+    return merge_reports(results)
+
+
+# =============================================================================
+# Вывод
+# =============================================================================
+
+def print_rollup(rollup: Rollup, out: TextIO | None = None):
+    out = out or sys.stdout
+    width = 46 + 13 * len(CATEGORY_NAMES)
+    header = "".join(f"{name[:12]:>13}" for name in CATEGORY_NAMES)
+
+    print("=" * width, file=out)
+    print(f"СВОДНЫЙ ОТЧЕТ ПО ДОСКАМ ({len(rollup.boards)}), SP", file=out)
+    print("=" * width, file=out)
+    print(f"  {'Доска':<22} {'Спринт':<16} {'Задач':>5}" + header, file=out)
+    print(f"  {'-'*(width - 2)}", file=out)
+    for result in rollup.boards:
+        name = result.board.name[:22]
+        if result.report is None:
+            print(f"  {name:<22} ошибка: {result.error}", file=out)
+            continue
+        report = result.report
+        row = f"  {name:<22} {report.sprint.name[:16]:<16} {report.issue_count:>5}"
+        row += "".join(f"{report.team[c].story_points:>13.2f}" for c in CATEGORY_NAMES)
+        print(row, file=out)
+
+    print(f"\n  {'Разработчик':<45}" + header, file=out)
+    print(f"  {'-'*(width - 2)}", file=out)
+    for _, stats in sorted(rollup.developers.items(), key=lambda x: (x[0] == 'unassigned', x[1].name)):
+        row = f"  {stats.name[:44]:<45}"
+        row += "".join(f"{stats.totals[c].story_points:>13.2f}" for c in CATEGORY_NAMES)
+        print(row, file=out)
+    print(f"  {'-'*(width - 2)}", file=out)
+    row = f"  {'ОТДЕЛ':<45}" + "".join(f"{rollup.team[c].story_points:>13.2f}" for c in CATEGORY_NAMES)
+    print(row, file=out)
+    print("=" * width, file=out)
+
+
+def rollup_to_dict(rollup: Rollup) -> dict:
+    return {
+        "boards": [
+            {
+                "name": result.board.name,
+                "board_id": result.board.board_id,
+                "base_url": result.board.client.base_url,
+                "error": result.error,
+                "report": report_to_dict(result.report) if result.report else None,
+            }
+            for result in rollup.boards
+        ],
+        "team": {name: totals_to_dict(rollup.team[name]) for name in CATEGORY_NAMES},
+        "developers": [
+            {
+                "key": dev_key,
+                "name": stats.name,
+                "totals": {name: totals_to_dict(stats.totals[name]) for name in CATEGORY_NAMES},
+            }
+            for dev_key, stats in sorted(rollup.developers.items(), key=lambda x: x[1].name)
+        ],
+    }
+
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Сводный отчет по нескольким доскам")
+    parser.add_argument("--boards", type=int, nargs="*", default=[], metavar="BOARD_ID", help="ID досок")
+    parser.add_argument("--config", metavar="FILE", help="JSON со списком досок")
+    parser.add_argument("--active", action="store_true", help="Активные спринты вместо последних закрытых")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Сколько досок собирать одновременно (по умолчанию 4)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=jira_client.MAX_CONCURRENCY,
+        help=f"Общий предел одновременных запросов к Jira (по умолчанию {jira_client.MAX_CONCURRENCY})"
+    )
+    parser.add_argument("--format", choices=["text", "json"], default="text", help="Формат вывода")
+    parser.add_argument("-o", "--output", metavar="FILE", help="Записать сводку в файл")
+    args = parser.parse_args(argv)
+
+    boards = load_boards(args.config, args.boards)
+    if not boards:
+        parser.error("укажите --boards или --config")
+    set_max_concurrency(args.concurrency)
+
+    rollup = collect_rollup(boards, args.active, args.workers)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.format == "json":
+            out.write(json.dumps(rollup_to_dict(rollup), ensure_ascii=False, indent=2) + "\n")
+        else:
+            print_rollup(rollup, out)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Граф переносов задач между спринтами доски
+
+Узлы — спринты, ребро A -> B — задачи (ключи и SP), перенесенные из A в B.
+Переносы извлекаются из поля Sprint в changelog (issue_history.sprint_moves)
+при сохранении задачи в кеш и хранятся в нем же, поэтому граф по всей
+доске читается одним запросом, без повторного разбора истории. После
+загрузки вопросы к графу — обращения к индексам:
+
+- откуда пришла работа спринта: цепочки спринтов, через которые прошли
+  перенесенные в него задачи;
+- куда ушла работа спринта (spill-over): ребра из спринта;
+- задачи, дольше всех кочующие между спринтами.
+
+SP — текущая оценка задачи.
+
+Использование:
+    python sprint_graph.py                    # ребра графа
+    python sprint_graph.py --sprint 6783      # откуда пришла и куда ушла работа спринта
+    python sprint_graph.py --bouncing 20      # задачи с наибольшим числом переносов
+    python sprint_graph.py --format json
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterable, TextIO
+
+from issue_history import sprint_moves
+from jira_client import Issue, JiraClient, JiraError, SprintCatalog, get_client
+
+
+@dataclass(slots=True)
+class SprintMove:
+    """Перенос одной задачи из спринта в спринт"""
+    issue_key: str
+    from_sprint: int
+    to_sprint: int
+    date: int | None
+    story_points: float
+
+
+@dataclass
+class SprintEdge:
+    """Ребро графа: все переносы из from_sprint в to_sprint"""
+    from_sprint: int
+    to_sprint: int
+    issues: list[str] = field(default_factory=list)
+    story_points: float = 0
+
+
+class SprintGraph:
+    """Индексы графа переносов: по ребру, по исходящим и входящим ребрам и по задаче"""
+
+    def __init__(self, moves: Iterable[SprintMove]):
+        self.edges: dict[tuple[int, int], SprintEdge] = {}
+        self.outgoing: dict[int, list[SprintEdge]] = {}
+        self.incoming: dict[int, list[SprintEdge]] = {}
+        self.by_issue: dict[str, list[SprintMove]] = {}
+        for move in moves:
+            self.by_issue.setdefault(move.issue_key, []).append(move)
+            edge = self.edges.get((move.from_sprint, move.to_sprint))
+            if edge is None:
+                edge = self.edges[(move.from_sprint, move.to_sprint)] = SprintEdge(move.from_sprint, move.to_sprint)
+                self.outgoing.setdefault(move.from_sprint, []).append(edge)
+                self.incoming.setdefault(move.to_sprint, []).append(edge)
+            edge.issues.append(move.issue_key)
+            edge.story_points += move.story_points
+        for issue_moves in self.by_issue.values():
+            issue_moves.sort(key=lambda m: m.date or 0)
+
+    @classmethod
+    def from_issues(cls, issues: Iterable[Issue]) -> "SprintGraph":
+        """Построить граф за один проход по истории задач"""
+        return cls(
+            SprintMove(issue.key, from_sprint, to_sprint, date, issue.story_points)
+            for issue in issues
+            for from_sprint, to_sprint, date in sprint_moves(issue.changelog)
+        )
+
+    @classmethod
+    def load(cls, store, sprint_ids: set[int] | None = None) -> "SprintGraph":
+        """
+        Граф из переносов, сохраненных в кеше вместе с задачами.
+        sprint_ids — оставить только переносы, затрагивающие эти спринты
+        (кеш общий для всех досок экземпляра Jira).
+        """
+        moves = (SprintMove(*row) for row in store.load_sprint_moves())
+        if sprint_ids is not None:
+            moves = (m for m in moves if m.from_sprint in sprint_ids or m.to_sprint in sprint_ids)
+        return cls(moves)
+
+    def path(self, issue_key: str) -> list[int]:
+        """Спринты, через которые прошла задача, в порядке переносов"""
+        moves = self.by_issue.get(issue_key)
+        if not moves:
+            return []
+        return [moves[0].from_sprint] + [m.to_sprint for m in moves]
+
+    def chains(self, sprint_id: int) -> dict[str, list[int]]:
+        """Для задач, перенесенных в спринт, — цепочка спринтов до него"""
+        chains = {}
+        for edge in self.incoming.get(sprint_id, []):
+            for key in edge.issues:
+                if key in chains:
+                    continue
+                path = self.path(key)
+                # Путь до первого попадания в sprint_id
+                chains[key] = path[:path.index(sprint_id, 1) + 1]
+        return chains
+
+    def origins(self, sprint_id: int) -> Counter:
+        """SP перенесенной в спринт работы по спринту, где она началась"""
+        origins = Counter()
+        for key, chain in self.chains(sprint_id).items():
+            origins[chain[0]] += self.by_issue[key][0].story_points
+        return origins
+
+    def spill_over(self, sprint_id: int) -> list[SprintEdge]:
+        """Куда ушли задачи спринта, по убыванию SP"""
+        return sorted(self.outgoing.get(sprint_id, []), key=lambda e: (-e.story_points, e.to_sprint))
+
+    def bouncing(self, limit: int = 10) -> list[tuple[str, list[int]]]:
+        """Задачи с наибольшим числом переносов и их пути"""
+        keys = sorted(self.by_issue, key=lambda k: (-len(self.by_issue[k]), k))[:limit]
+        return [(key, self.path(key)) for key in keys]
+
+
+def load_graph(client: JiraClient, sync: bool = True) -> SprintGraph:
+    """
+    Граф по всем спринтам доски. С кешем недостающие спринты докачиваются
+    (закрытые и уже синхронизированные не запрашиваются), а граф читается
+    из кеша; без кеша задачи всех спринтов скачиваются и разбираются.
+    """
+    catalog = client.get_sprint_catalog()
+    store = client.store
+    if store is None:
+        issues_by_sprint = client.get_sprints_issues(catalog.sprints)
+        unique = {issue.key: issue for issues in issues_by_sprint.values() for issue in issues}
+        return SprintGraph.from_issues(unique.values())
+    if sync:
+        pending = []
+        for sprint in catalog.sprints:
+            synced = store.get_sync(sprint.id)
+            if synced is None or synced[1] != 'closed':
+                pending.append(sprint)
+        if pending:
+            client.get_sprints_issues(pending)
+    return SprintGraph.load(store, {s.id for s in catalog.sprints})
+
+
+# =============================================================================
+# Вывод
+# =============================================================================
+
+def _name(catalog: SprintCatalog, sprint_id: int) -> str:
+    sprint = catalog.get(sprint_id)
+    name = sprint.name if sprint else f"#{sprint_id}"
+    return name if catalog.is_real(sprint_id) else f"{name}*"
+
+
+def print_edges(graph: SprintGraph, catalog: SprintCatalog, out: TextIO | None = None):
+    out = out or sys.stdout
+    print("=" * 90, file=out)
+    print(f"ПЕРЕНОСЫ МЕЖДУ СПРИНТАМИ (ребер: {len(graph.edges)}, задач: {len(graph.by_issue)})", file=out)
+    print("=" * 90, file=out)
+    print(f"  {'Из спринта':<32} {'В спринт':<32} {'Задач':>8} {'SP':>10}", file=out)
+    print(f"  {'-'*86}", file=out)
+    for edge in sorted(graph.edges.values(), key=lambda e: (e.from_sprint, e.to_sprint)):
+        print(
+            f"  {_name(catalog, edge.from_sprint)[:31]:<32} {_name(catalog, edge.to_sprint)[:31]:<32} "
+            f"{len(edge.issues):>8} {edge.story_points:>10.2f}",
+            file=out
+        )
+    print(f"  {'-'*86}", file=out)
+    print("  * — не настоящий спринт (не учитывается в carried_over)", file=out)
+
+
+def print_sprint(graph: SprintGraph, catalog: SprintCatalog, sprint_id: int, out: TextIO | None = None):
+    out = out or sys.stdout
+    print("=" * 90, file=out)
+    print(f"ПЕРЕНОСЫ СПРИНТА: {_name(catalog, sprint_id)}", file=out)
+    print("=" * 90, file=out)
+
+    chains = graph.chains(sprint_id)
+    print(f"\n  Пришло задач: {len(chains)}", file=out)
+    for origin, sp in graph.origins(sprint_id).most_common():
+        print(f"    начаты в {_name(catalog, origin):<40} {sp:>10.2f} SP", file=out)
+    for key, chain in sorted(chains.items(), key=lambda x: (-len(x[1]), x[0])):
+        print(f"    {key:<14} {' -> '.join(_name(catalog, s) for s in chain)}", file=out)
+
+    spill = graph.spill_over(sprint_id)
+    print(f"\n  Ушло задач: {sum(len(e.issues) for e in spill)}", file=out)
+    for edge in spill:
+        print(
+            f"    в {_name(catalog, edge.to_sprint):<42} {len(edge.issues):>5} задач {edge.story_points:>10.2f} SP",
+            file=out
+        )
+
+
+def print_bouncing(graph: SprintGraph, catalog: SprintCatalog, limit: int, out: TextIO | None = None):
+    out = out or sys.stdout
+    print("=" * 90, file=out)
+    print("ЗАДАЧИ С НАИБОЛЬШИМ ЧИСЛОМ ПЕРЕНОСОВ", file=out)
+    print("=" * 90, file=out)
+    for key, path in graph.bouncing(limit):
+        print(f"  {key:<14} {len(path) - 1:>3}  {' -> '.join(_name(catalog, s) for s in path)}", file=out)
+
+
+def graph_to_dict(graph: SprintGraph, sprint_id: int | None = None, bouncing: int | None = None) -> dict:
+    result = {
+        "edges": [
+            {"from": e.from_sprint, "to": e.to_sprint, "issues": e.issues, "story_points": e.story_points}
+            for e in sorted(graph.edges.values(), key=lambda e: (e.from_sprint, e.to_sprint))
+        ]
+    }
+    if sprint_id is not None:
+        result["sprint"] = {
+            "id": sprint_id,
+            "chains": graph.chains(sprint_id),
+            "origins": dict(graph.origins(sprint_id)),
+            "spill_over": [
+                {"to": e.to_sprint, "issues": e.issues, "story_points": e.story_points}
+                for e in graph.spill_over(sprint_id)
+            ],
+        }
+    if bouncing:
+        result["bouncing"] = [{"key": key, "path": path} for key, path in graph.bouncing(bouncing)]
+    return result
+
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Граф переносов задач между спринтами доски")
+    parser.add_argument("--sprint", type=int, metavar="ID", help="Откуда пришла и куда ушла работа спринта")
+    parser.add_argument("--bouncing", type=int, nargs="?", const=10, metavar="N", help="N задач с наибольшим числом переносов")
+    parser.add_argument("--no-sync", action="store_true", help="Не докачивать спринты, только граф из кеша")
+    parser.add_argument("--format", choices=["text", "json"], default="text", help="Формат вывода")
+    args = parser.parse_args(argv)
+
+    client = get_client()
+    try:
+        catalog = client.get_sprint_catalog()
+        graph = load_graph(client, sync=not args.no_sync)
+    except JiraError as e:
+        print(f"Ошибка запроса к Jira: {e}")
+        sys.exit(1)
+
+    if args.format == "json":
+        print(json.dumps(graph_to_dict(graph, args.sprint, args.bouncing), ensure_ascii=False, indent=2))
+        return
+    if args.sprint is not None:
+        print_sprint(graph, catalog, args.sprint)
+    elif args.bouncing:
+        print_bouncing(graph, catalog, args.bouncing)
+    else:
+        print_edges(graph, catalog)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,95 +3,86 @@
 
 Использование:
     python sprint_report.py -id <sprint_id>
+    python sprint_report.py --last <N>
+    python sprint_report.py --range <from_id> <to_id>
     
 Пример:
     python sprint_report.py -id 6783
+    python sprint_report.py -id 6783 --burndown
+    python sprint_report.py -id 6783 --worklogs
+    python sprint_report.py -id 6783 --watch 60
+    python sprint_report.py --last 10
 """
 
 import argparse
-from datetime import datetime
-from collections import defaultdict
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+from typing import Iterable, Iterator, TextIO
 
+import jira_client
 from jira_client import (
-    Issue, Sprint, DeveloperStats,
-    get_sprint_by_id, get_real_sprint_names,
-    get_sprint_issues_with_changelog
+    Issue, JiraError, Sprint, DeveloperStats, CategoryTotals, WorklogIndex, CATEGORY_NAMES,
+    get_sprint_by_id, get_sprint_catalog, get_sprint_changes, get_store, get_worklogs,
+    fetch_issues_by_keys, iter_sprint_issues, get_sprints_issues, get_story_points_name, is_real_sprint
 )
+from burndown import BurndownBuilder, print_burndown
+from report_model import SprintReport, author_spent, render_json, render_csv, render_trend_json, render_trend_csv
+import profiling
+from profiling import phase
+from timestamps import parse_timestamp
+
+
+# Категории отчета: атрибут DeveloperStats и заголовок
+CATEGORIES = [
+    ('original', 'Планировались (original)'),
+    ('added_later', 'Не планировались (added_later)'),
+    ('carried_over', 'Переехали из предыдущих спринтов (carried_over)'),
+    ('closed_planned', 'Планировались и закрыты (closed_planned)'),
+    ('closed_unplanned', 'Не планировались, но закрыты (closed_unplanned)'),
+]
 
 
 # =============================================================================
 # Анализ changelog
 # =============================================================================
 
-def parse_sprint_add_date(issue: Issue, sprint_name: str) -> datetime | None:
+def parse_sprint_add_date(issue: Issue, sprint_id: int) -> int | None:
     """
     Определить дату добавления задачи в спринт из changelog.
     Возвращает самую раннюю дату добавления в указанный спринт.
     """
-    add_dates = []
-    
-    for entry in issue.changelog:
-        if entry['field'] == 'Sprint':
-            to_value = entry['to'] or ''
-            if sprint_name in to_value:
-                add_dates.append(entry['date'])
-    
-    if add_dates:
-        return min(add_dates)
-    
-    return issue.created
+    return issue.history.added_date(sprint_id) or issue.created
 
 
-def parse_status_closed_date(issue: Issue) -> datetime | None:
+def parse_status_closed_date(issue: Issue) -> int | None:
     """
     Определить дату перехода в статус Closed из changelog.
     """
-    closed_dates = []
-    
-    for entry in issue.changelog:
-        if entry['field'] == 'status':
-            to_value = entry['to'] or ''
-            if to_value.lower() == 'closed':
-                closed_dates.append(entry['date'])
-    
-    if closed_dates:
-        return max(closed_dates)
-    return None
+    return issue.history.closed_date
 
 
-def get_previous_real_sprints(issue: Issue, target_sprint_name: str, real_sprint_names: set[str]) -> list[str]:
+def get_previous_real_sprints(issue: Issue, target_sprint_id: int, real_sprint_ids: set[int]) -> set[int]:
     """
     Получить список НАСТОЯЩИХ предыдущих спринтов задачи.
     """
-    previous_sprints = set()
-    
-    for entry in issue.changelog:
-        if entry['field'] == 'Sprint':
-            from_value = entry['from'] or ''
-            to_value = entry['to'] or ''
-            
-            if target_sprint_name in to_value and from_value:
-                for sprint in from_value.split(','):
-                    sprint = sprint.strip()
-                    if sprint and sprint != target_sprint_name and sprint in real_sprint_names:
-                        previous_sprints.add(sprint)
-    
-    return list(previous_sprints)
+    return issue.history.previous_sprints(target_sprint_id) & real_sprint_ids
 
 
 # =============================================================================
 # Категоризация задач
 # =============================================================================
 
-def categorize_issues(
-    issues: list[Issue],
-    sprint_name: str,
-    sprint_start: datetime,
-    sprint_end: datetime,
-    real_sprint_names: set[str]
-) -> dict[str, DeveloperStats]:
+class SprintCategorizer:
     """
-    Разделить задачи на категории по разработчикам.
+    Потоковая категоризация задач спринта.
+    
+    Задачи подаются по одной через add(), поэтому категоризация может идти
+    параллельно с загрузкой страниц. При drop_changelog=True после разбора
+    задачи из нее удаляются changelog и индекс истории — в отчете остаются
+    только поля, нужные для вывода. Повторный add() задачи с тем же ключом
+    заменяет ее прежний вклад, discard() убирает его (режим --watch).
     
     Категории:
     - original: задачи в спринте на момент старта (планировались)
@@ -100,64 +91,134 @@ def categorize_issues(
     - closed_planned: из original, закрыты в спринте
     - closed_unplanned: из added_later, закрыты в спринте
     """
-    stats_by_developer = defaultdict(lambda: DeveloperStats(name=""))
     
-    for issue in issues:
-        dev_key = issue.assignee_key
-        if stats_by_developer[dev_key].name == "":
-            stats_by_developer[dev_key].name = issue.assignee
-        
-        stats = stats_by_developer[dev_key]
-        
-        add_date = parse_sprint_add_date(issue, sprint_name)
-        prev_sprints = get_previous_real_sprints(issue, sprint_name, real_sprint_names)
+    def __init__(
+        self,
+        sprint_id: int,
+        sprint_start: int,
+        sprint_end: int,
+        real_sprint_ids: set[int],
+        drop_changelog: bool = False
+    ):
+        self.sprint_id = sprint_id
+        self.sprint_start = sprint_start
+        self.sprint_end = sprint_end
+        self.real_sprint_ids = real_sprint_ids
+        self.drop_changelog = drop_changelog
+        self.stats_by_developer: dict[str, DeveloperStats] = {}
+        self.team = {name: CategoryTotals() for name in CATEGORY_NAMES}
+        self.count = 0
+        # Ключ задачи -> (разработчик, категории): что вычитать при замене
+        self.placed: dict[str, tuple[str, list[str]]] = {}
+        self._dev_issues: dict[str, int] = {}
+    
+    def categories(self, issue: Issue) -> list[str]:
+        """Категории задачи в этом спринте (в порядке CATEGORY_NAMES)"""
+        add_date = parse_sprint_add_date(issue, self.sprint_id)
+        prev_sprints = get_previous_real_sprints(issue, self.sprint_id, self.real_sprint_ids)
         closed_date = parse_status_closed_date(issue)
         
         is_closed_in_sprint = (
             closed_date is not None and 
-            closed_date <= sprint_end
+            closed_date <= self.sprint_end
         )
         
-        is_original = add_date is not None and add_date <= sprint_start
-        is_added_later = add_date is not None and add_date > sprint_start
+        is_original = add_date is not None and add_date <= self.sprint_start
+        is_added_later = add_date is not None and add_date > self.sprint_start
         is_carried_over = len(prev_sprints) > 0
         
+        categories = []
         if is_original:
-            stats.original.append(issue)
+            categories.append('original')
         
         if is_added_later:
-            stats.added_later.append(issue)
+            categories.append('added_later')
         
         if is_carried_over:
-            stats.carried_over.append(issue)
+            categories.append('carried_over')
         
         if is_original and is_closed_in_sprint:
-            stats.closed_planned.append(issue)
+            categories.append('closed_planned')
         
         if is_added_later and is_closed_in_sprint:
-            stats.closed_unplanned.append(issue)
+            categories.append('closed_unplanned')
+        
+        return categories
+    
+    def add(self, issue: Issue):
+        if issue.key in self.placed:
+            self.discard(issue.key)
+        dev_key = issue.assignee_key
+        stats = self.stats_by_developer.get(dev_key)
+        if stats is None:
+            stats = self.stats_by_developer[dev_key] = DeveloperStats(name=issue.assignee)
+        
+        categories = self.categories(issue)
+        for category in categories:
+            stats.add(category, issue)
+            self.team[category].add(issue)
+        
+        self.placed[issue.key] = (dev_key, categories)
+        self._dev_issues[dev_key] = self._dev_issues.get(dev_key, 0) + 1
+        self.count += 1
+        if self.drop_changelog:
+            issue.changelog = []
+            issue.history = None
+    
+    def discard(self, issue_key: str) -> str | None:
+        """Убрать вклад задачи из агрегатов; вернуть ключ ее разработчика"""
+        placed = self.placed.pop(issue_key, None)
+        if placed is None:
+            return None
+        dev_key, categories = placed
+        stats = self.stats_by_developer[dev_key]
+        for category in categories:
+            issue = stats.remove(category, issue_key)
+            if issue is not None:
+                self.team[category].remove(issue)
+        
+        self._dev_issues[dev_key] -= 1
+        if not self._dev_issues[dev_key]:
+            del self._dev_issues[dev_key]
+            del self.stats_by_developer[dev_key]
+        self.count -= 1
+        return dev_key
     
-    return dict(stats_by_developer)
+    def result(self) -> dict[str, DeveloperStats]:
+        return self.stats_by_developer
+    
+    def report(self, sprint: Sprint) -> SprintReport:
+        """Собрать модель отчета; итоги уже посчитаны за один проход"""
+        return SprintReport(
+            sprint=sprint,
+            developers=self.stats_by_developer,
+            team=self.team,
+            issue_count=self.count
+        )
+
+
+def categorize_issues(
+    issues: Iterable[Issue],
+    sprint_id: int,
+    sprint_start: int,
+    sprint_end: int,
+    real_sprint_ids: set[int],
+    drop_changelog: bool = False
+) -> dict[str, DeveloperStats]:
+    """
+    Разделить задачи на категории по разработчикам.
+    issues может быть генератором — задачи обрабатываются по мере поступления.
+    """
+    categorizer = SprintCategorizer(sprint_id, sprint_start, sprint_end, real_sprint_ids, drop_changelog)
+    for issue in issues:
+        categorizer.add(issue)
+    return categorizer.result()
 
 
 # =============================================================================
 # Формирование отчета
 # =============================================================================
 
-def sum_story_points(issues: list[Issue]) -> float:
-    return sum(i.story_points for i in issues)
-
-
-def sum_time_estimate(issues: list[Issue]) -> int:
-    """Сумма original estimate в секундах"""
-    return sum(i.time_estimate for i in issues)
-
-
-def sum_time_spent(issues: list[Issue]) -> int:
-    """Сумма time spent в секундах"""
-    return sum(i.time_spent for i in issues)
-
-
 def format_time(seconds: int) -> str:
     """Форматирование времени из секунд в часы"""
     if seconds == 0:
@@ -166,174 +227,586 @@ def format_time(seconds: int) -> str:
     return f"{hours:.1f}h"
 
 
-def print_issues_table(issues: list[Issue], title: str):
+def print_issues_table(
+    issues: list[Issue],
+    title: str,
+    totals: CategoryTotals,
+    out: TextIO | None = None,
+    sprint_spent: bool = False
+):
+    """sprint_spent — добавить колонку времени, списанного в окне спринта"""
+    out = out or sys.stdout
     if not issues:
-        print(f"\n  {title}: нет задач")
+        print(f"\n  {title}: нет задач", file=out)
         return
     
-    total_sp = sum_story_points(issues)
-    total_estimate = sum_time_estimate(issues)
-    total_spent = sum_time_spent(issues)
+    total_sp = totals.story_points
+    total_estimate = totals.time_estimate
+    total_spent = totals.time_spent
+    in_sprint = f", в спринте: {format_time(totals.sprint_time_spent)}" if sprint_spent else ""
+    sprint_header = f" {'Sprint':>7}" if sprint_spent else ""
     
-    print(f"\n  {title} ({len(issues)} задач, {total_sp:.2f} SP, estimate: {format_time(total_estimate)}, spent: {format_time(total_spent)}):")
-    print(f"  {'─'*90}")
-    print(f"  {'Задача':<12} {'SP':>6} {'Est':>7} {'Spent':>7}  {'Название':<50}")
-    print(f"  {'─'*90}")
+    print(f"\n  {title} ({totals.count} задач, {total_sp:.2f} SP, estimate: {format_time(total_estimate)}, spent: {format_time(total_spent)}{in_sprint}):", file=out)
+    print(f"  {'─'*90}", file=out)
+    print(f"  {'Задача':<12} {'SP':>6} {'Est':>7} {'Spent':>7}{sprint_header}  {'Название':<50}", file=out)
+    print(f"  {'─'*90}", file=out)
     
     for issue in sorted(issues, key=lambda x: x.key):
         summary = issue.summary[:47] + "..." if len(issue.summary) > 50 else issue.summary
         est = format_time(issue.time_estimate)
         spent = format_time(issue.time_spent)
-        print(f"  {issue.key:<12} {issue.story_points:>6.2f} {est:>7} {spent:>7}  {summary:<50}")
-    
-    print(f"  {'─'*90}")
-    print(f"  {'ИТОГО':<12} {total_sp:>6.2f} {format_time(total_estimate):>7} {format_time(total_spent):>7}")
-
-
-def print_report(stats_by_developer: dict[str, DeveloperStats], target_sprint: Sprint):
-    print("=" * 90)
-    print(f"ОТЧЕТ ПО СПРИНТУ: {target_sprint.name}")
-    print(f"Период: {target_sprint.start_date.strftime('%Y-%m-%d')} - {target_sprint.end_date.strftime('%Y-%m-%d')}")
-    print("=" * 90)
-    
-    # Агрегаты по команде
-    team_original_sp = 0
-    team_added_later_sp = 0
-    team_carried_over_sp = 0
-    team_closed_planned_sp = 0
-    team_closed_unplanned_sp = 0
-    
-    team_original_est = 0
-    team_original_spent = 0
-    team_added_later_est = 0
-    team_added_later_spent = 0
-    team_carried_over_est = 0
-    team_carried_over_spent = 0
-    team_closed_planned_est = 0
-    team_closed_planned_spent = 0
-    team_closed_unplanned_est = 0
-    team_closed_unplanned_spent = 0
-    
-    for dev_key, stats in sorted(stats_by_developer.items(), key=lambda x: x[1].name):
+        sprint_cell = f" {format_time(issue.sprint_time_spent or 0):>7}" if sprint_spent else ""
+        print(f"  {issue.key:<12} {issue.story_points:>6.2f} {est:>7} {spent:>7}{sprint_cell}  {summary:<50}", file=out)
+    
+    sprint_total = f" {format_time(totals.sprint_time_spent):>7}" if sprint_spent else ""
+    print(f"  {'─'*90}", file=out)
+    print(f"  {'ИТОГО':<12} {total_sp:>6.2f} {format_time(total_estimate):>7} {format_time(total_spent):>7}{sprint_total}", file=out)
+
+
+def print_developer(dev_key: str, stats: DeveloperStats, out: TextIO | None = None, sprint_spent: bool = False):
+    """Раздел отчета по одному разработчику (или по задачам без исполнителя)"""
+    out = out or sys.stdout
+    if dev_key == 'unassigned':
+        print(f"\n{'━'*90}", file=out)
+        print(f"БЕЗ ИСПОЛНИТЕЛЯ (Unassigned)", file=out)
+        print(f"{'━'*90}", file=out)
+        print_issues_table(stats.original, "Планировались", stats.totals['original'], out, sprint_spent)
+        print_issues_table(stats.added_later, "Не планировались", stats.totals['added_later'], out, sprint_spent)
+        return
+    
+    print(f"\n{'━'*90}", file=out)
+    print(f"РАЗРАБОТЧИК: {stats.name}", file=out)
+    print(f"{'━'*90}", file=out)
+    
+    for attr, title in CATEGORIES:
+        print_issues_table(getattr(stats, attr), title, stats.totals[attr], out, sprint_spent)
+
+
+def print_team_totals(team: dict[str, CategoryTotals], out: TextIO | None = None, sprint_spent: bool = False):
+    out = out or sys.stdout
+    width = 91 if sprint_spent else 80
+    print(f"\n{'='*90}", file=out)
+    print("ИТОГИ ПО КОМАНДЕ", file=out)
+    print(f"{'='*90}", file=out)
+    sprint_header = f" {'В спринте':>10}" if sprint_spent else ""
+    print(f"  {'Категория':<50} {'SP':>10} {'Estimate':>10} {'Spent':>10}{sprint_header}", file=out)
+    print(f"  {'-'*width}", file=out)
+    for attr, title in CATEGORIES:
+        t = team[attr]
+        sprint_cell = f" {format_time(t.sprint_time_spent):>10}" if sprint_spent else ""
+        print(f"  {title:<50} {t.story_points:>10.2f} {format_time(t.time_estimate):>10} {format_time(t.time_spent):>10}{sprint_cell}", file=out)
+    print(f"  {'-'*width}", file=out)
+
+
+def print_worklog_authors(report: SprintReport, out: TextIO | None = None):
+    """Списанное в окне спринта по авторам ворклогов и категориям"""
+    out = out or sys.stdout
+    headers = ('План', 'Доб.', 'Перенос', 'Закр.пл', 'Закр.непл', 'Спринт', 'Всего')
+    width = 30 + 11 * len(headers)
+    print(f"\n{'='*90}", file=out)
+    print("СПИСАНО В СПРИНТЕ ПО АВТОРАМ ВОРКЛОГОВ", file=out)
+    print(f"{'='*90}", file=out)
+    print(f"  {'Автор':<30}" + "".join(f"{h:>11}" for h in headers), file=out)
+    print(f"  {'-'*width}", file=out)
+    for spent in sorted(author_spent(report).values(), key=lambda x: x.name):
+        cells = [spent.by_category[name] for name in CATEGORY_NAMES] + [spent.sprint, spent.period]
+        print(f"  {spent.name[:29]:<30}" + "".join(f"{format_time(c):>11}" for c in cells), file=out)
+    print(f"  {'-'*width}", file=out)
+    print("  Спринт — на задачи спринта, Всего — на любые задачи Jira за время спринта", file=out)
+
+
+def print_report(report: SprintReport, out: TextIO | None = None):
+    out = out or sys.stdout
+    target_sprint = report.sprint
+    print("=" * 90, file=out)
+    print(f"ОТЧЕТ ПО СПРИНТУ: {target_sprint.name}", file=out)
+    print(f"Период: {target_sprint.start_date.strftime('%Y-%m-%d')} - {target_sprint.end_date.strftime('%Y-%m-%d')}", file=out)
+    print("=" * 90, file=out)
+    
+    sprint_spent = report.worklogs is not None
+    for dev_key, stats in sorted(report.developers.items(), key=lambda x: x[1].name):
         if stats.name == "Unassigned":
             continue
-            
-        print(f"\n{'━'*90}")
-        print(f"РАЗРАБОТЧИК: {stats.name}")
-        print(f"{'━'*90}")
-        
-        print_issues_table(stats.original, "Планировались (original)")
-        team_original_sp += sum_story_points(stats.original)
-        team_original_est += sum_time_estimate(stats.original)
-        team_original_spent += sum_time_spent(stats.original)
-        
-        print_issues_table(stats.added_later, "Не планировались (added_later)")
-        team_added_later_sp += sum_story_points(stats.added_later)
-        team_added_later_est += sum_time_estimate(stats.added_later)
-        team_added_later_spent += sum_time_spent(stats.added_later)
-        
-        print_issues_table(stats.carried_over, "Переехали из предыдущих спринтов (carried_over)")
-        team_carried_over_sp += sum_story_points(stats.carried_over)
-        team_carried_over_est += sum_time_estimate(stats.carried_over)
-        team_carried_over_spent += sum_time_spent(stats.carried_over)
-        
-        print_issues_table(stats.closed_planned, "Планировались и закрыты (closed_planned)")
-        team_closed_planned_sp += sum_story_points(stats.closed_planned)
-        team_closed_planned_est += sum_time_estimate(stats.closed_planned)
-        team_closed_planned_spent += sum_time_spent(stats.closed_planned)
-        
-        print_issues_table(stats.closed_unplanned, "Не планировались, но закрыты (closed_unplanned)")
-        team_closed_unplanned_sp += sum_story_points(stats.closed_unplanned)
-        team_closed_unplanned_est += sum_time_estimate(stats.closed_unplanned)
-        team_closed_unplanned_spent += sum_time_spent(stats.closed_unplanned)
-    
-    if 'unassigned' in stats_by_developer:
-        stats = stats_by_developer['unassigned']
-        print(f"\n{'━'*90}")
-        print(f"БЕЗ ИСПОЛНИТЕЛЯ (Unassigned)")
-        print(f"{'━'*90}")
-        print_issues_table(stats.original, "Планировались")
-        print_issues_table(stats.added_later, "Не планировались")
-        
-        team_original_sp += sum_story_points(stats.original)
-        team_added_later_sp += sum_story_points(stats.added_later)
-        team_carried_over_sp += sum_story_points(stats.carried_over)
-        team_closed_planned_sp += sum_story_points(stats.closed_planned)
-        team_closed_unplanned_sp += sum_story_points(stats.closed_unplanned)
-        
-        team_original_est += sum_time_estimate(stats.original)
-        team_original_spent += sum_time_spent(stats.original)
-        team_added_later_est += sum_time_estimate(stats.added_later)
-        team_added_later_spent += sum_time_spent(stats.added_later)
-    
-    print(f"\n{'='*90}")
-    print("ИТОГИ ПО КОМАНДЕ")
-    print(f"{'='*90}")
-    print(f"  {'Категория':<50} {'SP':>10} {'Estimate':>10} {'Spent':>10}")
-    print(f"  {'-'*80}")
-    print(f"  {'Планировались (original)':<50} {team_original_sp:>10.2f} {format_time(team_original_est):>10} {format_time(team_original_spent):>10}")
-    print(f"  {'Не планировались (added_later)':<50} {team_added_later_sp:>10.2f} {format_time(team_added_later_est):>10} {format_time(team_added_later_spent):>10}")
-    print(f"  {'Переехали из предыдущих спринтов (carried_over)':<50} {team_carried_over_sp:>10.2f} {format_time(team_carried_over_est):>10} {format_time(team_carried_over_spent):>10}")
-    print(f"  {'Планировались и закрыты (closed_planned)':<50} {team_closed_planned_sp:>10.2f} {format_time(team_closed_planned_est):>10} {format_time(team_closed_planned_spent):>10}")
-    print(f"  {'Не планировались, но закрыты (closed_unplanned)':<50} {team_closed_unplanned_sp:>10.2f} {format_time(team_closed_unplanned_est):>10} {format_time(team_closed_unplanned_spent):>10}")
-    print(f"  {'-'*80}")
+        print_developer(dev_key, stats, out, sprint_spent)
+    
+    if 'unassigned' in report.developers:
+        print_developer('unassigned', report.developers['unassigned'], out, sprint_spent)
+    
+    print_team_totals(report.team, out, sprint_spent)
+    if sprint_spent:
+        print_worklog_authors(report, out)
+    
+    if report.burndown is not None:
+        print_burndown(report.burndown, out)
+
+
+def render_text(report: SprintReport) -> str:
+    buffer = io.StringIO()
+    print_report(report, buffer)
+    return buffer.getvalue()
+
+
+def render_report(report: SprintReport, fmt: str = 'text', output: str | None = None):
+    """Вывести отчет в выбранном формате в stdout или в файл"""
+    if fmt == 'text':
+        if output:
+            with open(output, 'w', encoding='utf-8') as f:
+                print_report(report, f)
+        else:
+            print_report(report)
+        return
+    
+    write_output(render_json(report) if fmt == 'json' else render_csv(report), output)
+
+
+def write_output(content: str, output: str | None = None):
+    """Записать отчет в машинном формате в файл или в stdout"""
+    if output:
+        with open(output, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+    else:
+        sys.stdout.write(content)
+        if not content.endswith("\n"):
+            sys.stdout.write("\n")
 
 
 # =============================================================================
 # Main
 # =============================================================================
 
-def build_report(sprint_id: int):
-    """Собрать и вывести отчет"""
+def categorize_sprint(
+    target_sprint: Sprint,
+    real_sprint_ids: set[int],
+    issues: Iterator[Issue] | None = None,
+    categorizer: SprintCategorizer | None = None
+) -> SprintReport:
+    """
+    Потоково загрузить и категоризировать задачи спринта (без вывода).
+    issues — уже имеющиеся задачи; по умолчанию они загружаются из Jira.
+    categorizer — категоризатор, который вызывающий продолжит обновлять (--watch).
+    """
+    # Используем activated_date как момент старта спринта
+    categorizer = categorizer or SprintCategorizer(
+        target_sprint.id,
+        target_sprint.activated_ts,
+        target_sprint.end_ts,
+        real_sprint_ids,
+        drop_changelog=True
+    )
+    issues = iter(issues) if issues is not None else iter_sprint_issues(target_sprint)
+    while True:
+        # Загрузка и категоризация чередуются, поэтому время копится по фазам
+        with phase("issue fetch"):
+            issue = next(issues, None)
+        if issue is None:
+            break
+        with phase("categorize"):
+            categorizer.add(issue)
+    return categorizer.report(target_sprint)
+
+
+def attach_sprint_spent(issues: Iterable[Issue], worklogs: WorklogIndex) -> Iterator[Issue]:
+    """Проставить задачам время, списанное в окне спринта"""
+    for issue in issues:
+        issue.sprint_time_spent = worklogs.issue_spent(issue.id)
+        yield issue
+
+
+def collect_report(sprint_id: int, burndown: bool = False, worklogs: bool = False) -> SprintReport | None:
+    """
+    Скачать задачи спринта и собрать модель отчета (с burndown по дням и
+    временем, списанным в окне спринта по ворклогам)
+    """
     print("Получение данных...")
     
-    target_sprint = get_sprint_by_id(sprint_id)
+    with phase("sprint lookup"):
+        catalog = get_sprint_catalog()
+        target_sprint = catalog.get(sprint_id) or get_sprint_by_id(sprint_id)
     if not target_sprint:
         print(f"Спринт с ID {sprint_id} не найден!")
-        return
+        return None
     
     print(f"Целевой спринт: {target_sprint.name} (ID: {target_sprint.id})")
     print(f"Период: {target_sprint.start_date} - {target_sprint.end_date}")
     print(f"Активирован: {target_sprint.activated_date}")
     
-    # Получаем имена настоящих спринтов для анализа carried_over
-    real_sprint_names = get_real_sprint_names()
-    print(f"Настоящих спринтов для анализа: {len(real_sprint_names)}")
+    # ID настоящих спринтов для анализа carried_over
+    real_sprint_ids = set(catalog.real_ids)
+    print(f"Настоящих спринтов для анализа: {len(real_sprint_ids)}")
     
-    print("\nПолучение задач спринта...")
-    issues = get_sprint_issues_with_changelog(target_sprint.id)
-    print(f"Получено задач: {len(issues)}")
+    worklog_index = None
+    if worklogs:
+        print("\nПолучение ворклогов за время спринта...")
+        with phase("worklogs"):
+            worklog_index = get_worklogs(
+                target_sprint.activated_ts or target_sprint.start_ts, target_sprint.end_ts
+            )
+        print(f"Ворклогов в окне спринта: {len(worklog_index)}")
     
-    print("\nКатегоризация задач...")
-    # Используем activated_date как момент старта спринта
-    stats = categorize_issues(
-        issues,
-        target_sprint.name,
-        target_sprint.activated_date,
-        target_sprint.end_date,
-        real_sprint_names
-    )
+    print("\nПолучение и категоризация задач спринта...")
+    issues = iter_sprint_issues(target_sprint)
+    if worklog_index is not None:
+        issues = attach_sprint_spent(issues, worklog_index)
+    builder = None
+    if burndown:
+        # События burndown снимаются до того, как категоризатор удалит changelog
+        builder = BurndownBuilder(target_sprint, get_story_points_name())
+        issues = builder.tap(issues)
+    report = categorize_sprint(target_sprint, real_sprint_ids, issues)
+    report.worklogs = worklog_index
+    if builder is not None:
+        with phase("burndown"):
+            report.burndown = builder.result()
     
-    print(f"Разработчиков: {len(stats)}")
+    print(f"Получено задач: {report.issue_count}")
+    print(f"Разработчиков: {len(report.developers)}")
+    return report
+
+
+def build_report(
+    sprint_id: int,
+    fmt: str = 'text',
+    output: str | None = None,
+    burndown: bool = False,
+    worklogs: bool = False
+):
+    """Собрать и вывести отчет"""
+    # Для машинных форматов в stdout служебные сообщения уходят в stderr
+    progress = sys.stderr if fmt != 'text' and not output else sys.stdout
+    with redirect_stdout(progress):
+        report = collect_report(sprint_id, burndown, worklogs)
+    if report:
+        with phase("render"):
+            render_report(report, fmt, output)
+
+
+# =============================================================================
+# Живое обновление отчета (--watch)
+# =============================================================================
+
+class SprintWatcher:
+    """
+    Отчет по спринту, обновляемый по изменениям.
+    
+    Первая загрузка — полная. Дальше каждый цикл — два легких запроса
+    (состав спринта и задачи с updated после прошлого опроса) и загрузка
+    только изменившихся задач: их прежний вклад вычитается из агрегатов,
+    новый добавляется, остальные задачи не пересчитываются.
+    """
+    
+    def __init__(self, sprint: Sprint, real_sprint_ids: set[int]):
+        self.sprint = sprint
+        self.categorizer = SprintCategorizer(
+            sprint.id, sprint.activated_ts, sprint.end_ts, real_sprint_ids, drop_changelog=True
+        )
+        self.versions: dict[str, int | None] = {}
+        self.last_poll = 0
+    
+    def load(self) -> SprintReport:
+        self.last_poll = int(time.time())
+        issues = iter_sprint_issues(self.sprint)
+        categorize_sprint(self.sprint, self.categorizer.real_sprint_ids, self._track(issues), self.categorizer)
+        return self.report()
+    
+    def _track(self, issues: Iterable[Issue]) -> Iterator[Issue]:
+        for issue in issues:
+            self.versions[issue.key] = issue.updated
+            yield issue
+    
+    def report(self) -> SprintReport:
+        return self.categorizer.report(self.sprint)
     
-    print_report(stats, target_sprint)
+    def poll(self) -> tuple[set[str], int, int]:
+        """Применить изменения с прошлого опроса: (затронутые разработчики, обновлено, убрано)"""
+        since, self.last_poll = self.last_poll, int(time.time())
+        members, listing = get_sprint_changes(self.sprint.id, since)
+        members = set(members)
+        
+        removed = self.versions.keys() - members
+        stale = members - self.versions.keys()
+        for raw_issue in listing:
+            key = raw_issue.get('key')
+            updated = parse_timestamp((raw_issue.get('fields') or {}).get('updated'))
+            if key in members and self.versions.get(key) != updated:
+                stale.add(key)
+        
+        dirty = set()
+        for key in removed:
+            dirty.add(self.categorizer.discard(key))
+            del self.versions[key]
+        issues = fetch_issues_by_keys(sorted(stale))
+        store = get_store()
+        if store and issues:
+            store.save_issues(issues)
+        for issue in issues:
+            placed = self.categorizer.placed.get(issue.key)
+            if placed is not None:
+                dirty.add(placed[0])
+            self.categorizer.add(issue)
+            self.versions[issue.key] = issue.updated
+            dirty.add(issue.assignee_key)
+        dirty.discard(None)
+        return dirty, len(issues), len(removed)
+
+
+def _team_snapshot(team: dict[str, CategoryTotals]) -> list[tuple]:
+    return [(t.count, t.story_points, t.time_estimate, t.time_spent) for t in team.values()]
+
+
+def watch_report(sprint_id: int, interval: int):
+    """Вывести отчет, затем раз в interval секунд — только изменившиеся разделы"""
+    catalog = get_sprint_catalog()
+    sprint = catalog.get(sprint_id) or get_sprint_by_id(sprint_id)
+    if not sprint:
+        print(f"Спринт с ID {sprint_id} не найден!")
+        return
+    
+    watcher = SprintWatcher(sprint, set(catalog.real_ids))
+    report = watcher.load()
+    print_report(report)
+    print(f"\nОбновление каждые {interval} с (Ctrl+C — выход)")
+    
+    try:
+        while True:
+            time.sleep(interval)
+            now = time.strftime('%H:%M:%S')
+            names = {dev_key: stats.name for dev_key, stats in report.developers.items()}
+            team_before = _team_snapshot(report.team)
+            try:
+                dirty, updated, removed = watcher.poll()
+            except JiraError as e:
+                print(f"[{now}] Ошибка запроса к Jira: {e}", file=sys.stderr)
+                continue
+            if not updated and not removed:
+                print(f"[{now}] Без изменений", file=sys.stderr)
+                continue
+            
+            report = watcher.report()
+            print(f"\n[{now}] Обновлено задач: {updated}, убрано из спринта: {removed}")
+            for dev_key in sorted(dirty, key=lambda k: (k == 'unassigned', names.get(k) or report.developers[k].name)):
+                stats = report.developers.get(dev_key)
+                if stats is None:
+                    print(f"\n{'━'*90}\nРАЗРАБОТЧИК: {names.get(dev_key, dev_key)} — задач в спринте больше нет")
+                elif dev_key == 'unassigned' or stats.name != "Unassigned":
+                    print_developer(dev_key, stats)
+            if _team_snapshot(report.team) != team_before:
+                print_team_totals(report.team)
+    except KeyboardInterrupt:
+        pass
 
 
-def main():
+# =============================================================================
+# Тренд по нескольким спринтам
+# =============================================================================
+
+def select_trend_sprints(
+    sprints: list[Sprint],
+    last: int | None = None,
+    id_range: tuple[int, int] | None = None
+) -> list[Sprint]:
+    """Выбрать настоящие спринты для тренда в хронологическом порядке"""
+    real = sorted((s for s in sprints if is_real_sprint(s)), key=lambda s: (s.start_date, s.id))
+    if id_range:
+        low, high = sorted(id_range)
+        return [s for s in real if low <= s.id <= high]
+    return real[-last:] if last else real
+
+
+def print_trend(reports: list[SprintReport], out: TextIO | None = None):
+    """Таблицы разработчик × спринт (SP) для каждой категории"""
+    out = out or sys.stdout
+    names = {}
+    for report in reports:
+        for dev_key, stats in report.developers.items():
+            names.setdefault(dev_key, stats.name)
+    developers = sorted(names, key=lambda k: (k == 'unassigned', names[k]))
+    
+    width = 24 + 12 * len(reports)
+    print("=" * width, file=out)
+    print(
+        f"ТРЕНД ПО СПРИНТАМ: {reports[0].sprint.name} — {reports[-1].sprint.name} ({len(reports)} спринтов)",
+        file=out
+    )
+    print("=" * width, file=out)
+    
+    header = f"  {'Разработчик':<22}" + "".join(f"{report.sprint.name[:11]:>12}" for report in reports)
+    for attr, title in CATEGORIES:
+        print(f"\n  {title}, SP:", file=out)
+        print(f"  {'─'*(width - 2)}", file=out)
+        print(header, file=out)
+        print(f"  {'─'*(width - 2)}", file=out)
+        for dev_key in developers:
+            row = f"  {names[dev_key][:21]:<22}"
+            for report in reports:
+                stats = report.developers.get(dev_key)
+                if stats is None:
+                    row += f"{'-':>12}"
+                    continue
+                row += f"{stats.totals[attr].story_points:>12.2f}"
+            print(row, file=out)
+        print(f"  {'─'*(width - 2)}", file=out)
+        print(f"  {'КОМАНДА':<22}" + "".join(f"{r.team[attr].story_points:>12.2f}" for r in reports), file=out)
+
+
+def render_trend(reports: list[SprintReport], fmt: str = 'text', output: str | None = None):
+    """Вывести тренд в выбранном формате в stdout или в файл"""
+    if fmt == 'text':
+        if output:
+            with open(output, 'w', encoding='utf-8') as f:
+                print_trend(reports, f)
+        else:
+            print_trend(reports)
+        return
+    write_output(render_trend_json(reports) if fmt == 'json' else render_trend_csv(reports), output)
+
+
+def build_trend(
+    last: int | None = None,
+    id_range: tuple[int, int] | None = None,
+    fmt: str = 'text',
+    output: str | None = None
+):
+    """Собрать и вывести тренд по нескольким спринтам"""
+    # Для машинных форматов в stdout служебные сообщения уходят в stderr
+    progress = sys.stderr if fmt != 'text' and not output else sys.stdout
+    with redirect_stdout(progress):
+        reports = collect_trend(last, id_range)
+    if reports:
+        with phase("render"):
+            render_trend(reports, fmt, output)
+
+
+def collect_trend(last: int | None = None, id_range: tuple[int, int] | None = None) -> list[SprintReport]:
+    """Загрузить и категоризировать задачи спринтов тренда (без вывода таблиц)"""
+    print("Получение списка спринтов...")
+    with phase("sprint lookup"):
+        catalog = get_sprint_catalog()
+    real_sprint_ids = set(catalog.real_ids)
+    sprints = select_trend_sprints(catalog.sprints, last, id_range)
+    if not sprints:
+        print("Подходящих спринтов не найдено!")
+        return []
+    print(f"Спринтов в тренде: {len(sprints)}")
+    
+    print("\nПолучение задач спринтов...")
+    with phase("issue fetch"):
+        issues_by_sprint = get_sprints_issues(sprints)
+    unique = {i.key for issues in issues_by_sprint.values() for i in issues}
+    print(f"Получено задач: {len(unique)}")
+    
+    print("\nКатегоризация задач...")
+    reports = []
+    with phase("categorize"):
+        for sprint in sprints:
+            categorizer = SprintCategorizer(
+                sprint.id,
+                sprint.activated_ts or sprint.start_ts,
+                sprint.end_ts,
+                real_sprint_ids
+            )
+            for issue in issues_by_sprint.get(sprint.id, []):
+                categorizer.add(issue)
+            reports.append(categorizer.report(sprint))
+    return reports
+
+
+def main(argv: list[str] | None = None, prog: str | None = None):
     parser = argparse.ArgumentParser(
+        prog=prog,
         description="Отчет по спринту",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="Пример: python sprint_report.py -id 6783"
     )
-    parser.add_argument(
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument(
         "-id",
         type=int,
-        required=True,
         help="ID спринта (получить список: python list_sprints.py)"
     )
+    mode.add_argument(
+        "--last",
+        type=int,
+        metavar="N",
+        help="Тренд по последним N закрытым спринтам"
+    )
+    mode.add_argument(
+        "--range",
+        type=int,
+        nargs=2,
+        metavar=("FROM_ID", "TO_ID"),
+        help="Тренд по спринтам с ID в диапазоне"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["text", "json", "csv"],
+        default="text",
+        help="Формат отчета (по умолчанию text)"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="Записать отчет в файл вместо stdout"
+    )
+    parser.add_argument(
+        "--burndown",
+        action="store_true",
+        help="Добавить burndown по дням (в форматах text и json; только с -id)"
+    )
+    parser.add_argument(
+        "--worklogs",
+        action="store_true",
+        help="Добавить время, списанное в окне спринта, по ворклогам (только с -id)"
+    )
+    parser.add_argument(
+        "--watch",
+        type=int,
+        nargs="?",
+        const=60,
+        metavar="SECONDS",
+        help="Обновлять отчет каждые SECONDS секунд (по умолчанию 60; только с -id, вывод text)"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Вывести профиль запуска: запросы к Jira и время фаз"
+    )
+    parser.add_argument(
+        "--profile-json",
+        metavar="FILE",
+        help="Сохранить подробный профиль в JSON (включает --profile)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help=f"Количество параллельных запросов к Jira (по умолчанию {jira_client.MAX_WORKERS})"
+    )
+    
+    args = parser.parse_args(argv)
+    if args.watch is not None and (args.id is None or args.format != "text" or args.output or args.burndown):
+        parser.error("--watch работает только с -id, в формате text, без -o и --burndown")
+    if args.worklogs and (args.id is None or args.watch is not None):
+        parser.error("--worklogs работает только с -id и без --watch")
+    if args.burndown and args.id is None:
+        parser.error("--burndown работает только с -id")
+    if args.workers:
+        jira_client.MAX_WORKERS = args.workers
+    if args.profile or args.profile_json:
+        profiling.enable()
+    
+    try:
+        if args.watch is not None:
+            watch_report(args.id, args.watch)
+        elif args.id is not None:
+            build_report(args.id, args.format, args.output, args.burndown, args.worklogs)
+        else:
+            build_trend(args.last, tuple(args.range) if args.range else None, args.format, args.output)
+    except JiraError as e:
+        print(f"Ошибка запроса к Jira: {e}")
+        sys.exit(1)
     
-    args = parser.parse_args()
-    build_report(args.id)
+    if args.profile or args.profile_json:
+        profiling.print_summary()
+    if args.profile_json:
+        profiling.write_trace(args.profile_json)
 
 
 if __name__ == "__main__":
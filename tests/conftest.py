@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+import jira_client  # noqa: E402
+
+CONFIG_ENV = ("JIRA_BASE_URL", "JIRA_TOKEN", "JIRA_BOARD_ID", "JIRA_STORY_POINTS_FIELD", "JIRA_CACHE_DB", "JIRA_NO_CACHE")
+
+
+@pytest.fixture(autouse=True)
+def isolated_config(monkeypatch, tmp_path):
+    """Настройки и кеш каждого теста — только из самого теста"""
+    for name in CONFIG_ENV:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("JIRA_CONFIG", str(tmp_path / "config.json"))
+    monkeypatch.setenv("JIRA_NO_CACHE", "1")
+    monkeypatch.setattr(jira_client, "_config", None)
+    monkeypatch.setattr(jira_client, "_clients", {})
+    monkeypatch.setattr(jira_client, "_stores", {})
+    monkeypatch.setattr(jira_client, "_sessions", {})
+    monkeypatch.setattr(jira_client, "_tokens", {})
+    monkeypatch.setattr(jira_client, "_session_pool_sizes", {})
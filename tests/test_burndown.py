@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import jira_client
+from burndown import build_burndown
+from issue_history import ChangelogEntry
+from jira_client import Issue, JiraClient, Sprint
+
+START = datetime(2024, 3, 4, 9, tzinfo=timezone.utc)
+END = datetime(2024, 3, 8, 18, tzinfo=timezone.utc)
+SPRINT = Sprint(1, "S1", "closed", START, END, START, END)
+
+
+def issue_with_estimate_change(field_name: str) -> Issue:
+    """Задача в спринте с начала, оценка 3 -> 8 на второй день"""
+    changed = int(datetime(2024, 3, 5, 12, tzinfo=timezone.utc).timestamp())
+    return Issue(
+        key="A-1", summary="", story_points=8, status="Open", assignee="", assignee_key="",
+        created=int(datetime(2024, 3, 1, tzinfo=timezone.utc).timestamp()),
+        time_estimate=0, time_spent=0,
+        changelog=[ChangelogEntry(changed, field_name, None, None, "3", "8")]
+    )
+
+
+def test_scope_change_uses_given_points_field():
+    burndown = build_burndown(SPRINT, [issue_with_estimate_change("Оценка")], "Оценка")
+    assert burndown.committed == 3
+    assert sum(day.added for day in burndown.days) == 5
+    assert burndown.days[-1].scope == 8
+
+
+def test_other_fields_are_not_estimates():
+    burndown = build_burndown(SPRINT, [issue_with_estimate_change("Оценка")], "Story Points")
+    assert burndown.committed == 8
+    assert sum(day.added for day in burndown.days) == 0
+
+
+@pytest.mark.parametrize("fields, expected", [
+    ([{"id": "customfield_10002", "name": "Оценка"}, {"id": "customfield_10080", "name": "Story Points"}], "Оценка"),
+    ([], jira_client.STORY_POINTS_NAME),
+])
+def test_story_points_name_from_field_list(monkeypatch, fields, expected):
+    monkeypatch.setattr(jira_client, "_transport", lambda url, params=None: fields)
+    client = JiraClient(board_id=5, story_points_field="customfield_10002")
+    assert client.story_points_name == expected
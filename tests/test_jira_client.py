@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import pytest
+
+import jira_client
+from jira_client import JiraClient
+from ratelimit import AdaptiveLimiter, TokenBucket
+
+
+def test_client_without_field_uses_configured_story_points(monkeypatch):
+    monkeypatch.setenv("JIRA_STORY_POINTS_FIELD", "customfield_10002")
+    client = JiraClient(board_id=5)
+    assert client.story_points_field == "customfield_10002"
+    assert "customfield_10002" in client.issue_fields.split(",")
+    assert "None" not in client.issue_fields
+
+
+def test_client_default_story_points_field():
+    client = JiraClient(board_id=5)
+    assert jira_client.STORY_POINTS_FIELD in client.issue_fields.split(",")
+
+
+def test_client_parses_story_points_from_its_field():
+    client = JiraClient(board_id=5, story_points_field="customfield_10002")
+    issue = client.parse_issue({"key": "A-1", "fields": {"customfield_10002": 5, "customfield_10080": 8}})
+    assert issue.story_points == 5
+
+
+def test_configured_token_goes_only_to_configured_instance(monkeypatch):
+    monkeypatch.setenv("JIRA_BASE_URL", "https://jira.main.example")
+    monkeypatch.setenv("JIRA_TOKEN", "main-token")
+    session = jira_client.get_session("https://jira.main.example/rest/api/2/search")
+    assert session.headers["Authorization"] == "Bearer main-token"
+
+    with pytest.raises(jira_client.ConfigError):
+        jira_client.get_session("https://jira.other.example/rest/api/2/search")
+
+    jira_client.set_token("https://jira.other.example", "other-token")
+    other = jira_client.get_session("https://jira.other.example/rest/agile/1.0/board/5/sprint")
+    assert other is not session
+    assert other.headers["Authorization"] == "Bearer other-token"
+    assert jira_client.get_session("https://jira.main.example/rest/api/2/field") is session
+
+
+def test_rollup_board_token_from_env(monkeypatch, tmp_path):
+    import rollup
+
+    monkeypatch.setenv("JIRA_TOKEN", "main-token")
+    monkeypatch.setenv("OTHER_TOKEN", "other-token")
+    config = tmp_path / "boards.json"
+    config.write_text(
+        '[{"board_id": 905, "base_url": "https://jira.other.example", "token_env": "OTHER_TOKEN"}]',
+        encoding="utf-8"
+    )
+    [board] = rollup.load_boards(str(config), [])
+    assert board.token == "other-token"
+    board.client
+    session = jira_client.get_session("https://jira.other.example/rest/api/2/search")
+    assert session.headers["Authorization"] == "Bearer other-token"
+
+
+def pool_maxsize(session) -> int:
+    return session.get_adapter("https://jira.example").poolmanager.connection_pool_kw["maxsize"]
+
+
+def test_connection_pool_follows_concurrency_cap(monkeypatch):
+    monkeypatch.setenv("JIRA_TOKEN", "x")
+    monkeypatch.setattr(jira_client, "MAX_WORKERS", 8)
+    monkeypatch.setattr(jira_client, "_limiter", AdaptiveLimiter(16))
+    session = jira_client.get_session()
+    assert pool_maxsize(session) == 16
+
+    jira_client.set_max_concurrency(40)
+    assert pool_maxsize(session) == 40
+    assert jira_client.get_session() is session
+
+
+class ThrottledSession:
+    """Первый ответ — 503 с заданным Retry-After, дальше 200"""
+
+    def __init__(self, retry_after: str):
+        self.retry_after = retry_after
+        self.calls = 0
+
+    def request(self, method, url, timeout=None, params=None, json=None):
+        self.calls += 1
+        if self.calls == 1:
+            return SimpleNamespace(status_code=503, content=b"", text="", headers={"Retry-After": self.retry_after})
+        return SimpleNamespace(status_code=200, content=b"{}", text="{}", headers={}, json=lambda: {})
+
+
+@pytest.mark.parametrize("retry_after", ["0", "Wed, 21 Oct 2015 07:28:00 GMT"])
+def test_zero_retry_after_still_backs_off(monkeypatch, retry_after):
+    session = ThrottledSession(retry_after)
+    pauses = []
+    monkeypatch.setattr(jira_client, "_sessions", {"https://jira": session})
+    monkeypatch.setattr(jira_client, "_limiter", AdaptiveLimiter(jira_client.MAX_CONCURRENCY))
+    monkeypatch.setattr(jira_client, "_bucket", TokenBucket(jira_client.RATE_LIMIT))
+    monkeypatch.setattr(jira_client._bucket, "pause", pauses.append)
+    monkeypatch.setattr(jira_client, "backoff_delay", lambda attempt: 0.25)
+
+    assert jira_client._http_request("GET", "https://jira/rest/api/2/field") == {}
+    assert session.calls == 2
+    assert pauses == [0.25]
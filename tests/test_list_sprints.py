@@ -0,0 +1,49 @@
+import pytest
+
+import jira_client
+import list_sprints
+
+SPRINTS = 2000
+
+
+class Board:
+    """Листинг спринтов доски без total, как в agile API"""
+
+    def __init__(self, count: int):
+        self.sprints = [
+            {"id": i, "name": f"S{i}", "state": "closed" if i < count - 2 else "active" if i == count - 2 else "future"}
+            for i in range(count)
+        ]
+        self.calls = []
+
+    def __call__(self, url, params=None):
+        params = params or {}
+        self.calls.append(params.get("state"))
+        states = params.get("state")
+        values = [s for s in self.sprints if not states or s["state"] in states.split(",")]
+        start, size = int(params["startAt"]), min(int(params["maxResults"]), 50)
+        return {"startAt": start, "maxResults": size, "isLast": start + size >= len(values), "values": values[start:start + size]}
+
+
+@pytest.fixture
+def board(monkeypatch):
+    board = Board(SPRINTS)
+    monkeypatch.setattr(jira_client, "_transport", board)
+    return board
+
+
+def test_cold_listing_does_not_page_through_history(board, capsys):
+    list_sprints.main([])
+    out = capsys.readouterr().out
+    assert None not in board.calls  # полный листинг без фильтра state не запрашивался
+    assert len(board.calls) < 20
+    assert f"Closed: {SPRINTS - 2}" in out
+    assert f"{SPRINTS - 3:<8} S{SPRINTS - 3}" in out
+
+
+def test_warm_catalog_is_used(board, capsys):
+    jira_client.get_sprint_catalog()
+    board.calls.clear()
+    list_sprints.main([])
+    assert board.calls == []
+    assert f"Closed: {SPRINTS - 2}" in capsys.readouterr().out
@@ -0,0 +1,65 @@
+import json
+import threading
+
+import pytest
+
+import jira_client
+import profiling
+from profiling import endpoint_name
+from ratelimit import AdaptiveLimiter, TokenBucket
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://jira/rest/api/2/search", "/rest/api/2/search"),
+    ("https://jira/rest/api/2/issue/ABC-12/changelog", "/rest/api/2/issue/{key}/changelog"),
+    ("https://jira/rest/agile/1.0/sprint/6783/issue", "/rest/agile/1.0/sprint/{id}/issue"),
+    ("https://jira/rest/agile/1.0/board/803/sprint", "/rest/agile/1.0/board/{id}/sprint"),
+    ("https://host/jira/rest/api/2/issue/10001", "/jira/rest/api/2/issue/{id}"),
+])
+def test_endpoint_name_keeps_api_version(url, expected):
+    assert endpoint_name(url) == expected
+
+
+class Response:
+    def __init__(self, status: int, data=None):
+        self.status_code = status
+        self.content = json.dumps(data).encode()
+        self.text = self.content.decode()
+        self.headers = {"Retry-After": "0"} if status == 503 else {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FlakySession:
+    """Каждая страница отвечает 503 столько раз, сколько задано в failures"""
+
+    def __init__(self, total: int, failures: dict[int, int]):
+        self.total = total
+        self.failures = failures
+        self.lock = threading.Lock()
+
+    def request(self, method, url, timeout=None, params=None, json=None):
+        start = params["startAt"]
+        with self.lock:
+            if self.failures.get(start, 0) > 0:
+                self.failures[start] -= 1
+                return Response(503)
+        values = list(range(start, min(start + params["maxResults"], self.total)))
+        return Response(200, {"startAt": start, "maxResults": params["maxResults"], "total": self.total, "values": values})
+
+
+def test_retries_are_counted_per_page(monkeypatch):
+    monkeypatch.setattr(jira_client, "_sessions", {"https://jira": FlakySession(200, {0: 1, 50: 2, 100: 0, 150: 3})})
+    # 503 сужает общий предел параллельности и ставит паузу — не переносим это в другие тесты
+    monkeypatch.setattr(jira_client, "_limiter", AdaptiveLimiter(jira_client.MAX_CONCURRENCY))
+    monkeypatch.setattr(jira_client, "_bucket", TokenBucket(jira_client.RATE_LIMIT))
+    monkeypatch.setattr(jira_client, "backoff_delay", lambda attempt: 0.0)
+    monkeypatch.setattr(profiling, "PROFILER", profiling.Profiler())
+    profiling.enable()
+
+    values = jira_client.paginate("https://jira/rest/api/2/thing", "values", page_size=50, workers=4)
+    assert values == list(range(200))
+    retries = sorted(r.retries for r in profiling.PROFILER.requests)
+    assert retries == [0, 1, 2, 3]
+    assert profiling._endpoint_summary()["/rest/api/2/thing"]["retries"] == 6
@@ -0,0 +1,68 @@
+import contextlib
+import io
+import json
+
+import pytest
+
+import jira_client
+import sprint_report
+from report_model import render_csv, render_json, render_trend_csv, render_trend_json
+from sprint_report import collect_report
+from synthetic_board import SyntheticBoard
+
+
+@pytest.fixture
+def board(monkeypatch, tmp_path):
+    board = SyntheticBoard(sprints=4, issues_per_sprint=60)
+    monkeypatch.setattr(jira_client, "_transport", board.respond)
+    monkeypatch.delenv("JIRA_NO_CACHE")
+    monkeypatch.setenv("JIRA_CACHE_DB", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setenv("JIRA_BOARD_ID", str(board.board_id))
+    yield board
+    for store in jira_client._stores.values():
+        store.close()
+
+
+def report(sprint_id: int):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return collect_report(sprint_id)
+
+
+def test_cold_and_warm_reports_render_the_same(board, monkeypatch):
+    sprint_id = board.sprints[-2]["id"]
+    cold = report(sprint_id)
+    assert jira_client.get_store().get_sync(sprint_id)[1] == "closed"
+
+    # Новый процесс: клиент и каталог заново, задачи — из кеша
+    monkeypatch.setattr(jira_client, "_clients", {})
+    monkeypatch.setattr(jira_client, "_transport", lambda url, params=None: pytest.fail(f"запрос к Jira: {url}"))
+    warm = report(sprint_id)
+    assert render_json(warm) == render_json(cold)
+    assert render_csv(warm) == render_csv(cold)
+
+
+@pytest.mark.parametrize("fmt", ["json", "csv"])
+def test_trend_honors_format_and_output(board, tmp_path, capsys, fmt):
+    output = tmp_path / f"trend.{fmt}"
+    sprint_report.main(["--last", "3", "--format", fmt, "-o", str(output)])
+    with open(output, encoding="utf-8", newline="") as f:
+        content = f.read()
+    assert "ТРЕНД" not in capsys.readouterr().out
+    reports = sprint_report.collect_trend(3)
+    expected = render_trend_json(reports) if fmt == "json" else render_trend_csv(reports)
+    assert content == expected
+    if fmt == "json":
+        assert [s["sprint"]["id"] for s in json.loads(content)["sprints"]] == [r.sprint.id for r in reports]
+
+
+def test_trend_json_to_stdout_is_clean(board, capsys):
+    sprint_report.main(["--last", "2", "--format", "json"])
+    assert len(json.loads(capsys.readouterr().out)["sprints"]) == 2
+
+
+@pytest.mark.parametrize("argv", [["--last", "2", "--burndown"], ["--range", "1", "5", "--burndown"]])
+def test_burndown_rejected_in_trend_mode(argv, capsys):
+    with pytest.raises(SystemExit) as exc:
+        sprint_report.main(argv)
+    assert exc.value.code == 2
+    assert "--burndown работает только с -id" in capsys.readouterr().err
@@ -0,0 +1,122 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from issue_store import IssueStore
+from jira_client import JiraClient, Sprint
+from webhooks import WebhookProcessor
+
+FIELD = "customfield_10002"
+SPRINT = "customfield_10101"
+
+
+class Service:
+    """Заглушка ReportService: запоминает помеченные спринты"""
+
+    def __init__(self):
+        self.dirty = set()
+
+    def mark_dirty(self, sprint_ids):
+        self.dirty |= set(sprint_ids)
+
+
+class Client(JiraClient):
+    """Клиент без сети: задачи «скачиваются» из словаря"""
+
+    def __init__(self, raw_issues: dict, store=None, **kwargs):
+        super().__init__(board_id=5, **kwargs)
+        self._sprint_field = SPRINT
+        self._store = store
+        self.raw_issues = raw_issues
+        self.fetched = []
+
+    @property
+    def store(self):
+        return self._store
+
+    def iter_issue_batches(self, keys):
+        self.fetched.extend(keys)
+        yield [self.parse_issue(self.raw_issues[k]) for k in keys if k in self.raw_issues]
+
+    def _fetch_sprint_issues(self, sprint_id, fields, expand=None, jql=None):
+        return [{"key": raw["key"], "fields": {"updated": raw["fields"]["updated"]}} for raw in self.raw_issues.values()]
+
+
+def raw_issue(key, updated, story_points, **fields):
+    return {
+        "id": "10001",
+        "key": key,
+        "fields": {
+            "summary": key,
+            "status": {"name": "Open"},
+            "created": "2024-03-01T10:00:00.000+0000",
+            "updated": updated,
+            FIELD: story_points,
+            **fields,
+        },
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = IssueStore(str(tmp_path / "cache.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_merge_keeps_story_points_of_configured_field(store):
+    first = raw_issue("A-1", "2024-03-02T10:00:00.000+0000", 3)
+    client = Client({"A-1": first}, story_points_field=FIELD)
+    processor = WebhookProcessor(Service(), store, client)
+    processor.handle({"webhookEvent": "jira:issue_created", "issue": first})
+
+    update = raw_issue("A-1", "2024-03-03T10:00:00.000+0000", 5)
+    result = processor.handle({"webhookEvent": "jira:issue_updated", "issue": update})
+    assert result["applied"]
+    assert store.load_issues(["A-1"])["A-1"].story_points == 5
+
+
+def test_issue_created_in_sprint_without_changelog(store):
+    raw = raw_issue("A-2", "2024-03-02T10:00:00.000+0000", 2, **{SPRINT: [{"id": 6783, "name": "S1"}]})
+    service = Service()
+    processor = WebhookProcessor(service, store, Client({"A-2": raw}, story_points_field=FIELD))
+    result = processor.handle({"webhookEvent": "jira:issue_created", "issue": raw})
+    assert result["dirty"] == [6783]
+    assert service.dirty == {6783}
+    assert store.get_issue_sprints("A-2") == [6783]
+
+
+def test_lost_event_is_recovered_by_reconciliation(store):
+    """U1 (переход в Closed) потерян, пришел только U2 (правка summary)"""
+    sprint = Sprint(6783, "S1", "active", datetime(2024, 3, 1, tzinfo=timezone.utc), None, None, None)
+    jira = {"A-1": raw_issue("A-1", "2024-03-02T10:00:00.000+0000", 3)}
+    client = Client(jira, store, story_points_field=FIELD)
+    list(client.iter_sprint_issues(sprint))
+
+    # Состояние Jira после U1 и U2
+    closed = "2024-03-03T10:00:00.000+0000"
+    edited = "2024-03-04T10:00:00.000+0000"
+    jira["A-1"] = raw_issue("A-1", edited, 3, summary="new", status={"name": "Closed"})
+    jira["A-1"]["changelog"] = {"histories": [
+        {"created": closed, "items": [{"field": "status", "fromString": "Open", "toString": "Closed"}]},
+        {"created": edited, "items": [{"field": "summary", "fromString": "A-1", "toString": "new"}]},
+    ]}
+    processor = WebhookProcessor(Service(), store, client)
+    result = processor.handle({
+        "webhookEvent": "jira:issue_updated",
+        "issue": {k: v for k, v in jira["A-1"].items() if k != "changelog"},
+        "changelog": {"items": [{"field": "summary", "fromString": "A-1", "toString": "new"}]},
+    })
+    assert result["applied"]
+    assert store.load_issues(["A-1"])["A-1"].history.closed_date is None
+
+    client.fetched.clear()
+    issues = {i.key: i for i in client.iter_sprint_issues(sprint)}
+    assert client.fetched == ["A-1"]
+    assert issues["A-1"].history.closed_date is not None
+    assert store.load_issues(["A-1"])["A-1"].history.closed_date is not None
+
+    # После полной загрузки задача больше не предварительная
+    client.fetched.clear()
+    list(client.iter_sprint_issues(sprint))
+    assert client.fetched == []
@@ -0,0 +1,96 @@
+"""
+Разбор дат Jira в UTC epoch (целые секунды)
+
+Jira отдает даты вида 2024-01-15T10:30:00.000+0300. Смещение учитывается,
+поэтому даты changelog и спринтов сравниваются в одной шкале. Строки
+стандартного формата разбираются арифметикой без datetime, остальные —
+через datetime.fromisoformat. Повторяющиеся строки (даты спринтов,
+массовые правки) берутся из кеша.
+"""
+
+from datetime import datetime, timezone
+from functools import lru_cache
+
+_EPOCH_DAYS = 719468  # дней от 0000-03-01 до 1970-01-01
+
+
+def _days_from_civil(year: int, month: int, day: int) -> int:
+    """Количество дней от 1970-01-01 (алгоритм Howard Hinnant)"""
+    year -= month <= 2
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - _EPOCH_DAYS
+
+
+def _parse_fast(value: str) -> int | None:
+    # Основной формат Jira: 2024-01-15T10:30:00.000+0300
+    if len(value) == 28 and value[10] == 'T' and value[19] == '.' and value[23] in '+-':
+        try:
+            offset = int(value[24:26]) * 3600 + int(value[26:28]) * 60
+            days = _days_from_civil(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+            seconds = int(value[11:13]) * 3600 + int(value[14:16]) * 60 + int(value[17:19])
+        except ValueError:
+            return None
+        return days * 86400 + seconds - (offset if value[23] == '+' else -offset)
+
+    # Прочие варианты: 2024-01-15T10:30:00.000Z, 2024-01-15T10:30:00+03:00
+    if len(value) < 20 or value[4] != '-' or value[7] != '-' or value[10] != 'T' or value[13] != ':':
+        return None
+    tail = value[19:]
+    if tail.startswith('.'):
+        n = 1
+        while n < len(tail) and tail[n].isdigit():
+            n += 1
+        tail = tail[n:]
+    if tail == 'Z':
+        offset = 0
+    elif len(tail) == 5 and tail[0] in '+-' and tail[1:].isdigit():
+        offset = int(tail[1:3]) * 3600 + int(tail[3:5]) * 60
+        if tail[0] == '-':
+            offset = -offset
+    elif len(tail) == 6 and tail[0] in '+-' and tail[3] == ':':
+        offset = int(tail[1:3]) * 3600 + int(tail[4:6]) * 60
+        if tail[0] == '-':
+            offset = -offset
+    else:
+        return None
+    try:
+        days = _days_from_civil(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+        seconds = int(value[11:13]) * 3600 + int(value[14:16]) * 60 + int(value[17:19])
+    except ValueError:
+        return None
+    return days * 86400 + seconds - offset
+
+
+@lru_cache(maxsize=65536)
+def parse_timestamp(value: str | None) -> int | None:
+    """Дата Jira -> UTC epoch; строка без смещения считается UTC"""
+    if not value:
+        return None
+    ts = _parse_fast(value)
+    if ts is not None:
+        return ts
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def to_datetime(ts: int | None) -> datetime | None:
+    """UTC epoch -> datetime с локальным часовым поясом (для вывода)"""
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts, timezone.utc).astimezone()
+
+
+def to_timestamp(value: datetime | None) -> int | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
@@ -0,0 +1,162 @@
+"""
+Прием вебхуков Jira для сервера отчетов
+
+События задач (jira:issue_created / jira:issue_updated / jira:issue_deleted)
+применяются прямо к локальному хранилищу: поля задачи обновляются,
+изменения из changelog дописываются в ее историю, членство в спринтах
+меняется по элементам поля Sprint в changelog и по значению поля Sprint
+задачи (у задачи, созданной сразу в спринте, элемента в changelog нет).
+Затронутые спринты помечаются "грязными" — пересобираются только их
+отчеты, из локальных данных.
+
+События спринтов (sprint_started / sprint_closed / sprint_updated)
+обновляют спринт в хранилище и в кеше сервера.
+
+Устаревшие (пришедшие не по порядку) события пропускаются по полю updated.
+Если о задаче еще ничего не известно, она скачивается из Jira целиком; все
+прочие пропуски закрывает периодическая сверка сервера (refresh_active):
+слитые из вебхуков задачи сохраняются предварительными и при сверке
+скачиваются заново, с полным changelog.
+"""
+
+from issue_history import ChangelogEntry, IssueHistory, SPRINT_FIELD, parse_sprint_ids
+from jira_client import Issue, JiraClient, get_client, parse_sprint, parse_sprint_field
+from timestamps import parse_timestamp
+
+ISSUE_EVENTS = ('jira:issue_created', 'jira:issue_updated')
+ISSUE_DELETED = 'jira:issue_deleted'
+SPRINT_EVENTS = ('sprint_created', 'sprint_started', 'sprint_updated', 'sprint_closed')
+
+
+class WebhookProcessor:
+    """
+    Применяет вебхуки к хранилищу и помечает отчеты сервера.
+    client — клиент экземпляра Jira (поле Story Points, поле Sprint,
+    докачка задач); по умолчанию get_client().
+    """
+
+    def __init__(self, service, store, client: JiraClient | None = None):
+        self.service = service
+        self.store = store
+        self.client = client or get_client()
+
+    def handle(self, payload: dict) -> dict:
+        event = payload.get('webhookEvent', '')
+        if event in ISSUE_EVENTS:
+            dirty = self._issue_changed(payload)
+        elif event == ISSUE_DELETED:
+            dirty = self._issue_deleted(payload)
+        elif event in SPRINT_EVENTS:
+            dirty = self._sprint_changed(payload)
+        else:
+            return {"event": event, "applied": False, "dirty": []}
+
+        if dirty is None:
+            return {"event": event, "applied": False, "dirty": []}
+        self.service.mark_dirty(dirty)
+        return {"event": event, "applied": True, "dirty": sorted(dirty)}
+
+    # -------------------------------------------------------------------------
+    # Задачи
+    # -------------------------------------------------------------------------
+
+    def _issue_changed(self, payload: dict) -> set[int] | None:
+        raw = payload.get('issue') or {}
+        key = raw.get('key')
+        if not key:
+            return None
+
+        stored = self.store.load_issues([key]).get(key)
+        updated = parse_timestamp((raw.get('fields') or {}).get('updated'))
+        if stored is not None and stored.updated is not None and updated is not None and updated <= stored.updated:
+            # Событие старее (или повтор) уже сохраненного состояния
+            return None
+
+        before = set(self.store.get_issue_sprints(key))
+        if stored is None:
+            # Истории задачи локально нет — одного события мало, берем задачу целиком
+            fetched = self.client.fetch_issues_by_keys([key])
+            if not fetched:
+                return None
+            issue = fetched[0]
+        else:
+            issue = self._merge(stored, raw, payload)
+
+        added, removed = self._sprint_moves(payload)
+        if stored is None:
+            added |= {
+                sprint_id for sprint_id, intervals in issue.history.sprint_intervals.items()
+                if any(end is None for _, end in intervals)
+            }
+        # Задача, созданная сразу в спринте, не имеет элемента Sprint в changelog —
+        # текущие спринты берутся из поля Sprint самой задачи
+        added |= self._current_sprints(raw) - removed
+        # Слитая из вебхука задача — предварительная: если часть событий
+        # потерялась, ее changelog неполон, а updated уже совпадает с Jira.
+        # Сверка (refresh_active) скачает такую задачу целиком.
+        self.store.save_issues([issue], provisional=stored is not None)
+        self.store.update_issue_sprints(key, added, removed)
+        return before | added | removed
+
+    def _merge(self, stored: Issue, raw: dict, payload: dict) -> Issue:
+        """Поля из вебхука + сохраненный changelog с дописанными изменениями"""
+        issue = self.client.parse_issue({**raw, 'changelog': {'histories': []}})
+        date = parse_timestamp((raw.get('fields') or {}).get('updated'))
+        if date is None and payload.get('timestamp'):
+            date = int(payload['timestamp']) // 1000
+
+        changelog = list(stored.changelog)
+        for item in (payload.get('changelog') or {}).get('items', []):
+            changelog.append(ChangelogEntry(
+                date=date,
+                field=item.get('field'),
+                from_value=item.get('from'),
+                to_value=item.get('to'),
+                from_string=item.get('fromString'),
+                to_string=item.get('toString')
+            ))
+        issue.changelog = changelog
+        issue.history = IssueHistory.from_changelog(changelog, issue.created)
+        return issue
+
+    def _sprint_moves(self, payload: dict) -> tuple[set[int], set[int]]:
+        added, removed = set(), set()
+        for item in (payload.get('changelog') or {}).get('items', []):
+            if item.get('field') != SPRINT_FIELD:
+                continue
+            from_ids = parse_sprint_ids(item.get('from'))
+            to_ids = parse_sprint_ids(item.get('to'))
+            added |= to_ids - from_ids
+            removed |= from_ids - to_ids
+        return added - removed, removed - added
+
+    def _current_sprints(self, raw: dict) -> set[int]:
+        """ID спринтов из поля Sprint задачи в вебхуке (пусто, если поля нет)"""
+        sprint_field = self.client.sprint_field
+        if not sprint_field:
+            return set()
+        return parse_sprint_field((raw.get('fields') or {}).get(sprint_field))
+
+    def _issue_deleted(self, payload: dict) -> set[int] | None:
+        key = (payload.get('issue') or {}).get('key')
+        if not key:
+            return None
+        sprints = set(self.store.get_issue_sprints(key))
+        self.store.delete_issue(key)
+        return sprints
+
+    # -------------------------------------------------------------------------
+    # Спринты
+    # -------------------------------------------------------------------------
+
+    def _sprint_changed(self, payload: dict) -> set[int] | None:
+        raw = payload.get('sprint')
+        if not raw or raw.get('id') is None:
+            return None
+        sprint = parse_sprint(raw)
+        self.store.save_sprints([sprint])
+        changed_real = self.service.update_sprint(sprint)
+        if changed_real:
+            # Набор настоящих спринтов изменился — carried_over зависит от него везде
+            return self.service.cached_sprint_ids() | {sprint.id}
+        return {sprint.id}